@@ -7,9 +7,14 @@ from app.schemas import MergeSuggestion, MergeRequest, MergeProposal
 import uuid
 import logging
 from collections import defaultdict
-import datetime
 import asyncio
-from app.services.hybrid_extraction import enrich_profile_from_services_with_llm, generate_merge_suggestion
+from app.services.hybrid_extraction import enrich_profiles_from_services, generate_merge_suggestion
+from app.services.llm_factory import llm_job, LLMPriority, get_llm_scheduler_stats
+from app.services.llm_telemetry import get_llm_telemetry
+from app.services.circuit_breaker import get_circuit_breaker_stats
+from app.services.contact_resolver import canonical_phone, contact_search_filter, normalize_name, note_contact_merge, note_contact_update
+from app.services.profile_merge import ProfileMerge
+from app.services.round_trips import RoundTrips
 from app.core.config import settings
 from rapidfuzz import fuzz
 
@@ -94,11 +99,10 @@ def scan_duplicates(
     for c in active_contacts:
         if c["id"] in processed_ids:
             continue
-        if c.get("phone"):
-            # Simple normalization for grouping
-            phone_clean = ''.join(filter(str.isdigit, c["phone"]))
-            if len(phone_clean) > 6: # Basic validity
-                phone_groups[phone_clean].append(c)
+        # Canonical digits (column from migration 011; computed for older rows)
+        phone_digits = c.get("phone_digits") or canonical_phone(c.get("phone"))
+        if phone_digits:
+            phone_groups[phone_digits].append(c)
                 
     for phone, group in phone_groups.items():
         if len(group) > 1:
@@ -196,12 +200,11 @@ def scan_duplicates_fuzzy(
                         reasons.append("Matching email")
                         confidence = "High"
                 
-                if contact_a.get("phone") and contact_b.get("phone"):
-                    phone_a = ''.join(filter(str.isdigit, contact_a["phone"]))
-                    phone_b = ''.join(filter(str.isdigit, contact_b["phone"]))
-                    if phone_a == phone_b and len(phone_a) > 6:
-                        reasons.append("Matching phone")
-                        confidence = "High"
+                phone_a = contact_a.get("phone_digits") or canonical_phone(contact_a.get("phone"))
+                phone_b = contact_b.get("phone_digits") or canonical_phone(contact_b.get("phone"))
+                if phone_a and phone_a == phone_b:
+                    reasons.append("Matching phone")
+                    confidence = "High"
                 
                 # Pick primary (prefer one with more data)
                 score_a = sum([
@@ -236,11 +239,13 @@ class ScanProfilesRequest(BaseModel):
 
 async def process_profile_scan(contact_ids: List[str], org_id: str, raw_token: str):
     """
-    Background task to scan services and enrich profiles using PARALLEL processing.
-    Processes multiple contacts concurrently for massive performance improvement.
+    Background task to scan services and enrich profiles.
+    Contacts are loaded per batch, enriched with several contacts per LLM call
+    (falling back to single-contact calls when a batch response doesn't line
+    up), then saved.
     """
     
-    logger.info(f"Starting PARALLEL Profile Scan for {len(contact_ids)} contacts...")
+    logger.info(f"Starting BATCHED Profile Scan for {len(contact_ids)} contacts...")
     
     # Update Status
     SCAN_JOB_STATUS["is_running"] = True
@@ -259,127 +264,101 @@ async def process_profile_scan(contact_ids: List[str], org_id: str, raw_token: s
         SCAN_JOB_STATUS["errors"].append(str(e))
         return
 
-    async def process_single_contact(cid: str, index: int):
+    def load_contact(cid: str):
         """
-        Process a single contact's profile enrichment.
-        Returns (success: bool, contact_id: str, error: str|None)
+        Fetch a contact's name, owner and services.
+        Returns (contact_name, user_id, services_text) or raises LookupError
+        with the reason to skip it.
         """
-        target_user_id = None
-        contact_name = "Unknown"
+        c_res = client.table("contacts").select("name, user_id").eq("id", cid).single().execute()
+        if not c_res.data:
+            logger.warning(f"Contact {cid} not found, skipping")
+            raise LookupError("Contact not found")
+            
+        contact_name = c_res.data["name"]
+        target_user_id = c_res.data["user_id"]
+
+        s_res = client.table("services").select("type, description").eq("contact_id", cid).execute()
+        if not s_res.data:
+            logger.info(f"No services for {contact_name}, skipping enrichment")
+            raise LookupError("No services to enrich from")
         
-        try:
-            # 1. Fetch Contact Name & Services & User ID
-            c_res = client.table("contacts").select("name, user_id").eq("id", cid).single().execute()
-            if not c_res.data:
-                logger.warning(f"Contact {cid} not found, skipping")
-                return (False, cid, "Contact not found")
-                
-            contact_name = c_res.data["name"]
-            target_user_id = c_res.data["user_id"]
+        services_text = [f"[{s['type'].upper()}] {s['description']}" for s in s_res.data]
+        return contact_name, target_user_id, services_text
 
-            s_res = client.table("services").select("type, description").eq("contact_id", cid).execute()
-            if not s_res.data:
-                logger.info(f"No services for {contact_name}, skipping enrichment")
-                return (False, cid, "No services to enrich from")
-            
-            services_text = [f"[{s['type'].upper()}] {s['description']}" for s in s_res.data]
-            
-            # 2. Run LLM Enrichment (this is the slow I/O operation)
-            profile = await enrich_profile_from_services_with_llm(contact_name, services_text)
-            
-            # 3. Save / Upsert Profile
-            existing_prof = client.table("contact_profiles").select("*").eq("contact_id", cid).execute()
-            provenance = {}
-            if existing_prof.data:
-                provenance = existing_prof.data[0].get("field_provenance") or {}
-            
-            updates = {}
-            new_provenance = provenance.copy()
-            
-            def update_if_allowed(field_key, new_value):
-                if new_value is None: return
-                if isinstance(new_value, list) and not new_value: return
-                # Check provenance - User Verified trumps AI
-                if provenance.get(field_key) == "user_verified": return
-                updates[field_key] = new_value
-                new_provenance[field_key] = "ai_generated"
-
-            # Core Rich fields
-            update_if_allowed("bio", profile.message_to_world)
-            update_if_allowed("hot_plate", profile.hot_plate)
-            update_if_allowed("role_tags", profile.role_tags)
-            update_if_allowed("communities", profile.communities)
-            update_if_allowed("asset_classes", profile.asset_classes)
-            update_if_allowed("i_can_help_with", profile.i_can_help_with)
-            update_if_allowed("help_me_with", profile.help_me_with)
-            
-            # Buy Box (JSON)
-            if profile.buy_box:
-                 if provenance.get("buy_box") != "user_verified":
-                     updates["buy_box"] = profile.buy_box.model_dump()
-                     new_provenance["buy_box"] = "ai_generated"
-
-            if updates:
-                updates["field_provenance"] = new_provenance
-                updates["updated_at"] = datetime.datetime.now().isoformat()
-                
-                # Check if insert or update
-                if existing_prof.data:
-                    client.table("contact_profiles").update(updates).eq("contact_id", cid).execute()
-                else:
-                    updates["contact_id"] = cid
-                    if target_user_id:
-                        updates["user_id"] = target_user_id
-                    client.table("contact_profiles").insert(updates).execute()
-                
-                logger.info(f"✓ Updated profile for {contact_name} ({cid})")
-                return (True, cid, None)
-            else:
-                logger.info(f"No updates needed for {contact_name}")
-                return (True, cid, None)
-                
-        except Exception as e:
-            error_msg = f"Error scanning profile for {contact_name} ({cid}): {e}"
-            logger.error(error_msg, exc_info=True)
-            return (False, cid, str(e))
-    
-    # Process contacts in parallel with rate limiting
-    # Process in batches to avoid overwhelming LLM API
-    BATCH_SIZE = 10  # Process 10 contacts concurrently at a time
+    # Contacts are loaded and saved in batches; within a batch the LLM
+    # enrichment packs several contacts per call. LLM calls run as a
+    # background job, behind the assistant and fresh uploads
+    BATCH_SIZE = 40  # Contacts loaded/enriched/saved per round
     total_processed = 0
     total_success = 0
     total_errors = 0
-    
+
+    def record_error(cid: str, error: str):
+        nonlocal total_errors
+        total_errors += 1
+        SCAN_JOB_STATUS["errors"].append(f"{cid}: {error}")
+    
+    def save_profiles(cids: List[str], loaded: dict, profiles: dict):
+        """Save enriched profiles for cids, respecting user-verified fields."""
+        nonlocal total_success
+        merge = ProfileMerge(RoundTrips(client))
+        merge.load(cids)
+        for cid in cids:
+            merge.apply_extracted(cid, profiles[cid], loaded[cid][1])
+        changed = merge.save()
+        for cid in cids:
+            contact_name = loaded[cid][0]
+            if cid in merge.skipped:
+                record_error(cid, "No owner for a new profile")
+                continue
+            if cid in changed:
+                logger.info(f"✓ Updated profile for {contact_name} ({cid})")
+            else:
+                logger.info(f"No updates needed for {contact_name}")
+            total_success += 1
+
     for batch_start in range(0, len(contact_ids), BATCH_SIZE):
         batch_end = min(batch_start + BATCH_SIZE, len(contact_ids))
         batch = contact_ids[batch_start:batch_end]
         
         logger.info(f"Processing batch {batch_start//BATCH_SIZE + 1}: contacts {batch_start + 1}-{batch_end} of {len(contact_ids)}")
         
-        # Create tasks for this batch
-        tasks = [process_single_contact(cid, i) for i, cid in enumerate(batch, start=batch_start)]
-        
-        # Execute batch in parallel
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results
-        for result in results:
-            total_processed += 1
-            SCAN_JOB_STATUS["processed"] = total_processed
-            
-            if isinstance(result, Exception):
-                total_errors += 1
-                error_msg = f"Task raised exception: {result}"
-                logger.error(error_msg)
-                SCAN_JOB_STATUS["errors"].append(error_msg)
-            elif result:
-                success, cid, error = result
-                if success:
-                    total_success += 1
-                else:
-                    total_errors += 1
-                    if error:
-                        SCAN_JOB_STATUS["errors"].append(f"{cid}: {error}")
+        # 1. Load contacts & services
+        loaded = {}
+        for cid in batch:
+            try:
+                loaded[cid] = load_contact(cid)
+            except LookupError as e:
+                record_error(cid, str(e))
+            except Exception as e:
+                logger.error(f"Error loading contact {cid} for profile scan: {e}", exc_info=True)
+                record_error(cid, str(e))
+
+        # 2. Run LLM Enrichment (this is the slow I/O operation)
+        profiles = {}
+        if loaded:
+            with llm_job(LLMPriority.BACKGROUND, job_id=f"profile-scan-{org_id}"):
+                profiles = await enrich_profiles_from_services([
+                    (cid, name, services) for cid, (name, _, services) in loaded.items()
+                ])
+
+        # 3. Save profiles (one fetch and bulk writes per batch). If the bulk
+        # write fails, contacts are saved one at a time so only the bad ones
+        # are reported
+        try:
+            save_profiles(list(loaded), loaded, profiles)
+        except Exception as e:
+            logger.error(f"Bulk profile save failed, saving one at a time: {e}", exc_info=True)
+            for cid in loaded:
+                try:
+                    save_profiles([cid], loaded, profiles)
+                except Exception as e:
+                    logger.error(f"Error scanning profile for {loaded[cid][0]} ({cid}): {e}", exc_info=True)
+                    record_error(cid, str(e))
+
+        total_processed += len(batch)
+        SCAN_JOB_STATUS["processed"] = total_processed
 
     logger.info(
         f"Profile Scan Complete: {total_success} successful, {total_errors} errors, "
@@ -396,6 +375,34 @@ def get_scan_status(ctx: UserContext = Depends(require_admin)):
     return SCAN_JOB_STATUS
 
 
+@router.get("/llm-scheduler")
+async def get_llm_scheduler_status(ctx: UserContext = Depends(require_admin)):
+    """Return LLM queue depth and in-flight calls by priority (this worker)."""
+    return get_llm_scheduler_stats()
+
+
+@router.get("/llm-circuit-breakers")
+async def get_llm_circuit_breakers(ctx: UserContext = Depends(require_admin)):
+    """Return circuit breaker state and recent outcomes per model (this worker)."""
+    return get_circuit_breaker_stats()
+
+
+@router.get("/llm-telemetry")
+async def get_llm_telemetry_stats(
+    reset: bool = False,
+    ctx: UserContext = Depends(require_admin),
+):
+    """
+    Return per-stage LLM call stats (this worker): tokens, latency, retries,
+    fallbacks and rate-limiter wait. Pass reset=true to start a new window.
+    """
+    telemetry = get_llm_telemetry()
+    snapshot = telemetry.snapshot()
+    if reset:
+        telemetry.reset()
+    return snapshot
+
+
 
 @router.post("/scan-profiles")
 async def scan_profiles(
@@ -496,6 +503,7 @@ def merge_contacts(
                 new_aliases.append({
                     "contact_id": primary_id,
                     "alias": name,
+                    "normalized_alias": normalize_name(name),
                     "source_meeting_id": None # We don't have this easy context here, optional
                 })
                 current_alias_names.add(name.lower())
@@ -569,6 +577,9 @@ def merge_contacts(
     # Then delete the contacts themselves
     client.table("contacts").delete().in_("id", dup_ids).execute()
 
+    # Keep the cached contact index in step (duplicate names become aliases)
+    note_contact_merge(primary_id, dup_ids, {**updates, **merged_updates})
+
     # 6. Audit
     try:
         client.table("audit_log").insert({
@@ -613,7 +624,7 @@ async def reprocess_chats(
             # Note: run_core_extraction_logic is async.
             
             # Since background_tasks.add_task expects a function, we define this wrapper.
-            await run_core_extraction_logic(client, cid, uid, oid, text)
+            await run_core_extraction_logic(client, cid, uid, oid, text, priority=LLMPriority.BACKGROUND)
         except Exception as e:
             print(f"Reprocess failed for {cid}: {e}")
 
@@ -653,7 +664,10 @@ async def reprocess_chats(
         # but we need to mock the token.
         # Alternate: Just run `run_core_extraction_logic` with the Admin Client.
         
-        background_tasks.add_task(run_core_extraction_logic, client, chat['id'], chat['user_id'], chat['org_id'], chat['cleaned_text'])
+        background_tasks.add_task(
+            run_core_extraction_logic, client, chat['id'], chat['user_id'], chat['org_id'], chat['cleaned_text'],
+            priority=LLMPriority.BACKGROUND,
+        )
         count += 1
         
     return {"status": "success", "queued": count, "message": f"Queued {count} chats for reprocessing."}
@@ -686,6 +700,7 @@ def update_contact(
         
     if contact_updates:
         client.table("contacts").update(contact_updates).eq("id", contact_id).execute()
+        note_contact_update(contact_id, contact_updates)
         
     if profile_updates:
         # Check if profile exists
@@ -713,6 +728,7 @@ def delete_contact(
     Soft delete a contact.
     """
     client.table("contacts").update({"is_archived": True}).eq("id", contact_id).execute()
+    note_contact_update(contact_id, {"is_archived": True})
     return {"status": "success"}
 
 @router.get("/review-queue", response_model=List[Dict[str, Any]])
@@ -736,7 +752,7 @@ def search_contacts(
     """
     Admin search: looks at name, email, phone, and links.
     """
-    filter_str = f"name.ilike.%{q}%,email.ilike.%{q}%,phone.ilike.%{q}%"
+    filter_str = contact_search_filter(q)
     res = client.table("contacts").select("*").or_(filter_str).eq("org_id", ctx.org_id).limit(20).execute()
     return res.data
 
@@ -765,7 +781,7 @@ class SuggestMergeRequest(BaseModel):
     contact_ids: List[str]
 
 @router.post("/contacts/suggest-merge", response_model=MergeProposal)
-def suggest_merge(
+async def suggest_merge(
     request: SuggestMergeRequest,
     ctx: UserContext = Depends(require_admin),
     client: Client = Depends(get_supabase_client)
@@ -788,7 +804,7 @@ def suggest_merge(
         c["services_count"] = len(c.get("services") or [])
     
     # Generate suggestion
-    result = generate_merge_suggestion(contacts)
+    result = await generate_merge_suggestion(contacts)
     
     return MergeProposal(
         name=result.master_name,
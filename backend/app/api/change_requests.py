@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from pydantic import BaseModel
 from typing import Dict, Any, List
 from app.dependencies import get_supabase_client, get_current_user
+from app.services.contact_resolver import ALIAS, EMAIL, NAME, get_contact_resolver, note_contact_update
 from supabase import Client
 
 router = APIRouter()
@@ -112,48 +113,40 @@ def review_change_request(
             suggested_name = changes.pop("suggested_contact_name")
             suggested_email = changes.pop("suggested_contact_email", None)
             
-            # Find or Create Contact logic
-            # 1. Search by email first (high confidence)
-            existing_contact_id = None
-            if suggested_email:
-                try:
-                    res = client.table("contacts").select("id").eq("org_id", svc.get("org_id", ""))\
-                        .eq("email", suggested_email).limit(1).execute()
-                    if res.data:
-                        existing_contact_id = res.data[0]["id"]
-                except Exception as e:
-                    pass
+            # We need the org_id. Fetch the target service to get its org_id/user_id owner.
+            svc = {}
+            service_res = client.table("services").select("user_id, org_id").eq("id", req["target_id"]).execute()
+            if service_res.data:
+                svc = service_res.data[0]
 
-            # 2. Search by name if no email match
-            if not existing_contact_id and suggested_name:
-                try:
-                    res = client.table("contacts").select("id").eq("org_id", svc.get("org_id", ""))\
-                        .eq("name", suggested_name).limit(1).execute()
-                    if res.data:
-                        existing_contact_id = res.data[0]["id"]
-                except Exception:
-                    pass
+            # Find or Create Contact logic
+            # Email first (high confidence), then name or a known alias
+            existing_contact = None
+            resolver = get_contact_resolver(client, svc["org_id"]) if svc.get("org_id") else None
+            if resolver:
+                existing_contact = (
+                    resolver.lookup(EMAIL, suggested_email)
+                    or resolver.lookup(NAME, suggested_name)
+                    or resolver.lookup(ALIAS, suggested_name)
+                )
 
-            if existing_contact_id:
-                changes["contact_id"] = existing_contact_id
+            if existing_contact:
+                changes["contact_id"] = existing_contact["id"]
             else:
                 # Create new contact
                 new_contact_data = {
                      "name": suggested_name,
                      "email": suggested_email,
+                     **svc,  # Owner and org of the service
                 }
-                # We need the org_id. Let's fetch the target service to get its org_id/user_id owner.
-                service_res = client.table("services").select("user_id, org_id").eq("id", req["target_id"]).execute()
-                if service_res.data:
-                    svc = service_res.data[0]
-                    new_contact_data["user_id"] = svc.get("user_id")
-                    new_contact_data["org_id"] = svc.get("org_id")
                 
                 try:
                     contact_res = client.table("contacts").insert(new_contact_data).execute()
                     if contact_res.data:
                         new_contact_id = contact_res.data[0]["id"]
                         changes["contact_id"] = new_contact_id
+                        if resolver:
+                            resolver.add(contact_res.data[0])
                 except Exception as e:
                     raise HTTPException(status_code=500, detail=f"Failed to create new contact: {e}")
 
@@ -162,5 +155,7 @@ def review_change_request(
         
         if changes:
              apply_res = client.table(target_table).update(changes).eq("id", req["target_id"]).execute()
+             if target_table == "contacts":
+                 note_contact_update(req["target_id"], changes)
         
     return {"status": "ok", "request": req}
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Dict, Any, Optional
 from supabase import Client
-from app.dependencies import get_current_user, get_supabase_client
+from app.dependencies import get_current_user, get_supabase_client, get_user_context, UserContext
 from app.schemas import ClaimRequestCreate, ClaimRequestResponse, ContactBase
+from app.services.contact_resolver import EMAIL, PHONE, get_contact_resolver, normalize_name, note_contact_update
 from pydantic import BaseModel
 import uuid
 import logging
@@ -18,60 +19,47 @@ class ClaimCandidate(BaseModel):
 @router.post("/search", response_model=List[ClaimCandidate])
 def search_claimable_contacts(
     payload: Dict[str, str] = Body(...),
-    user = Depends(get_current_user),
+    ctx: UserContext = Depends(get_user_context),
     client: Client = Depends(get_supabase_client)
 ):
     """
     Finds contacts that might belong to the user based on phone, email, or name.
+    Matches come from the org's contact resolver: phones are compared as
+    canonical digits, emails case-insensitively, names also against aliases.
     """
     phone = payload.get("phone", "").strip()
     email = payload.get("email", "").strip()
     name = payload.get("name", "").strip()
     
+    resolver = get_contact_resolver(client, ctx.org_id)
     candidates = []
     seen_ids = set()
-    
-    # 1. Strong Match: Phone
-    if phone:
-        # Simple cleanup for matching
-        # In a real app, we'd use a better normalization strategy. 
-        # Here we assume the DB has raw phone strings.
-        # We try exact match first
-        res = client.table("contacts").select("*").eq("phone", phone).execute()
-        for c in res.data:
+
+    def add_candidates(contacts, match_type, confidence):
+        for c in contacts:
             if c["id"] not in seen_ids and not c.get("claimed_by_user_id"):
                 candidates.append(ClaimCandidate(
                     contact=c,
-                    match_type="strong_phone",
-                    confidence="High"
+                    match_type=match_type,
+                    confidence=confidence(c) if callable(confidence) else confidence
                 ))
                 seen_ids.add(c["id"])
+    
+    # 1. Strong Match: Phone
+    if phone:
+        add_candidates(resolver.find(PHONE, phone), "strong_phone", "High")
 
     # 2. Strong Match: Email
     if email:
-        res = client.table("contacts").select("*").ilike("email", email).execute()
-        for c in res.data:
-            if c["id"] not in seen_ids and not c.get("claimed_by_user_id"):
-                candidates.append(ClaimCandidate(
-                    contact=c,
-                    match_type="strong_email",
-                    confidence="High"
-                ))
-                seen_ids.add(c["id"])
+        add_candidates(resolver.find(EMAIL, email), "strong_email", "High")
 
-    # 3. Weak/Fuzzy Match: Name
+    # 3. Weak/Fuzzy Match: Name (substring of a name or alias)
     if name and len(name) > 3:
-        # ILIKE match
-        res = client.table("contacts").select("*").ilike("name", f"%{name}%").limit(5).execute()
-        for c in res.data:
-            if c["id"] not in seen_ids and not c.get("claimed_by_user_id"):
-                confidence = "Medium" if c["name"].lower() == name.lower() else "Low"
-                candidates.append(ClaimCandidate(
-                    contact=c,
-                    match_type="name_similarity",
-                    confidence=confidence
-                ))
-                seen_ids.add(c["id"])
+        add_candidates(
+            resolver.search_names(name, limit=5),
+            "name_similarity",
+            lambda c: "Medium" if normalize_name(c["name"]) == normalize_name(name) else "Low"
+        )
                 
     return candidates
 
@@ -160,10 +148,12 @@ def decide_claim(
     
     # If approved, set claimed_by_user_id AND claim_status on contact
     if new_status == "approved":
-        client.table("contacts").update({
+        contact_updates = {
             "claimed_by_user_id": claim["user_id"],
             "claim_status": "approved"
-        }).eq("id", claim["contact_id"]).execute()
+        }
+        client.table("contacts").update(contact_updates).eq("id", claim["contact_id"]).execute()
+        note_contact_update(claim["contact_id"], contact_updates)
         
         # Also ensure a contact_profile exists for this contact
         profile_exists = client.table("contact_profiles").select("contact_id").eq("contact_id", claim["contact_id"]).execute()
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Dict, Any, Optional
 from supabase import Client
 from app.dependencies import require_auth, UserContext, get_supabase_client
+from app.services.contact_resolver import note_contact_update
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -89,6 +90,7 @@ def update_my_profile(
     
     if contact_updates:
         client.table("contacts").update(contact_updates).eq("id", contact_id).execute()
+        note_contact_update(contact_id, contact_updates)
         
         # Audit Log
         client.table("audit_log").insert({
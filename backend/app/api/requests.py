@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Dict, Any, Optional
 from supabase import Client
 from app.dependencies import require_admin, UserContext, get_supabase_client
+from app.services.contact_resolver import note_contact_update
 from pydantic import BaseModel
 import logging
 import datetime
@@ -61,6 +62,7 @@ def handle_claim_request(
         update_res = client.table("contacts").update({
             "claimed_by_user_id": req["user_id"]
         }).eq("id", req["contact_id"]).execute()
+        note_contact_update(req["contact_id"], {"claimed_by_user_id": req["user_id"]})
         
         if not update_res.data:
              # Could fail if contact deleted or RLS issue?
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -13,9 +15,18 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "openai/gpt-4o-mini"  # Primary model (OpenRouter format)
     LLM_FALLBACK_MODEL: str = "openai/gpt-3.5-turbo"  # Fallback model if primary fails
     
-    # Rate Limiting (requests per second)
-    LLM_RATE_LIMIT_RPS: float = 0.5  # 1 request every 2 seconds
+    # Rate Limiting (requests per second, adaptive per model)
+    LLM_RATE_LIMIT_RPS: float = 0.5  # Starting rate: 1 request every 2 seconds
     LLM_RATE_LIMIT_BURST: int = 10  # Allow burst capacity
+    LLM_RATE_LIMIT_MIN_RPS: float = 0.1  # Floor after repeated 429s
+    LLM_RATE_LIMIT_MAX_RPS: float = 5.0  # Ceiling for additive increase
+    LLM_RATE_LIMIT_INCREASE: float = 0.05  # RPS added per timely response
+    LLM_RATE_LIMIT_TARGET_LATENCY: float = 30.0  # Seconds; slower responses back off
+    LLM_RATE_LIMIT_SHARED: bool = True  # Share buckets across worker processes (CACHE_DIR)
+    
+    # LLM scheduling (per process): interactive > upload extraction > reprocess/scans
+    LLM_MAX_CONCURRENCY: int = 8  # Calls in flight across all jobs
+    LLM_JOB_MAX_CONCURRENCY: int = 4  # Calls in flight per background/extraction job
     
     # Retry Configuration
     LLM_MAX_RETRIES: int = 3
@@ -23,10 +34,52 @@ class Settings(BaseSettings):
     LLM_RETRY_BACKOFF_FACTOR: float = 2.0
     LLM_RETRY_MAX_DELAY: float = 60.0  # seconds
     
+    # Circuit breaker per model (invoke_with_fallback routes around an open primary)
+    LLM_BREAKER_WINDOW: int = 20  # Recent attempts considered per model
+    LLM_BREAKER_MIN_CALLS: int = 5  # Attempts needed in the window before tripping
+    LLM_BREAKER_ERROR_RATE: float = 0.5  # Failed share of the window that trips it
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 60.0  # Attempts at least this slow count as slow
+    LLM_BREAKER_SLOW_CALL_RATE: float = 0.5  # Slow share of the window that trips it
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0  # Open time before letting calls through again
+    
+    # Hedged requests: if the primary hasn't answered by its latency percentile
+    # for the stage, also ask the fallback model and take the first answer
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # Latencies needed per stage before using the percentile
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 30.0  # Hedge delay until then
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    
+    # Telemetry (per-stage call stats, in memory per process)
+    LLM_TELEMETRY_LOG_INTERVAL_SECONDS: float = 300.0  # 0 disables the periodic summary log
+    
     # Timeouts
     LLM_REQUEST_TIMEOUT: int = 120  # seconds per request
     EXTRACTION_TIMEOUT: int = 300  # seconds for full extraction pipeline
     
+    # Transcript chunking (estimated tokens of transcript text per LLM call)
+    EXTRACTION_CHUNK_TOKEN_BUDGET: int = 3000
+    EXTRACTION_CHUNK_MAX_MESSAGES: int = 150  # Bounds the noise-id list in each response
+    
+    # Local result caches (SQLite files under CACHE_DIR)
+    CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "meeting_vault_cache")
+    CHUNK_CACHE_ENABLED: bool = True  # Reuse per-chunk IntentAnalysis on reprocess
+    CHUNK_CACHE_MAX_MB: int = 256
+    MESSAGE_CACHE_ENABLED: bool = True  # Skip messages already classified in earlier meetings
+    MESSAGE_CACHE_MAX_MB: int = 128
+    LLM_RESPONSE_CACHE_ENABLED: bool = False  # Opt-in cache of structured LLM responses
+    LLM_RESPONSE_CACHE_TTL_HOURS: float = 24 * 7
+    LLM_RESPONSE_CACHE_MAX_MB: int = 256
+    LLM_RESPONSE_CACHE_MEMORY_ITEMS: int = 512  # In-process hot tier
+    
+    # Extraction checkpoints (resume interrupted runs; one thread per chat)
+    EXTRACTION_CHECKPOINTS_ENABLED: bool = True  # False = in-memory only
+    EXTRACTION_CHECKPOINT_PATH: str = ""  # Default: CACHE_DIR/extraction_checkpoints.sqlite
+    EXTRACTION_CHECKPOINT_RETENTION_HOURS: float = 72  # Finished threads are pruned after this
+    
+    # Contact resolution (per-org in-memory index of contacts and aliases)
+    CONTACT_RESOLVER_TTL_SECONDS: float = 300.0  # Reload after this, to pick up changes from other workers
+    
     ADMIN_EMAIL: str = ""  # Single admin email
     ADMIN_EMAILS: str = ""  # Comma-separated list (legacy support)
     class Config:
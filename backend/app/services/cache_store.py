@@ -0,0 +1,347 @@
+"""
+Cache Store Module
+
+Small persistent key/value stores for LLM-derived results that are expensive
+to recompute (per-chunk IntentAnalysis results for reprocessing, per-message
+classifications reused across weekly meetings).
+
+Each store is a local SQLite file holding text values (usually JSON) keyed by
+a content hash. Reads refresh an entry's access time and writes evict the
+least recently used entries once the store grows past its size limit. SQLite
+handles locking, so API workers and CLI scripts can share one file.
+
+A cache must never break extraction: if the file cannot be opened or a query
+fails, the error is logged and the call behaves like a miss.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of max_bytes so eviction doesn't run on every write
+EVICTION_TARGET_RATIO = 0.9
+BULK_QUERY_SIZE = 500  # Keys per IN (...) lookup, below SQLite's variable limit
+
+
+def content_key(*parts: Any) -> str:
+    """Stable SHA-256 key over JSON-serializable parts (order matters)."""
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheStore:
+    """
+    Persistent key/value store with size-based LRU eviction and an optional
+    TTL (entries older than ttl_seconds read as misses and are purged).
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed_at"
+                " ON cache_entries (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Cache store {self.path} unavailable, caching disabled: {e}")
+            self._disabled = True
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache_entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or self._expired(row[1]):
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                logger.warning(f"Cache read failed ({self.path}): {e}")
+                self.misses += 1
+                return None
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Return {key: value} for the keys that are cached (one transaction)."""
+        found: Dict[str, str] = {}
+        if not keys:
+            return found
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return found
+            try:
+                for start in range(0, len(keys), BULK_QUERY_SIZE):
+                    batch = keys[start:start + BULK_QUERY_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    for key, value, created_at in conn.execute(
+                        f"SELECT key, value, created_at FROM cache_entries WHERE key IN ({placeholders})",
+                        batch,
+                    ):
+                        if not self._expired(created_at):
+                            found[key] = value
+                now = time.time()
+                conn.executemany(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Cache read failed ({self.path}): {e}")
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def set(self, key: str, value: str) -> None:
+        """Store `value` under `key`, evicting old entries if over the size limit."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, size, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now),
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Cache write failed ({self.path}): {e}")
+
+    def set_many(self, items: Dict[str, str]) -> None:
+        """Store several entries in one transaction."""
+        rows = []
+        now = time.time()
+        for key, value in items.items():
+            size = len(value.encode("utf-8"))
+            if size <= self.max_bytes:
+                rows.append((key, value, size, now, now))
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, size, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Cache write failed ({self.path}): {e}")
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and created_at < time.time() - self.ttl_seconds
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        if self.ttl_seconds is not None:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        evicted = 0
+        stale_keys = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM cache_entries ORDER BY accessed_at ASC"
+        ):
+            if total <= target:
+                break
+            stale_keys.append((key,))
+            total -= size
+            evicted += 1
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", stale_keys)
+        logger.info(f"Cache {os.path.basename(self.path)}: evicted {evicted} entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and hit/miss counters for this process."""
+        with self._lock:
+            conn = self._connect()
+            entries, size = 0, 0
+            if conn is not None:
+                try:
+                    entries, size = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class TieredCacheStore:
+    """
+    In-memory LRU (hot tier) in front of a SQLiteCacheStore. Recently used
+    entries are served without touching disk; writes go to both tiers.
+    """
+
+    def __init__(self, store: SQLiteCacheStore, memory_items: int):
+        self.store = store
+        self.memory_items = memory_items
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self.store._expired(entry[1]):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+        value = self.store.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._remember(key, value)
+        self.store.set(key, value)
+
+    def _remember(self, key: str, value: str) -> None:
+        # Disk entries loaded here restart their TTL in memory only; the disk
+        # copy still expires on its own schedule
+        self._memory[key] = (value, time.time())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memory_entries = len(self._memory)
+        return {
+            **self.store.stats(),
+            "memory_entries": memory_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hits": self.memory_hits + self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+# =============================================================================
+# SHARED STORES
+# =============================================================================
+
+_chunk_result_cache: Optional[SQLiteCacheStore] = None
+
+
+def get_chunk_result_cache() -> Optional[SQLiteCacheStore]:
+    """Get the per-chunk IntentAnalysis cache, or None if disabled in settings."""
+    global _chunk_result_cache
+    if not settings.CHUNK_CACHE_ENABLED:
+        return None
+    if _chunk_result_cache is None:
+        _chunk_result_cache = SQLiteCacheStore(
+            os.path.join(settings.CACHE_DIR, "chunk_results.sqlite"),
+            max_bytes=settings.CHUNK_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _chunk_result_cache
+
+
+_message_class_cache: Optional[SQLiteCacheStore] = None
+
+
+def get_message_class_cache() -> Optional[SQLiteCacheStore]:
+    """Get the cross-meeting message classification cache, or None if disabled."""
+    global _message_class_cache
+    if not settings.MESSAGE_CACHE_ENABLED:
+        return None
+    if _message_class_cache is None:
+        _message_class_cache = SQLiteCacheStore(
+            os.path.join(settings.CACHE_DIR, "message_classes.sqlite"),
+            max_bytes=settings.MESSAGE_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _message_class_cache
+
+
+_llm_response_cache: Optional[TieredCacheStore] = None
+
+
+def get_llm_response_cache() -> Optional[TieredCacheStore]:
+    """Get the structured LLM response cache, or None unless enabled in settings (opt-in)."""
+    global _llm_response_cache
+    if not settings.LLM_RESPONSE_CACHE_ENABLED:
+        return None
+    if _llm_response_cache is None:
+        _llm_response_cache = TieredCacheStore(
+            SQLiteCacheStore(
+                os.path.join(settings.CACHE_DIR, "llm_responses.sqlite"),
+                max_bytes=settings.LLM_RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+                ttl_seconds=settings.LLM_RESPONSE_CACHE_TTL_HOURS * 3600,
+            ),
+            memory_items=settings.LLM_RESPONSE_CACHE_MEMORY_ITEMS,
+        )
+    return _llm_response_cache
@@ -0,0 +1,272 @@
+"""
+Extraction Checkpoints Module
+
+Durable state for the extraction graph, so a run cut short by
+EXTRACTION_TIMEOUT or a worker restart picks up where it stopped instead of
+paying for every LLM call again.
+
+Everything lives in one local SQLite file (EXTRACTION_CHECKPOINT_PATH):
+- Graph checkpoints: LangGraph's AsyncSqliteSaver, one thread per chat, so
+  a resumed run continues after the last completed node.
+- Chunk progress: chunk analyses finished inside map_extraction, so a
+  resumed map step only sends the chunks that are still missing.
+- Thread registry: transcript hash and status per thread. A run resumes
+  only if the previous one for the same transcript did not finish; finished
+  threads are pruned after EXTRACTION_CHECKPOINT_RETENTION_HOURS.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiosqlite
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from app.core.config import settings
+from app.services.hybrid_extraction import (
+    BuyBox,
+    ExtractedContact,
+    ExtractedMeetingData,
+    ExtractedProfile,
+    ExtractedService,
+    IntentAnalysis,
+    MeetingSummary,
+    MessageTable,
+    PartialIntentAnalysis,
+    SocialLink,
+)
+
+logger = logging.getLogger(__name__)
+
+# App types stored in PipelineState; only these are revived from checkpoints
+CHECKPOINT_TYPES = [
+    MessageTable,
+    IntentAnalysis,
+    PartialIntentAnalysis,
+    ExtractedService,
+    ExtractedProfile,
+    ExtractedContact,
+    BuyBox,
+    SocialLink,
+    MeetingSummary,
+    ExtractedMeetingData,
+]
+
+# Threads that never finished are kept this many times longer than finished ones
+ABANDONED_RETENTION_FACTOR = 7
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def get_checkpoint_path() -> str:
+    return settings.EXTRACTION_CHECKPOINT_PATH or os.path.join(
+        settings.CACHE_DIR, "extraction_checkpoints.sqlite"
+    )
+
+
+# =============================================================================
+# THREAD REGISTRY & CHUNK PROGRESS
+# =============================================================================
+
+class ExtractionProgressStore:
+    """
+    Thread registry and per-chunk results for extraction runs. Like the
+    cache stores, a failure to open or query the file is logged and the
+    store then behaves as if empty (runs start from scratch).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_threads ("
+                " thread_id TEXT PRIMARY KEY,"
+                " transcript_key TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_chunk_progress ("
+                " thread_id TEXT NOT NULL,"
+                " chunk_index INTEGER NOT NULL,"
+                " chunk_key TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " PRIMARY KEY (thread_id, chunk_index))"
+            )
+            conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Checkpoint store {self.path} unavailable, resume disabled: {e}")
+            self._disabled = True
+        return self._conn
+
+    def _run(self, action: str, fn, default=None):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return default
+            try:
+                result = fn(conn)
+                conn.commit()
+                return result
+            except sqlite3.Error as e:
+                logger.warning(f"Checkpoint store {action} failed ({self.path}): {e}")
+                return default
+
+    def get_thread(self, thread_id: str) -> Optional[Dict[str, str]]:
+        """Return {"transcript_key", "status"} of a thread, or None if unknown."""
+        row = self._run("read", lambda conn: conn.execute(
+            "SELECT transcript_key, status FROM extraction_threads WHERE thread_id = ?",
+            (thread_id,),
+        ).fetchone())
+        if row is None:
+            return None
+        return {"transcript_key": row[0], "status": row[1]}
+
+    def start_thread(self, thread_id: str, transcript_key: str, resume: bool) -> None:
+        """Mark a thread as running; a fresh (non-resumed) run drops old chunk progress."""
+        def start(conn: sqlite3.Connection):
+            if not resume:
+                conn.execute(
+                    "DELETE FROM extraction_chunk_progress WHERE thread_id = ?", (thread_id,)
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO extraction_threads (thread_id, transcript_key, status, updated_at)"
+                " VALUES (?, ?, 'running', ?)",
+                (thread_id, transcript_key, time.time()),
+            )
+        self._run("write", start)
+
+    def finish_thread(self, thread_id: str) -> None:
+        """Mark a thread as finished; its chunk progress is no longer needed."""
+        def finish(conn: sqlite3.Connection):
+            conn.execute(
+                "UPDATE extraction_threads SET status = 'finished', updated_at = ? WHERE thread_id = ?",
+                (time.time(), thread_id),
+            )
+            conn.execute(
+                "DELETE FROM extraction_chunk_progress WHERE thread_id = ?", (thread_id,)
+            )
+        self._run("write", finish)
+
+    def load_chunks(self, thread_id: str) -> Dict[int, Tuple[str, str]]:
+        """Completed chunks of a thread: {chunk index: (chunk key, result JSON)}."""
+        rows = self._run("read", lambda conn: conn.execute(
+            "SELECT chunk_index, chunk_key, result FROM extraction_chunk_progress WHERE thread_id = ?",
+            (thread_id,),
+        ).fetchall(), default=[])
+        return {index: (key, result) for index, key, result in rows}
+
+    def save_chunk(self, thread_id: str, chunk_index: int, chunk_key: str, result: str) -> None:
+        self._run("write", lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO extraction_chunk_progress (thread_id, chunk_index, chunk_key, result)"
+            " VALUES (?, ?, ?, ?)",
+            (thread_id, chunk_index, chunk_key, result),
+        ))
+
+    def expired_threads(self, retention_seconds: float) -> List[str]:
+        """Finished threads older than the retention, and long-abandoned running ones."""
+        now = time.time()
+        rows = self._run("read", lambda conn: conn.execute(
+            "SELECT thread_id FROM extraction_threads"
+            " WHERE (status = 'finished' AND updated_at < ?) OR updated_at < ?",
+            (now - retention_seconds, now - retention_seconds * ABANDONED_RETENTION_FACTOR),
+        ).fetchall(), default=[])
+        return [row[0] for row in rows]
+
+    def delete_threads(self, thread_ids: List[str]) -> None:
+        def delete(conn: sqlite3.Connection):
+            params = [(thread_id,) for thread_id in thread_ids]
+            conn.executemany("DELETE FROM extraction_chunk_progress WHERE thread_id = ?", params)
+            conn.executemany("DELETE FROM extraction_threads WHERE thread_id = ?", params)
+        self._run("write", delete)
+
+
+_progress_store: Optional[ExtractionProgressStore] = None
+
+
+def get_progress_store() -> Optional[ExtractionProgressStore]:
+    """Get the shared progress store, or None if checkpoints are disabled."""
+    global _progress_store
+    if not settings.EXTRACTION_CHECKPOINTS_ENABLED:
+        return None
+    if _progress_store is None:
+        _progress_store = ExtractionProgressStore(get_checkpoint_path())
+    return _progress_store
+
+
+# =============================================================================
+# GRAPH CHECKPOINTER
+# =============================================================================
+
+@asynccontextmanager
+async def open_checkpointer() -> AsyncIterator[Optional[AsyncSqliteSaver]]:
+    """
+    Open the SQLite graph checkpointer. aiosqlite connections belong to the
+    event loop that opened them, so one is opened per pipeline run. Like the
+    progress store, a file that can't be opened is logged and None is
+    yielded: the run goes ahead without durable checkpoints.
+    """
+    path = get_checkpoint_path()
+    conn = None
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = await aiosqlite.connect(path)
+        saver = AsyncSqliteSaver(
+            conn, serde=JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+        )
+        await saver.setup()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Checkpoint database {path} unavailable, running without checkpoints: {e}")
+        if conn is not None:
+            await conn.close()
+        yield None
+        return
+    try:
+        yield saver
+    finally:
+        await conn.close()
+
+
+_last_prune: Optional[float] = None
+
+
+async def prune_expired_threads(saver: AsyncSqliteSaver) -> None:
+    """
+    Delete checkpoints and progress of expired threads (see expired_threads).
+    Runs at most once per PRUNE_INTERVAL_SECONDS per process.
+    """
+    global _last_prune
+    store = get_progress_store()
+    if store is None or (
+        _last_prune is not None and time.monotonic() - _last_prune < PRUNE_INTERVAL_SECONDS
+    ):
+        return
+    _last_prune = time.monotonic()
+
+    retention = settings.EXTRACTION_CHECKPOINT_RETENTION_HOURS * 3600
+    thread_ids = await asyncio.to_thread(store.expired_threads, retention)
+    if not thread_ids:
+        return
+    try:
+        for thread_id in thread_ids:
+            await saver.adelete_thread(thread_id)
+    except Exception as e:
+        logger.warning(f"Checkpoint pruning failed: {e}")
+        return
+    await asyncio.to_thread(store.delete_threads, thread_ids)
+    logger.info(f"Pruned {len(thread_ids)} expired extraction threads")
@@ -0,0 +1,212 @@
+"""
+Chunking Module
+
+Splits a parsed transcript (MessageTable) into LLM-sized chunks.
+
+Chunks are packed up to a token budget rather than a fixed message count,
+so chatty meetings need fewer calls and long-form posts never overflow the
+prompt. Zoom reply threads ('Replying to "...": ...') are linked back to the
+message they quote and kept in the same chunk whenever the thread fits the
+budget; otherwise the quoted message is pulled into the reply's chunk as
+context.
+
+Token counts come from the local estimator in token_estimate.
+"""
+import re
+import statistics
+from typing import Dict, List, Sequence, Set
+
+from app.services.hybrid_extraction import MessageTable
+from app.services.token_estimate import estimate_tokens
+
+MESSAGE_TOKEN_OVERHEAD = 4  # "[id] sender: " framing per prompt line
+
+REPLY_QUOTE_PATTERN = re.compile(r'^Replying to "(.*?)":\s*', re.IGNORECASE)
+QUOTE_KEY_LENGTH = 24
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+# =============================================================================
+# TOKEN ESTIMATION
+# =============================================================================
+
+def estimate_message_tokens(messages: MessageTable, row: int) -> int:
+    """Approximate prompt tokens for one transcript line (sender + message)."""
+    row_data = messages.row(row)
+    return (
+        MESSAGE_TOKEN_OVERHEAD
+        + estimate_tokens(row_data.sender)
+        + estimate_tokens(row_data.message)
+    )
+
+
+# =============================================================================
+# REPLY THREADS
+# =============================================================================
+
+def _normalize_quote(text: str) -> str:
+    return WHITESPACE_PATTERN.sub(' ', text).strip().lower()
+
+
+def find_reply_parents(messages: MessageTable) -> Dict[int, int]:
+    """
+    Map each reply row to the row of the message it quotes.
+
+    Zoom quotes the first ~50 characters of the original message and marks
+    truncation with "...". The most recent earlier message whose content
+    starts with the quote is taken as the parent; quotes that match nothing
+    (e.g. "Message sent before you joined the meeting") are ignored.
+    """
+    parents: Dict[int, int] = {}
+    by_prefix: Dict[str, List[int]] = {}
+    contents: List[str] = []
+
+    for row in range(len(messages)):
+        text = messages.message(row).strip()
+        match = REPLY_QUOTE_PATTERN.match(text)
+        content = _normalize_quote(text[match.end():] if match else text)
+        contents.append(content)
+
+        if match:
+            quote = _normalize_quote(match.group(1))
+            truncated = quote.endswith("...")
+            if truncated:
+                quote = quote[:-3].rstrip()
+            for candidate in reversed(by_prefix.get(quote[:QUOTE_KEY_LENGTH], ())):
+                candidate_text = contents[candidate]
+                if candidate_text.startswith(quote) if truncated else candidate_text == quote:
+                    parents[row] = candidate
+                    break
+
+        if content:
+            by_prefix.setdefault(content[:QUOTE_KEY_LENGTH], []).append(row)
+
+    return parents
+
+
+# =============================================================================
+# CHUNK PACKING
+# =============================================================================
+
+def build_chunks(
+    messages: MessageTable,
+    rows: Sequence[int],
+    token_budget: int,
+    max_messages: int,
+    overlap: int = 0,
+) -> List[List[int]]:
+    """
+    Pack `rows` (sorted row positions into `messages`) into chunks.
+
+    Each chunk holds at most `max_messages` rows and, unless a single
+    message is larger on its own, at most `token_budget` estimated tokens.
+    The last `overlap` rows of a chunk are repeated at the start of the next
+    one for context. Rows are grouped into segments that must not be cut:
+    a reply and the message it quotes (plus everything in between) form one
+    segment when that span fits the budget. Replies to messages outside that
+    reach bring the quoted message along as context, budget permitting.
+    """
+    if not rows:
+        return []
+
+    tokens = [estimate_message_tokens(messages, row) for row in rows]
+    prefix = [0]
+    for count in tokens:
+        prefix.append(prefix[-1] + count)
+
+    # Link replies to parents by position in `rows` (parents filtered out as
+    # noise simply have no position)
+    position = {row: pos for pos, row in enumerate(rows)}
+    parent_pos: Dict[int, int] = {}
+    for reply, parent in find_reply_parents(messages).items():
+        if reply in position and parent in position:
+            parent_pos[position[reply]] = position[parent]
+
+    # reach[p]: furthest reply that must share a chunk with row position p
+    reach = list(range(len(rows)))
+    for reply, parent in parent_pos.items():
+        span_tokens = prefix[reply + 1] - prefix[parent]
+        if span_tokens <= token_budget and reply - parent < max_messages:
+            reach[parent] = max(reach[parent], reply)
+
+    # Segments: cut only where no bound thread crosses
+    segments: List[range] = []
+    start = 0
+    furthest = 0
+    for pos in range(len(rows)):
+        furthest = max(furthest, reach[pos])
+        if pos == furthest:
+            segments.append(range(start, pos + 1))
+            start = pos + 1
+
+    chunks: List[List[int]] = []
+    members: Set[int] = set()
+    current_tokens = 0
+    carried = 0  # Overlap rows at the head of the current chunk
+
+    def fits(extra_tokens: int, extra_rows: int) -> bool:
+        return (
+            current_tokens + extra_tokens <= token_budget
+            and len(members) + extra_rows <= max_messages
+        )
+
+    def flush():
+        nonlocal members, current_tokens, carried
+        if len(members) > carried:
+            chunk = sorted(members)
+            chunks.append(chunk)
+            tail = chunk[-overlap:] if overlap else []
+            members = set(tail)
+            current_tokens = sum(tokens[p] for p in tail)
+            carried = len(tail)
+
+    for segment in segments:
+        # Chained threads can still exceed the budget; split those greedily
+        pieces = [segment]
+        seg_tokens = prefix[segment.stop] - prefix[segment.start]
+        if seg_tokens > token_budget or len(segment) > max_messages:
+            pieces = [range(pos, pos + 1) for pos in segment]
+
+        for piece in pieces:
+            piece_tokens = prefix[piece.stop] - prefix[piece.start]
+            # Quoted messages that precede the piece travel with it as context
+            quoted = {parent_pos[p] for p in piece if parent_pos.get(p, piece.start) < piece.start}
+
+            if not fits(piece_tokens + sum(tokens[q] for q in quoted - members), len(piece)):
+                flush()
+                if not fits(piece_tokens, len(piece)):
+                    # Drop the carried context rather than overflow
+                    members, current_tokens, carried = set(), 0, 0
+
+            members.update(piece)
+            current_tokens += piece_tokens
+            for parent in sorted(quoted - members):
+                if fits(tokens[parent], 1):
+                    members.add(parent)
+                    current_tokens += tokens[parent]
+
+    flush()
+    return [[rows[pos] for pos in chunk] for chunk in chunks]
+
+
+def chunk_size_stats(messages: MessageTable, chunks: List[List[int]]) -> Dict[str, float]:
+    """Chunk count and size distribution (messages and estimated tokens)."""
+    if not chunks:
+        return {"chunks": 0}
+
+    sizes = sorted(len(chunk) for chunk in chunks)
+    token_sizes = sorted(
+        sum(estimate_message_tokens(messages, row) for row in chunk) for chunk in chunks
+    )
+
+    return {
+        "chunks": len(chunks),
+        "messages_min": sizes[0],
+        "messages_median": statistics.median(sizes),
+        "messages_max": sizes[-1],
+        "tokens_min": token_sizes[0],
+        "tokens_median": statistics.median(token_sizes),
+        "tokens_p90": token_sizes[min(len(token_sizes) - 1, int(0.9 * len(token_sizes)))],
+        "tokens_max": token_sizes[-1],
+        "tokens_total": sum(token_sizes),
+    }
@@ -0,0 +1,219 @@
+"""
+Circuit Breaker Module
+
+Per-model health tracking for the primary/fallback model pair used by
+invoke_with_fallback:
+
+- A rolling window of recent attempts per model. When enough of them fail,
+  or take longer than LLM_BREAKER_SLOW_CALL_SECONDS, the breaker opens and
+  calls go straight to the fallback model for LLM_BREAKER_COOLDOWN_SECONDS.
+  After that it is half-open: one probe call goes to the model while the
+  rest still use the fallback, and the probe's outcome closes the breaker
+  or opens it for another cooldown. A probe that never reports back (e.g.
+  cancelled) is replaced after another cooldown.
+- Recent successful latencies per (model, stage), from which the hedging
+  delay (LLM_HEDGE_PERCENTILE) is taken.
+
+429s are left to the rate limiter and don't count against a model. State is
+per process.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Successful latencies kept per (model, stage) for hedging percentiles
+LATENCY_SAMPLE_SIZE = 200
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of retrying a model whose circuit has opened."""
+
+    def __init__(self, model: str):
+        super().__init__(f"Circuit open for model {model}")
+        self.model = model
+
+
+class CircuitBreaker:
+    """Error/slow-call rate breaker for one model (thread-safe)."""
+
+    def __init__(
+        self,
+        model: str,
+        window: int,
+        min_calls: int,
+        error_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        cooldown: float,
+    ):
+        self.model = model
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None  # Half-open probe in flight since
+        # Metrics
+        self.times_opened = 0
+
+    # -------------------------------------------------------------------------
+    # State
+    # -------------------------------------------------------------------------
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_started = None
+            logger.info(f"Circuit for {self.model} half-open, letting a probe call through")
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        """
+        False while open (route to the fallback model instead). Half-open,
+        True only for the one caller that becomes the probe.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state != HALF_OPEN:
+                return state == CLOSED
+            now = time.monotonic()
+            if self._probe_started is not None and now - self._probe_started < self.cooldown:
+                return False
+            self._probe_started = now
+            return True
+
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def _open(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+        logger.warning(
+            f"Circuit for {self.model} opened ({reason}); "
+            f"routing to fallback for {self.cooldown:.0f}s"
+        )
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN:
+                if failed or slow:
+                    self._open("half-open call " + ("failed" if failed else "was slow"))
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"Circuit for {self.model} closed")
+                self._probe_started = None
+                return
+            if state == OPEN:
+                return  # Stragglers from before the trip
+
+            self._outcomes.append((failed, slow))
+            if len(self._outcomes) < self.min_calls:
+                return
+            total = len(self._outcomes)
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            if failures / total >= self.error_rate:
+                self._open(f"{failures}/{total} recent calls failed")
+            elif slow_calls / total >= self.slow_call_rate:
+                self._open(f"{slow_calls}/{total} recent calls over {self.slow_call_seconds:g}s")
+
+    # -------------------------------------------------------------------------
+    # Outcomes
+    # -------------------------------------------------------------------------
+
+    def record_success(self, latency: float, stage: Optional[str] = None) -> None:
+        if stage:
+            with self._lock:
+                samples = self._latencies.get(stage)
+                if samples is None:
+                    samples = self._latencies[stage] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+                samples.append(latency)
+        self._record(failed=False, slow=latency >= self.slow_call_seconds)
+
+    def record_failure(self) -> None:
+        self._record(failed=True, slow=False)
+
+    def record_abandoned(self, elapsed: float) -> None:
+        """An attempt cancelled by the caller (e.g. a hedge won); only slowness counts."""
+        if elapsed >= self.slow_call_seconds:
+            self._record(failed=False, slow=True)
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_started = None  # No verdict; let the next call probe
+
+    # -------------------------------------------------------------------------
+    # Latency
+    # -------------------------------------------------------------------------
+
+    def latency_percentile(self, stage: str, q: float, min_samples: int) -> Optional[float]:
+        """q-th percentile of recent successful latencies for a stage, if enough were seen."""
+        with self._lock:
+            samples = sorted(self._latencies.get(stage) or ())
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            total = len(self._outcomes)
+            return {
+                "state": state,
+                "recent_calls": total,
+                "recent_failures": sum(1 for f, _ in self._outcomes if f),
+                "recent_slow_calls": sum(1 for _, s in self._outcomes if s),
+                "times_opened": self.times_opened,
+                "latency_samples": {stage: len(s) for stage, s in self._latencies.items()},
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """Get (or create) the process-wide circuit breaker for a model."""
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(
+                model,
+                window=settings.LLM_BREAKER_WINDOW,
+                min_calls=settings.LLM_BREAKER_MIN_CALLS,
+                error_rate=settings.LLM_BREAKER_ERROR_RATE,
+                slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+                slow_call_rate=settings.LLM_BREAKER_SLOW_CALL_RATE,
+                cooldown=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+            )
+        return breaker
+
+
+def get_circuit_breaker_stats() -> Dict[str, Any]:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {model: breaker.stats() for model, breaker in sorted(breakers.items())}
@@ -0,0 +1,326 @@
+"""
+Contact Resolver Module
+
+In-memory index of an org's contacts and their aliases, so matching an
+extracted or user-supplied identity to an existing contact is a dict lookup
+instead of a query. Contacts are indexed by:
+- email: trimmed and lowercased
+- phone: canonical digits (canonical_phone, stored as contacts.phone_digits)
+- name: casefolded, whitespace collapsed (normalize_name)
+- alias: contact_aliases.normalized_alias, e.g. names merged into a contact
+
+Resolvers are loaded once per org (a few paged queries) and cached per
+process for CONTACT_RESOLVER_TTL_SECONDS. Writes made through the app keep
+the cached index current (add, update, add_alias, merge, remove); changes
+made elsewhere are picked up when the entry expires.
+"""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from supabase import Client
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000  # PostgREST's default max rows per response
+MIN_PHONE_DIGITS = 7
+
+# Lookup kinds, in the order resolve() tries them
+EMAIL = "email"
+NAME = "name"
+PHONE = "phone"
+ALIAS = "alias"
+KINDS = (EMAIL, NAME, PHONE, ALIAS)
+
+
+# =============================================================================
+# NORMALIZATION
+# =============================================================================
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    email = (email or "").strip().lower()
+    return email or None
+
+
+def canonical_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    ASCII digits only, without a leading US country code; None if too short
+    to be a number. The database keeps contacts.phone_digits in this form with
+    the SQL function of the same name (migration 011); change both together.
+    """
+    digits = re.sub(r"[^0-9]", "", phone or "")
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) >= MIN_PHONE_DIGITS else None
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Casefolded with whitespace collapsed; also the normalized_alias format."""
+    name = " ".join((name or "").casefold().split())
+    return name or None
+
+
+PHONE_QUERY = re.compile(r"[\d\s().+-]+")
+
+
+def contact_search_filter(query: str) -> str:
+    """
+    PostgREST or_() filter for a free-text contact search. Phone-like
+    queries match the indexed phone_digits column (any formatting); the
+    rest match name, email or phone as substrings.
+    """
+    digits = canonical_phone(query) if PHONE_QUERY.fullmatch(query.strip()) else None
+    if digits:
+        return f"phone_digits.eq.{digits}" if len(digits) >= 10 else f"phone_digits.like.*{digits}*"
+    return f"name.ilike.%{query}%,email.ilike.%{query}%,phone.ilike.%{query}%"
+
+
+_NORMALIZERS = {
+    EMAIL: normalize_email,
+    NAME: normalize_name,
+    PHONE: canonical_phone,
+    ALIAS: normalize_name,
+}
+
+
+# =============================================================================
+# RESOLVER
+# =============================================================================
+
+class ContactResolver:
+    """Lookup index over one org's contacts and aliases (thread-safe)."""
+
+    def __init__(self, org_id: str):
+        self.org_id = org_id
+        self._lock = threading.RLock()
+        self._contacts: Dict[str, Dict[str, Any]] = {}
+        self._index: Dict[str, Dict[str, List[str]]] = {kind: defaultdict(list) for kind in KINDS}
+        self._aliases: Dict[str, set] = defaultdict(set)  # contact id -> normalized aliases
+
+    @classmethod
+    def load(cls, client: Client, org_id: str) -> "ContactResolver":
+        """Build the index from the org's contacts and aliases."""
+        resolver = cls(org_id)
+        start = time.monotonic()
+        contacts = _select_all(lambda: client.table("contacts").select("*").eq("org_id", org_id))
+        aliases = _select_all(
+            lambda: client.table("contact_aliases")
+            .select("contact_id, normalized_alias, contacts!inner(org_id)")
+            .eq("contacts.org_id", org_id)
+        )
+        for row in contacts:
+            resolver.add(row)
+        for alias in aliases:
+            resolver._index_alias(alias["contact_id"], alias.get("normalized_alias"))
+        logger.info(
+            f"Loaded contact resolver for org {org_id}: {len(contacts)} contacts, "
+            f"{len(aliases)} aliases in {time.monotonic() - start:.2f}s"
+        )
+        return resolver
+
+    def __len__(self) -> int:
+        return len(self._contacts)
+
+    def __contains__(self, contact_id: str) -> bool:
+        return contact_id in self._contacts
+
+    # -------------------------------------------------------------------------
+    # Indexing
+    # -------------------------------------------------------------------------
+
+    def _keys(self, row: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+        for kind, key in (
+            (EMAIL, normalize_email(row.get("email"))),
+            (NAME, normalize_name(row.get("name"))),
+            (PHONE, row.get("phone_digits")),
+        ):
+            if key:
+                yield kind, key
+
+    def _link(self, kind: str, key: str, contact_id: str) -> None:
+        ids = self._index[kind][key]
+        if contact_id not in ids:
+            ids.append(contact_id)
+
+    def _unlink(self, kind: str, key: str, contact_id: str) -> None:
+        ids = self._index[kind].get(key)
+        if ids and contact_id in ids:
+            ids.remove(contact_id)
+            if not ids:
+                del self._index[kind][key]
+
+    def _index_alias(self, contact_id: str, alias: Optional[str]) -> None:
+        key = normalize_name(alias)
+        if key and contact_id in self._contacts:
+            self._aliases[contact_id].add(key)
+            self._link(ALIAS, key, contact_id)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Index a contact row (new, or replacing an earlier version)."""
+        if row.get("org_id") not in (None, self.org_id):
+            return
+        with self._lock:
+            if row["id"] in self._contacts:
+                self.remove(row["id"], keep_aliases=True)
+            # Recomputed, so rows from before migration 011 or updates
+            # that only changed phone index the same way
+            row = {**row, "phone_digits": canonical_phone(row.get("phone"))}
+            self._contacts[row["id"]] = row
+            for kind, key in self._keys(row):
+                self._link(kind, key, row["id"])
+            for key in self._aliases.get(row["id"], ()):
+                self._link(ALIAS, key, row["id"])
+
+    def update(self, contact_id: str, changes: Dict[str, Any]) -> None:
+        """Apply a contact update (no-op for contacts not in this org)."""
+        with self._lock:
+            row = self._contacts.get(contact_id)
+            if row is not None:
+                self.add({**row, **changes})
+
+    def add_alias(self, contact_id: str, alias: str) -> None:
+        with self._lock:
+            self._index_alias(contact_id, alias)
+
+    def remove(self, contact_id: str, keep_aliases: bool = False) -> None:
+        with self._lock:
+            row = self._contacts.pop(contact_id, None)
+            if row is None:
+                return
+            for kind, key in self._keys(row):
+                self._unlink(kind, key, contact_id)
+            for key in self._aliases.get(contact_id, ()):
+                self._unlink(ALIAS, key, contact_id)
+            if not keep_aliases:
+                self._aliases.pop(contact_id, None)
+
+    def merge(self, primary_id: str, duplicate_ids: Iterable[str]) -> None:
+        """Fold duplicates into the primary: their names and aliases become its aliases."""
+        with self._lock:
+            for dup_id in duplicate_ids:
+                row = self._contacts.get(dup_id)
+                if row is None:
+                    continue
+                aliases = set(self._aliases.get(dup_id, ()))
+                self.remove(dup_id)
+                if row.get("name"):
+                    self._index_alias(primary_id, row["name"])
+                for alias in aliases:
+                    self._index_alias(primary_id, alias)
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    def get(self, contact_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._contacts.get(contact_id)
+            return dict(row) if row else None
+
+    def find(self, kind: str, value: Optional[str]) -> List[Dict[str, Any]]:
+        """All contacts whose `kind` key matches value, oldest index entry first."""
+        key = _NORMALIZERS[kind](value)
+        if not key:
+            return []
+        with self._lock:
+            return [dict(self._contacts[cid]) for cid in self._index[kind].get(key, ())]
+
+    def lookup(self, kind: str, value: Optional[str]) -> Optional[Dict[str, Any]]:
+        """First contact whose `kind` key matches value."""
+        matches = self.find(kind, value)
+        return matches[0] if matches else None
+
+    def resolve(
+        self,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Best match: by email, then name, then phone, then alias of the name."""
+        for kind, value in ((EMAIL, email), (NAME, name), (PHONE, phone), (ALIAS, name)):
+            row = self.lookup(kind, value)
+            if row:
+                return row
+        return None
+
+    def search_names(self, fragment: str, limit: int) -> List[Dict[str, Any]]:
+        """Contacts whose normalized name or an alias contains fragment."""
+        needle = normalize_name(fragment)
+        if not needle:
+            return []
+        found: Dict[str, None] = {}  # Ordered set of contact ids
+        with self._lock:
+            for kind in (NAME, ALIAS):
+                for key, ids in self._index[kind].items():
+                    if needle in key:
+                        found.update(dict.fromkeys(ids))
+                        if len(found) >= limit:
+                            break
+            return [dict(self._contacts[cid]) for cid in list(found)[:limit]]
+
+
+def _select_all(build_query) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = build_query().range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+# =============================================================================
+# PER-ORG CACHE
+# =============================================================================
+
+_resolvers: Dict[str, Tuple[float, ContactResolver]] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_contact_resolver(client: Client, org_id: str) -> ContactResolver:
+    """The org's cached resolver, (re)loaded when missing or expired."""
+    with _resolvers_lock:
+        entry = _resolvers.get(org_id)
+        if entry and time.monotonic() - entry[0] < settings.CONTACT_RESOLVER_TTL_SECONDS:
+            return entry[1]
+    resolver = ContactResolver.load(client, org_id)
+    with _resolvers_lock:
+        _resolvers[org_id] = (time.monotonic(), resolver)
+    return resolver
+
+
+def cached_contact_resolvers() -> List[ContactResolver]:
+    """Resolvers currently cached (expired ones included; they are dropped on next use)."""
+    with _resolvers_lock:
+        return [resolver for _, resolver in _resolvers.values()]
+
+
+def note_contact_update(contact_id: str, changes: Dict[str, Any]) -> None:
+    """Apply a contact update made outside a resolver to the cached ones."""
+    for resolver in cached_contact_resolvers():
+        if contact_id in resolver:
+            resolver.update(contact_id, changes)
+
+
+def note_contact_merge(primary_id: str, duplicate_ids: Iterable[str], changes: Dict[str, Any]) -> None:
+    """Apply a merge (duplicates folded into the primary, then updated) to the cached resolvers."""
+    duplicate_ids = list(duplicate_ids)
+    for resolver in cached_contact_resolvers():
+        if primary_id in resolver:
+            resolver.merge(primary_id, duplicate_ids)
+            resolver.update(primary_id, changes)
+
+
+def invalidate_contact_resolver(org_id: Optional[str] = None) -> None:
+    """Drop one org's cached resolver (or all of them)."""
+    with _resolvers_lock:
+        if org_id is None:
+            _resolvers.clear()
+        else:
+            _resolvers.pop(org_id, None)
@@ -4,37 +4,56 @@ Extraction Graph Module
 This module implements a LangGraph-based pipeline for extracting data from
 meeting transcripts. The graph processes transcripts through multiple stages:
 
-1. Parse & Chunk - Split transcript into manageable chunks
-2. Map Extraction - Parallel LLM analysis of each chunk
-3. Summarize - Generate meeting summary
-4. Deduplicate & Finalize - Merge results and validate
+1. Parse - Read transcript into a columnar message table
+2. Noise Filter - Drop obvious noise before any LLM call
+3. Chunk - Pack remaining messages into token-budgeted, thread-aware chunks
+4. Map Extraction - Parallel LLM analysis of each chunk; services are
+   deduplicated and validated in batches as chunk results arrive, and the
+   per-chunk digests are reduced into the meeting summary
+5. Deduplicate & Finalize - Merge profiles and build the final output
 
 Features:
-- Checkpointing for fault tolerance and resumption
+- Durable SQLite checkpoints per chat: an interrupted run resumes after the
+  last completed node, and map_extraction skips chunks already analyzed
+- Map-reduce summary covering the whole meeting (no full-transcript pass)
 - Parallel chunk processing with asyncio
 - Rate-limited LLM calls via llm_factory
+- Per-node wall-clock timings in logs and in the final state
 """
 import asyncio
+import functools
+import io
+import itertools
 import logging
+import time
 import uuid
-from typing import Dict, List, Any, TypedDict, Optional
+from typing import Annotated, Awaitable, Callable, Dict, List, Any, Tuple, TypedDict, Optional
 
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import InMemorySaver
 
+from app.services.cache_store import content_key
+from app.services.checkpoints import get_progress_store, open_checkpointer, prune_expired_threads
+from app.services.chunking import build_chunks, chunk_size_stats
 from app.services.hybrid_extraction import (
-    CleanedMessage, 
+    MessageTable,
     ExtractedMeetingData, 
     IntentAnalysis, 
+    PartialIntentAnalysis,
     MeetingSummary, 
     ExtractedContact, 
     ExtractedService,
     ExtractedProfile,
-    parse_transcript_lines, 
+    build_message_table,
     extract_hard_contact_info, 
     analyze_chunk, 
-    extract_summary_with_llm, 
-    validate_services
+    is_obvious_noise,
+    ANALYZE_CHUNK_PROMPT_VERSION,
+    chunk_digest,
+    summarize_chunk_digests,
+    validate_service_batch,
+    VALIDATION_BATCH_SIZE,
 )
 from app.core.config import settings
 
@@ -45,7 +64,8 @@ logger = logging.getLogger(__name__)
 # CONFIGURATION
 # =============================================================================
 
-CHUNK_SIZE = 50
+# Token budget and message cap per chunk come from settings
+# (EXTRACTION_CHUNK_TOKEN_BUDGET / EXTRACTION_CHUNK_MAX_MESSAGES)
 CHUNK_OVERLAP = 5  # Overlap to avoid missing context at boundaries
 
 
@@ -53,129 +73,308 @@ CHUNK_OVERLAP = 5  # Overlap to avoid missing context at boundaries
 # STATE DEFINITION
 # =============================================================================
 
+def merge_timings(current: Dict[str, float], update: Dict[str, float]) -> Dict[str, float]:
+    """Reducer for node_timings: each node adds its own entry."""
+    return {**current, **update}
+
+
 class PipelineState(TypedDict):
     """State maintained throughout the extraction pipeline."""
+    thread_id: str
     transcript: str
-    raw_messages: List[CleanedMessage]
-    chunks: List[List[CleanedMessage]]
+    messages: MessageTable
+    chunks: List[List[int]]  # Row positions into `messages`
     chunk_results: List[IntentAnalysis]
+    validated_services: List[ExtractedService]  # Deduplicated, validated during map_extraction
+    prefiltered_noise_ids: List[int]
+    noise_filter_stats: Dict[str, int]
+    chunk_stats: Dict[str, float]
     summary_result: MeetingSummary
     final_data: Optional[ExtractedMeetingData]
+    node_timings: Annotated[Dict[str, float], merge_timings]  # Seconds per node
 
 
 # =============================================================================
 # GRAPH NODES
 # =============================================================================
 
-async def parse_and_chunk_node(state: PipelineState) -> Dict[str, Any]:
+NodeFn = Callable[[PipelineState], Awaitable[Dict[str, Any]]]
+
+
+def timed_node(name: str, node: NodeFn) -> NodeFn:
+    """Wrap a node so its wall-clock time is logged and recorded in node_timings."""
+    @functools.wraps(node)
+    async def wrapper(state: PipelineState) -> Dict[str, Any]:
+        start = time.perf_counter()
+        update = await node(state)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Node '{name}' finished in {elapsed:.2f}s")
+        return {**update, "node_timings": {name: round(elapsed, 3)}}
+    return wrapper
+
+
+async def parse_node(state: PipelineState) -> Dict[str, Any]:
     """
-    Parses transcript and creates chunks with overlap.
+    Parses transcript into a MessageTable.
     Runs heavy parsing in thread to avoid blocking event loop.
     """
     text = state["transcript"]
     logger.info("Parsing transcript...")
-    
-    def parse_logic():
-        raw_messages = parse_transcript_lines(text)
-        
-        if not raw_messages:
-            return {"raw_messages": [], "chunks": []}
-            
-        # Create chunks with overlap for context continuity
-        chunks = []
-        total_msgs = len(raw_messages)
-        
-        if total_msgs <= CHUNK_SIZE:
-            chunks.append(raw_messages)
-        else:
-            start = 0
-            while start < total_msgs:
-                end = min(start + CHUNK_SIZE, total_msgs)
-                chunks.append(raw_messages[start:end])
-                
-                if end >= total_msgs:
-                    break
-                    
-                # Advance by (CHUNK_SIZE - OVERLAP) for overlapping windows
-                start += (CHUNK_SIZE - CHUNK_OVERLAP)
-                
-        return {"raw_messages": raw_messages, "chunks": chunks}
 
-    result = await asyncio.to_thread(parse_logic)
-    logger.info(f"Created {len(result['chunks'])} chunks from {len(result['raw_messages'])} messages.")
-    return result
+    messages = await asyncio.to_thread(build_message_table, io.StringIO(text))
+    logger.info(f"Parsed {len(messages)} messages.")
+    return {"messages": messages}
+
+
+async def noise_filter_node(state: PipelineState) -> Dict[str, Any]:
+    """
+    Drops obvious noise (greetings, reactions, emoji-only, poll answers,
+    empty reply stubs) before any LLM call. Removed messages are marked as
+    noise for the final transcript and never reach the chunker.
+    """
+    messages = state["messages"]
+
+    noise_rows = [i for i in range(len(messages)) if is_obvious_noise(messages.message(i))]
+
+    stats = {
+        "messages_total": len(messages),
+        "messages_removed": len(noise_rows),
+        "chars_removed": sum(messages.message_length(i) for i in noise_rows),
+    }
+    logger.info(
+        f"Noise filter removed {stats['messages_removed']}/{stats['messages_total']} messages "
+        f"({stats['chars_removed']} prompt chars skipped)"
+    )
+    return {
+        "prefiltered_noise_ids": [messages.message_id(i) for i in noise_rows],
+        "noise_filter_stats": stats,
+    }
+
+
+async def chunk_node(state: PipelineState) -> Dict[str, Any]:
+    """
+    Packs the messages that survived the noise filter into chunks of up to
+    EXTRACTION_CHUNK_TOKEN_BUDGET estimated tokens, keeping reply threads
+    together, and reports the resulting size distribution.
+    """
+    messages = state["messages"]
+    noise_ids = set(state["prefiltered_noise_ids"])
+
+    def chunk_logic():
+        rows = [i for i in range(len(messages)) if messages.message_id(i) not in noise_ids]
+        chunks = build_chunks(
+            messages,
+            rows,
+            token_budget=settings.EXTRACTION_CHUNK_TOKEN_BUDGET,
+            max_messages=settings.EXTRACTION_CHUNK_MAX_MESSAGES,
+            overlap=CHUNK_OVERLAP,
+        )
+        return chunks, chunk_size_stats(messages, chunks)
+
+    chunks, stats = await asyncio.to_thread(chunk_logic)
+    if chunks:
+        logger.info(
+            f"Created {stats['chunks']} chunks from {len(messages) - len(noise_ids)} messages "
+            f"(messages/chunk min {stats['messages_min']}, median {stats['messages_median']}, "
+            f"max {stats['messages_max']}; est. tokens/chunk min {stats['tokens_min']}, "
+            f"median {stats['tokens_median']}, p90 {stats['tokens_p90']}, max {stats['tokens_max']})"
+        )
+    else:
+        logger.info("No messages left to chunk.")
+    return {"chunks": chunks, "chunk_stats": stats}
+
+
+def service_dedupe_key(svc: ExtractedService) -> str:
+    """Key under which services from different chunks count as duplicates."""
+    return f"{svc.type}|{svc.contact_name}|{svc.description[:50]}"
 
 
 async def extraction_map_node(state: PipelineState) -> Dict[str, Any]:
     """
-    Runs extraction on all chunks in parallel.
-    Uses asyncio.gather for concurrent processing with rate limiting
-    handled by the LLM factory.
+    Runs extraction on all chunks in parallel and validates services as
+    chunk results arrive.
+
+    Of the services sharing a dedupe key, the copy from the earliest
+    (chunk, position) is kept, whatever order the chunks finish in. A copy
+    is queued for validation as soon as it is the earliest seen for its key
+    (while the chunk's response is still streaming in). Streamed copies are
+    provisional: once a chunk's result is in, they are replaced by the
+    result's services (none if the chunk failed). Every full batch
+    (VALIDATION_BATCH_SIZE) goes to the relevance validator immediately,
+    concurrently with the remaining chunks. Only the final partial batch is
+    left once the last chunk finishes.
+    Once all chunks are in, their digests are reduced into the meeting
+    summary while that last batch is validated.
+    Rate limiting for all stages is handled by the LLM factory.
+
+    Each analyzed chunk is recorded in the checkpoint store, so if the run
+    is interrupted, the resumed step only analyzes the missing chunks.
     """
+    messages = state["messages"]
     chunks = state["chunks"]
+    thread_id = state["thread_id"]
     
     if not chunks:
-        return {"chunk_results": []}
+        return {
+            "chunk_results": [],
+            "validated_services": [],
+            "summary_result": await summarize_chunk_digests([]),
+        }
 
     logger.info(f"Starting parallel extraction for {len(chunks)} chunks...")
-    
-    # Create tasks for parallel execution
-    # Rate limiting is handled internally by llm_factory
-    tasks = [analyze_chunk(chunk, i) for i, chunk in enumerate(chunks)]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    valid_results = []
-    for i, res in enumerate(results):
-        if isinstance(res, Exception):
-            logger.error(f"Chunk {i} extraction failed: {res}")
-        elif isinstance(res, IntentAnalysis):
-            valid_results.append(res)
-        else:
-            logger.warning(f"Chunk {i} returned unexpected type: {type(res)}")
-            
-    logger.info(f"Extraction complete: {len(valid_results)}/{len(chunks)} chunks succeeded")
-    return {"chunk_results": valid_results}
 
+    progress = get_progress_store()
+    completed = await asyncio.to_thread(progress.load_chunks, thread_id) if progress else {}
+    chunk_keys = [
+        content_key(ANALYZE_CHUNK_PROMPT_VERSION, settings.LLM_MODEL, [messages.message_id(r) for r in chunk])
+        for chunk in chunks
+    ]
+    resumed = {
+        i: IntentAnalysis.model_validate_json(completed[i][1])
+        for i in range(len(chunks))
+        if i in completed and completed[i][0] == chunk_keys[i]
+    }
+    if resumed:
+        logger.info(f"Resuming extraction: {len(resumed)}/{len(chunks)} chunks already analyzed")
+
+    results: List[Any] = [None] * len(chunks)
+    # Every copy of each service: {dedupe key: {(chunk, position): service}}
+    copies: Dict[str, Dict[Tuple[int, int], ExtractedService]] = {}
+    streamed: Dict[int, List[Tuple[str, Tuple[int, int]]]] = {}  # Chunk -> (key, order) of streamed copies
+    submitted = set()  # Services (as JSON) sent for validation; identical copies share a verdict
+    pending: List[ExtractedService] = []
+    validation_tasks: List[asyncio.Task] = []
+
+    def launch_validation(batch: List[ExtractedService]):
+        async def validate(batch_number: int):
+            kept = await validate_service_batch(batch, f"#{batch_number}")
+            return [svc.model_dump_json() for svc in kept]
+        validation_tasks.append(asyncio.create_task(validate(len(validation_tasks) + 1)))
+
+    def queue_service(order: Tuple[int, int], svc: ExtractedService) -> str:
+        key = service_dedupe_key(svc)
+        versions = copies.setdefault(key, {})
+        versions[order] = svc
+        content = svc.model_dump_json()
+        if min(versions) != order or content in submitted:
+            return key  # An earlier copy wins, or this one was already sent
+        submitted.add(content)
+        pending.append(svc)
+        if len(pending) >= VALIDATION_BATCH_SIZE:
+            launch_validation(pending[:VALIDATION_BATCH_SIZE])
+            del pending[:VALIDATION_BATCH_SIZE]
+        return key
+
+    def streamed_services(i: int):
+        # Retried or failed-over attempts stream again; positions just keep counting
+        positions = itertools.count()
+        def on_service(svc: ExtractedService):
+            order = (i, next(positions))
+            streamed.setdefault(i, []).append((queue_service(order, svc), order))
+        return on_service
+
+    def settle_chunk(i: int, res: Any):
+        """Replace chunk i's streamed copies with the services of its result."""
+        touched = set()
+        for key, order in streamed.pop(i, []):
+            copies[key].pop(order, None)
+            touched.add(key)
+        if isinstance(res, IntentAnalysis):
+            for position, svc in enumerate(res.services):
+                queue_service((i, position), svc)
+        for key in touched:
+            versions = copies[key]
+            if not versions:
+                del copies[key]
+            else:
+                # A withdrawn copy may have led; make sure the new earliest is sent
+                queue_service(min(versions), versions[min(versions)])
+
+    async def run_chunk(i: int, chunk: List[int]):
+        if i in resumed:
+            return i, resumed[i]
+        try:
+            res = await analyze_chunk(messages.view(chunk), i, on_service=streamed_services(i))
+        except Exception as e:
+            return i, e
+        # A partial result is used for this run only; a resumed run retries the chunk
+        if progress and isinstance(res, IntentAnalysis) and not isinstance(res, PartialIntentAnalysis):
+            await asyncio.to_thread(
+                progress.save_chunk, thread_id, i, chunk_keys[i], res.model_dump_json()
+            )
+        return i, res
 
-async def summary_node(state: PipelineState) -> Dict[str, Any]:
-    """Generates meeting summary."""
-    text = state["transcript"]
-    logger.info("Generating summary...")
-    summary = await extract_summary_with_llm(text)
-    return {"summary_result": summary}
+    # Rate limiting is handled internally by llm_factory
+    chunk_tasks = [asyncio.create_task(run_chunk(i, chunk)) for i, chunk in enumerate(chunks)]
+    try:
+        for finished in asyncio.as_completed(chunk_tasks):
+            i, res = await finished
+            results[i] = res
+            settle_chunk(i, res)
+
+        if pending:
+            launch_validation(pending)
+
+        valid_results = []
+        for i, res in enumerate(results):
+            if isinstance(res, Exception):
+                logger.error(f"Chunk {i} extraction failed: {res}")
+            elif res is None:
+                logger.error(f"Chunk {i} extraction failed")
+            elif isinstance(res, IntentAnalysis):
+                valid_results.append(res)
+            else:
+                logger.warning(f"Chunk {i} returned unexpected type: {type(res)}")
+                
+        logger.info(f"Extraction complete: {len(valid_results)}/{len(chunks)} chunks succeeded")
+
+        # Reduce digests (in meeting order) while in-flight validation finishes
+        wait_start = time.perf_counter()
+        digests = [d for d in (chunk_digest(res) for res in valid_results) if d is not None]
+        summary, batches = await asyncio.gather(
+            summarize_chunk_digests(digests),
+            asyncio.gather(*validation_tasks),
+        )
+    finally:
+        # Only left running if this node was cancelled or failed
+        for task in (*chunk_tasks, *validation_tasks):
+            task.cancel()
+
+    # The earliest copy of each service, in chunk order, if the validator kept it
+    kept = {content for batch in batches for content in batch}
+    earliest = sorted((min(versions), versions[min(versions)]) for versions in copies.values())
+    validated = [svc for _, svc in earliest if svc.model_dump_json() in kept]
+    logger.info(
+        f"Validation complete: {len(validated)}/{len(copies)} services kept "
+        f"({len(validation_tasks)} batches, {time.perf_counter() - wait_start:.2f}s after last chunk)"
+    )
+    return {
+        "chunk_results": valid_results,
+        "validated_services": validated,
+        "summary_result": summary,
+    }
 
 
 async def deduplicate_and_finalize_node(state: PipelineState) -> Dict[str, Any]:
     """
     Merges results from all chunks:
-    - Deduplicates services
     - Merges rich contact profiles
     - Extracts hard contact info (regex fallback)
-    - Runs validation
-    - Builds final output
+    - Builds final output from the services validated during extraction
     """
-    raw_messages = state["raw_messages"]
+    messages = state["messages"]
     chunk_results = state["chunk_results"]
+    validated_services = state["validated_services"]
     summary = state["summary_result"]
     
     logger.info("Deduplicating and finalizing results...")
     
     def finalize_logic():
-        # 1. Merge all services with deduplication
-        all_services = []
-        seen_service_hashes = set()
-        
-        # 2. Merge Rich Profiles
+        # 1. Merge Rich Profiles (services were deduplicated and validated
+        # while chunks were still running)
         profiles_map: Dict[str, ExtractedProfile] = {}
         
         for res in chunk_results:
-            # Services
-            for svc in res.services:
-                svc_id = f"{svc.type}|{svc.contact_name}|{svc.description[:50]}"
-                if svc_id not in seen_service_hashes:
-                    all_services.append(svc)
-                    seen_service_hashes.add(svc_id)
-            
             # Profiles - Merge logic
             for prof in res.profiles:
                 if prof.name not in profiles_map:
@@ -218,18 +417,13 @@ async def deduplicate_and_finalize_node(state: PipelineState) -> Dict[str, Any]:
                             # Ideally we merge, but buy box is complex.
                             existing.buy_box = prof.buy_box
 
-        # 3. Extract hard contact info (regex-based)
-        contacts_map = extract_hard_contact_info(raw_messages)
+        # 2. Extract hard contact info (regex-based)
+        contacts_map = extract_hard_contact_info(messages)
         
-        return all_services, contacts_map, profiles_map
+        return contacts_map, profiles_map
 
     # Run CPU-bound operations in thread
-    all_services, contacts_map, profiles_map = await asyncio.to_thread(finalize_logic)
-    
-    # Validation uses LLM - must be awaited outside thread
-    logger.info(f"Running Relevancy Validator on {len(all_services)} services...")
-    validated_services = await validate_services(all_services)
-    logger.info(f"Validation complete: {len(validated_services)} services kept")
+    contacts_map, profiles_map = await asyncio.to_thread(finalize_logic)
     
     def build_final_data():
         # Build final contact list
@@ -281,18 +475,20 @@ async def deduplicate_and_finalize_node(state: PipelineState) -> Dict[str, Any]:
                 if ai_profile:
                     final_profiles.append(ai_profile)
                 
-        # Filter noise from transcript
-        all_noise_ids = set()
+        # Filter noise from transcript (pre-filtered + LLM-flagged)
+        all_noise_ids = set(state["prefiltered_noise_ids"])
         for res in chunk_results:
             all_noise_ids.update(res.noise_message_ids)
             
-        final_transcript = [m for m in raw_messages if m.id not in all_noise_ids]
+        final_transcript = messages.take(
+            i for i in range(len(messages)) if messages.message_id(i) not in all_noise_ids
+        )
         
         return ExtractedMeetingData(
             contacts=final_contacts,
             services=validated_services,
             summary=summary,
-            cleaned_transcript=final_transcript,
+            transcript=final_transcript,
             profiles=final_profiles
         )
 
@@ -309,43 +505,35 @@ async def deduplicate_and_finalize_node(state: PipelineState) -> Dict[str, Any]:
 # GRAPH CONSTRUCTION
 # =============================================================================
 
-# Singleton checkpointer for development
-# TODO: Replace with PostgresSaver for production persistence
-_checkpointer = InMemorySaver()
-
-
-def build_extraction_graph():
+def build_extraction_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
     """
     Builds the extraction pipeline graph.
     
     Flow:
-    parse_chunk -> map_extraction -> summarize -> deduplicate -> END
+    parse -> noise_filter -> chunk -> map_extraction -> deduplicate -> END
     """
     workflow = StateGraph(PipelineState)
     
     # Add nodes
-    workflow.add_node("parse_chunk", parse_and_chunk_node)
-    workflow.add_node("map_extraction", extraction_map_node)
-    workflow.add_node("summarize", summary_node)
-    workflow.add_node("deduplicate", deduplicate_and_finalize_node)
+    nodes = {
+        "parse": parse_node,
+        "noise_filter": noise_filter_node,
+        "chunk": chunk_node,
+        "map_extraction": extraction_map_node,
+        "deduplicate": deduplicate_and_finalize_node,
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, timed_node(name, node))
     
-    # Set entry point
-    workflow.set_entry_point("parse_chunk")
-    
-    # Define linear flow
-    # Note: Summary and Extraction could run in parallel, but sequential
-    # is simpler and the performance impact is minimal vs extraction time
-    workflow.add_edge("parse_chunk", "map_extraction")
-    workflow.add_edge("map_extraction", "summarize") 
-    workflow.add_edge("summarize", "deduplicate")
+    workflow.add_edge(START, "parse")
+    workflow.add_edge("parse", "noise_filter")
+    workflow.add_edge("noise_filter", "chunk")
+    workflow.add_edge("chunk", "map_extraction")
+    workflow.add_edge("map_extraction", "deduplicate")
     workflow.add_edge("deduplicate", END)
     
     # Compile with checkpointer for fault tolerance
-    return workflow.compile(checkpointer=_checkpointer)
-
-
-# Singleton compiled graph
-extraction_app = build_extraction_graph()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 async def run_extraction_pipeline(
@@ -357,8 +545,10 @@ async def run_extraction_pipeline(
     
     Args:
         transcript: Raw meeting transcript text
-        thread_id: Optional unique ID for checkpointing. If not provided,
-                   a new UUID is generated.
+        thread_id: Optional unique ID for checkpointing (use one per chat).
+                   If the last run on this thread was interrupted while
+                   processing the same transcript, it is resumed. If not
+                   provided, a new UUID is generated.
     
     Returns:
         ExtractedMeetingData containing contacts, services, summary,
@@ -369,19 +559,65 @@ async def run_extraction_pipeline(
         thread_id = str(uuid.uuid4())
     
     initial_state = PipelineState(
+        thread_id=thread_id,
         transcript=transcript, 
-        raw_messages=[], 
+        messages=MessageTable(),
         chunks=[], 
         chunk_results=[], 
+        validated_services=[],
+        prefiltered_noise_ids=[],
+        noise_filter_stats={},
+        chunk_stats={},
         summary_result=MeetingSummary(summary="", key_topics=[]), 
-        final_data=None
+        final_data=None,
+        node_timings={},
     )
     
     # Config with thread_id for checkpointing
     config = {"configurable": {"thread_id": thread_id}}
     
+    progress = get_progress_store()
+    if progress is None:
+        # Checkpoints disabled: nothing outlives the run
+        app = build_extraction_graph(InMemorySaver())
+        return await _invoke_graph(app, initial_state, config, thread_id)
+
+    transcript_key = content_key(transcript)
+    async with open_checkpointer() as checkpointer:
+        if checkpointer is None:
+            # Checkpoint file unusable (logged): this run can't be resumed
+            app = build_extraction_graph(InMemorySaver())
+            resume = False
+        else:
+            await prune_expired_threads(checkpointer)
+            app = build_extraction_graph(checkpointer)
+            previous = await asyncio.to_thread(progress.get_thread, thread_id)
+            resume = (
+                previous is not None
+                and previous["status"] == "running"
+                and previous["transcript_key"] == transcript_key
+                and bool((await app.aget_state(config)).next)
+            )
+        await asyncio.to_thread(progress.start_thread, thread_id, transcript_key, resume)
+        if resume:
+            # None input continues the interrupted run from its last checkpoint
+            logger.info(f"Resuming interrupted extraction (thread_id={thread_id})")
+            final_data = await _invoke_graph(app, None, config, thread_id)
+        else:
+            final_data = await _invoke_graph(app, initial_state, config, thread_id)
+
+        await asyncio.to_thread(progress.finish_thread, thread_id)
+    return final_data
+
+
+async def _invoke_graph(app, graph_input: Optional[PipelineState], config: Dict[str, Any], thread_id: str) -> ExtractedMeetingData:
     logger.info(f"Starting extraction pipeline (thread_id={thread_id})")
-    result = await extraction_app.ainvoke(initial_state, config=config)
-    logger.info(f"Extraction pipeline complete (thread_id={thread_id})")
+    start = time.perf_counter()
+    result = await app.ainvoke(graph_input, config=config)
+    timings = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in result["node_timings"].items())
+    logger.info(
+        f"Extraction pipeline complete (thread_id={thread_id}) in "
+        f"{time.perf_counter() - start:.2f}s [{timings}]"
+    )
     
     return result["final_data"]
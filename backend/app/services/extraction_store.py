@@ -0,0 +1,247 @@
+"""
+Extraction Store Module
+
+Saves an extraction result (ExtractedMeetingData) for one meeting chat:
+the digest and transcript, contacts, services and AI profile fields.
+
+The save is set-based rather than per row:
+- Contacts are matched in memory against the org's ContactResolver
+  (email -> name -> phone -> alias), which is loaded once per org and kept
+  current with the contacts created and updated here.
+- New contacts and services are written with one bulk insert each (per
+  WRITE_BATCH_SIZE rows). Contacts that would end up without a service
+  are never created, instead of being created and deleted again.
+- Services are deduplicated by content hash (service_content_hash, kept
+  in services.content_hash by migration 012): in memory within the
+  extraction, and against saved rows (a reprocess) by the unique index,
+  with ON CONFLICT DO NOTHING on the bulk insert.
+- Inferred and extracted profile fields go through ProfileMerge: one
+  fetch of the existing profiles, merged in memory, bulk writes.
+
+Every PostgREST request is counted and the total is logged per meeting.
+"""
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from supabase import Client
+
+from app.services.contact_resolver import (
+    ALIAS,
+    EMAIL,
+    NAME,
+    PHONE,
+    ContactResolver,
+    get_contact_resolver,
+    invalidate_contact_resolver,
+)
+from app.services.hybrid_extraction import ExtractedMeetingData
+from app.services.profile_inference import infer_profile_from_services
+from app.services.profile_merge import ProfileMerge
+from app.services.round_trips import RoundTrips
+
+logger = logging.getLogger(__name__)
+
+SERVICE_HASH_PREFIX_LENGTH = 50  # Leading description characters in a service's content hash
+
+
+# =============================================================================
+# SERVICE CONTENT HASH
+# =============================================================================
+
+_WHITESPACE = re.compile(r"[ \t\n\r\f\v]+")  # Postgres regex \s
+
+
+def service_content_hash(
+    chat_id: Optional[str],
+    contact_id: Optional[str],
+    service_type: Optional[str],
+    description: Optional[str],
+) -> str:
+    """
+    Duplicate key of a service: sha256 over chat, contact, type and the
+    first SERVICE_HASH_PREFIX_LENGTH characters of the description (trimmed,
+    whitespace collapsed, lowercased). The database fills services.content_hash
+    with the SQL function of the same name (migration 012); change both together.
+    """
+    text = _WHITESPACE.sub(" ", description or "").strip(" ").lower()[:SERVICE_HASH_PREFIX_LENGTH]
+    key = "|".join((chat_id or "", contact_id or "", service_type or "", text))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# SAVE
+# =============================================================================
+
+def save_extraction_results(
+    client: Client,
+    chat_id: str,
+    user_id: str,
+    org_id: str,
+    data: ExtractedMeetingData,
+) -> Dict[str, str]:
+    """
+    Persist an extraction result for a chat. Returns contact name -> contact
+    id for the matched and created contacts (skipped orphans are left out).
+    """
+    db = RoundTrips(client)
+
+    # 1. Meeting chat digest & transcript
+    try:
+        db.execute(client.table("meeting_chats").update({
+            "digest_bullets": data.summary.model_dump(),
+            "cleaned_transcript": data.transcript.to_records()
+        }).eq("id", chat_id))
+    except Exception as e:
+        logger.error(f"Failed to update meeting_chat {chat_id}: {e}")
+        raise e
+
+    resolver = get_contact_resolver(client, org_id)
+    try:
+        return _save_contacts_and_services(db, resolver, chat_id, user_id, org_id, data)
+    except Exception:
+        # The resolver may already hold contacts that were never written
+        invalidate_contact_resolver(org_id)
+        raise
+
+
+def _save_contacts_and_services(
+    db: RoundTrips,
+    resolver: ContactResolver,
+    chat_id: str,
+    user_id: str,
+    org_id: str,
+    data: ExtractedMeetingData,
+) -> Dict[str, str]:
+    client = db.client
+
+    # 2. Match contacts in memory. New ones are kept pending (under
+    # placeholder ids) until they get a service
+    pending = ContactResolver(org_id)
+    pending_ids: List[str] = []
+    contact_updates: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    name_to_id: Dict[str, str] = {}
+
+    def match(name: str, email: Optional[str] = None, phone: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        for kind, value in ((EMAIL, email), (NAME, name), (PHONE, phone), (ALIAS, name)):
+            row = resolver.lookup(kind, value) or pending.lookup(kind, value)
+            if row:
+                return row
+        return None
+
+    def create(name: str, email: Optional[str] = None, phone: Optional[str] = None) -> str:
+        contact_id = f"pending-{len(pending_ids)}"
+        pending.add({"id": contact_id, "user_id": user_id, "org_id": org_id,
+                     "name": name, "email": email, "phone": phone})
+        pending_ids.append(contact_id)
+        return contact_id
+
+    for contact in data.contacts:
+        row = match(contact.name, contact.email, contact.phone)
+        if row is None:
+            name_to_id[contact.name] = create(contact.name, contact.email, contact.phone)
+            continue
+        # Fill fields missing in DB but present in extraction
+        fills = {f: getattr(contact, f) for f in ("email", "phone") if getattr(contact, f) and not row.get(f)}
+        if fills:
+            if row["id"] in pending:
+                pending.update(row["id"], fills)
+            else:
+                contact_updates[row["id"]].update(fills)
+                resolver.update(row["id"], fills)
+        name_to_id[contact.name] = row["id"]
+
+    # 3. Services: attach to contacts, skip ones already saved for this chat
+    service_rows = []
+    for service in data.services:
+        contact_id = name_to_id.get(service.contact_name)
+        if contact_id is None:
+            # LLM may have returned a name not in the regex contacts
+            row = match(service.contact_name)
+            contact_id = row["id"] if row else create(service.contact_name)
+            name_to_id[service.contact_name] = contact_id
+        service_rows.append((contact_id, service))
+
+    for contact_id, updates in contact_updates.items():
+        db.execute(client.table("contacts").update(updates).eq("id", contact_id))
+
+    used = {contact_id for contact_id, _ in service_rows}
+    new_ids = [pid for pid in pending_ids if pid in used]
+    saved_ids: Dict[str, str] = {}
+    if new_ids:
+        rows = [{k: v for k, v in pending.get(pid).items() if k != "id"} for pid in new_ids]
+        for pid, saved in zip(new_ids, db.insert("contacts", rows)):
+            saved_ids[pid] = saved["id"]
+            resolver.add(saved)
+    orphans = len(pending_ids) - len(new_ids)
+
+    # Duplicates within this extraction are dropped here, ones saved by an
+    # earlier run of the chat by the unique index on content_hash (set by
+    # the database)
+    seen = set()
+    new_services = []
+    for contact_id, service in service_rows:
+        contact_id = saved_ids.get(contact_id, contact_id)
+        content_hash = service_content_hash(chat_id, contact_id, service.type, service.description)
+        if content_hash in seen:
+            continue
+        seen.add(content_hash)
+        new_services.append({
+            "user_id": user_id,
+            "contact_id": contact_id,
+            "org_id": org_id,
+            "meeting_chat_id": chat_id,
+            "type": service.type,
+            "description": service.description,
+            "links": service.links
+        })
+    inserted_services = db.insert("services", new_services, skip_conflicts_on="content_hash")
+
+    contact_name_to_id = {
+        name: saved_ids.get(cid, cid) for name, cid in name_to_id.items() if cid not in pending or cid in saved_ids
+    }
+
+    # 4. Profiles: regex inference (empty fields only), then extracted rich profiles
+    services_by_name = defaultdict(list)
+    for service in data.services:
+        services_by_name[service.contact_name].append({"type": service.type, "description": service.description})
+    roles_by_name = {}
+    for contact in data.contacts:
+        if contact.role:
+            roles_by_name[contact.name] = [r.strip() for r in contact.role.split(',')]
+
+    profiles = ProfileMerge(db)
+    new_contact_ids = set(saved_ids.values())
+    profiles.load(
+        [cid for cid in contact_name_to_id.values() if cid not in new_contact_ids],
+        new_contact_ids=new_contact_ids,
+    )
+
+    for contact_name, contact_id in contact_name_to_id.items():
+        if contact_name == "Unattributed":
+            continue
+        contact_services = services_by_name.get(contact_name, [])
+        contact_roles = roles_by_name.get(contact_name, [])
+        if not contact_services and not contact_roles:
+            continue
+        inferred = infer_profile_from_services(contact_services, contact_name, contact_roles)
+        if len(inferred) <= 1:  # Only has field_provenance
+            continue
+        profiles.fill_inferred(contact_id, inferred, user_id)
+
+    for profile in data.profiles:
+        contact_id = contact_name_to_id.get(profile.name)
+        if contact_id:
+            profiles.apply_extracted(contact_id, profile, user_id)
+
+    changed = profiles.save()
+
+    logger.info(
+        f"Saved chat {chat_id}: {len(new_ids)} new contacts ({orphans} without services skipped), "
+        f"{len(contact_updates)} contacts updated, {len(inserted_services)} services "
+        f"({len(service_rows) - len(inserted_services)} duplicates), {len(changed)} profiles "
+        f"in {db.count} round trips"
+    )
+    return contact_name_to_id
@@ -10,23 +10,187 @@ Key Components:
 - LLM-based validation to filter noise
 - LLM-based summary generation
 """
+import asyncio
+import io
+import json
 import re
 import logging
-from typing import List, Dict, Set, Optional
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, List, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
-from app.services.llm_factory import get_structured_llm, invoke_with_retry
+from app.services.llm_factory import TruncatedResponse, invoke_with_fallback
+from app.services.llm_telemetry import (
+    STAGE_CHUNK_ANALYSIS,
+    STAGE_ENRICHMENT,
+    STAGE_MERGE_SUGGESTION,
+    STAGE_SUMMARY,
+    STAGE_VALIDATION,
+)
+from app.services.cache_store import content_key, get_chunk_result_cache, get_message_class_cache
+from app.services.keywords import ROLES_MAP, STATE_CODES, scan_keywords
+from app.services.token_estimate import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# MESSAGE TABLE
+# =============================================================================
+
+class MessageRow(NamedTuple):
+    """One message read out of a MessageTable (same fields as CleanedMessage)."""
+    id: int
+    sender: str
+    message: str
+    timestamp: Optional[str]
+
+
+@dataclass
+class MessageTable:
+    """
+    Columnar store for parsed transcript messages.
+
+    Row i is described by parallel int columns (message id, index into the
+    interned `senders` list, index into the interned `timestamps` list or -1)
+    and by text[offsets[i]:offsets[i + 1]] in a single shared text buffer.
+    Columns are packed bytes so the table stays compact and can be stored
+    in pipeline checkpoints as-is; typed memoryviews are used for reads.
+    """
+    ids: bytes = b""
+    sender_index: bytes = b""
+    timestamp_index: bytes = b""
+    offsets: bytes = bytes(array("q", [0]))
+    senders: List[str] = field(default_factory=list)
+    timestamps: List[str] = field(default_factory=list)
+    text: str = ""
+
+    def __post_init__(self):
+        self._ids = memoryview(self.ids).cast("q")
+        self._sender_index = memoryview(self.sender_index).cast("i")
+        self._timestamp_index = memoryview(self.timestamp_index).cast("i")
+        self._offsets = memoryview(self.offsets).cast("q")
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[MessageRow]:
+        return (self.row(i) for i in range(len(self)))
+
+    def row(self, i: int) -> MessageRow:
+        ts = self._timestamp_index[i]
+        return MessageRow(
+            self._ids[i],
+            self.senders[self._sender_index[i]],
+            self.text[self._offsets[i]:self._offsets[i + 1]],
+            self.timestamps[ts] if ts >= 0 else None,
+        )
+
+    def message_id(self, i: int) -> int:
+        return self._ids[i]
+
+    def message(self, i: int) -> str:
+        return self.text[self._offsets[i]:self._offsets[i + 1]]
+
+    def message_length(self, i: int) -> int:
+        return self._offsets[i + 1] - self._offsets[i]
+
+    def view(self, rows: Sequence[int]) -> "MessageView":
+        """Zero-copy view over the given row positions (a range or list)."""
+        return MessageView(self, rows)
+
+    def slice(self, start: int, stop: int) -> "MessageView":
+        """Zero-copy view over a contiguous block of rows."""
+        return MessageView(self, range(start, min(stop, len(self))))
+
+    def take(self, rows: Iterable[int]) -> "MessageTable":
+        """Build a compact table holding only the given rows (e.g. non-noise)."""
+        builder = MessageTableBuilder()
+        for i in rows:
+            ts = self._timestamp_index[i]
+            builder.append(
+                self._ids[i],
+                self.senders[self._sender_index[i]],
+                self.message(i),
+                self.timestamps[ts] if ts >= 0 else None,
+            )
+        return builder.build()
+
+    def to_records(self) -> List[Dict]:
+        """Bulk serializer: one plain dict per row, shaped like CleanedMessage.model_dump()."""
+        ids, offsets, text = self._ids, self._offsets, self.text
+        senders = [self.senders[i] for i in self._sender_index]
+        timestamps = [self.timestamps[i] if i >= 0 else None for i in self._timestamp_index]
+        return [
+            {"id": ids[i], "sender": senders[i], "message": text[offsets[i]:offsets[i + 1]], "timestamp": timestamps[i]}
+            for i in range(len(ids))
+        ]
+
+    def to_messages(self) -> List["CleanedMessage"]:
+        """API-boundary view as CleanedMessage models (rows are already validated)."""
+        return [CleanedMessage.model_construct(**record) for record in self.to_records()]
+
+
+class MessageView:
+    """Read-only window onto some rows of a MessageTable; iterating yields MessageRow."""
+    __slots__ = ("table", "rows")
+
+    def __init__(self, table: MessageTable, rows: Sequence[int]):
+        self.table = table
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[MessageRow]:
+        row = self.table.row
+        return (row(i) for i in self.rows)
+
+
+class MessageTableBuilder:
+    """Appends messages column by column and packs them into a MessageTable."""
+
+    def __init__(self):
+        self._ids = array("q")
+        self._sender_index = array("i")
+        self._timestamp_index = array("i")
+        self._offsets = array("q", [0])
+        self._senders: Dict[str, int] = {}
+        self._timestamps: Dict[str, int] = {}
+        self._parts: List[str] = []
+        self._length = 0
+
+    def append(self, msg_id: int, sender: str, message: str, timestamp: Optional[str]) -> None:
+        self._ids.append(msg_id)
+        self._sender_index.append(self._senders.setdefault(sender, len(self._senders)))
+        self._timestamp_index.append(
+            -1 if timestamp is None else self._timestamps.setdefault(timestamp, len(self._timestamps))
+        )
+        self._parts.append(message)
+        self._length += len(message)
+        self._offsets.append(self._length)
+
+    def build(self) -> MessageTable:
+        return MessageTable(
+            ids=self._ids.tobytes(),
+            sender_index=self._sender_index.tobytes(),
+            timestamp_index=self._timestamp_index.tobytes(),
+            offsets=self._offsets.tobytes(),
+            senders=list(self._senders),
+            timestamps=list(self._timestamps),
+            text="".join(self._parts),
+        )
+
+
 # =============================================================================
 # PYDANTIC MODELS
 # =============================================================================
 
 class CleanedMessage(BaseModel):
-    """A parsed message from the transcript."""
+    """A parsed message from the transcript (API-facing view of a MessageTable row)."""
     id: int = Field(description="Index of the message")
     sender: str
     message: str
@@ -47,6 +211,7 @@ class ExtractedService(BaseModel):
     description: str = Field(description="Concise description of the offer or request")
     contact_name: str = Field(description="Name of the person associated with this service")
     links: List[str] = Field(default_factory=list, description="URLs mentioned")
+    message_id: Optional[int] = Field(None, description="ID of the transcript message this was extracted from")
 
 
 class BuyBox(BaseModel):
@@ -101,6 +266,16 @@ class IntentAnalysis(BaseModel):
     services: List[ExtractedService] = Field(description="List of extracted offers and requests")
     profiles: List["ExtractedProfile"] = Field(default_factory=list, description="List of rich contact profiles extracted")
     noise_message_ids: List[int] = Field(description="List of message IDs that are irrelevant noise")
+    digest: str = Field("", description="1-2 sentence summary of what this chunk of the meeting discussed")
+    key_topics: List[str] = Field(default_factory=list, description="Up to 5 key topics discussed in this chunk")
+
+
+class PartialIntentAnalysis(IntentAnalysis):
+    """
+    Chunk result covering only part of the chunk (the LLM response broke
+    off, or the call failed and only cached message classifications are
+    known). Used for this run but never cached or recorded as chunk progress.
+    """
 
 
 class ExtractedMeetingData(BaseModel):
@@ -108,12 +283,17 @@ class ExtractedMeetingData(BaseModel):
     contacts: List[ExtractedContact]
     services: List[ExtractedService]
     summary: MeetingSummary
-    cleaned_transcript: List[CleanedMessage] = Field(
-        default_factory=list, 
+    transcript: MessageTable = Field(
+        default_factory=MessageTable,
         description="Structured parsed messages (filtered)"
     )
     profiles: List["ExtractedProfile"] = Field(default_factory=list, description="Rich profiles")
 
+    @property
+    def cleaned_transcript(self) -> List[CleanedMessage]:
+        """Filtered transcript as CleanedMessage models (use transcript.to_records() for storage)."""
+        return self.transcript.to_messages()
+
 
 class ValidationResult(BaseModel):
     """Result of validating a single service."""
@@ -140,103 +320,130 @@ ZOOM_MSG_PATTERN = re.compile(
     re.IGNORECASE
 )
 
-# Role identifiers (emojis and keywords)
-ROLES_MAP = {
-    "TC": "Transaction Coordinator",
-    "TTTC": "Top Tier Transaction Coordinator",
-    "TTC": "Transaction Coordinator",
-    "Gator": "Gator Lender",
-    "🐊": "Gator Lender",
-    "Subto": "Subto Student",
-    "✌️": "Subto Student",
-    "✌🏼": "Subto Student",
-    "✌🏽": "Subto Student",
-    "✌🏾": "Subto Student",
-    "✌": "Subto Student",
-    "OC": "Owners Club",
-    "Bird Dog": "Bird Dog",
-    "BirdDog": "Bird Dog",
-    "🐕": "Bird Dog",
-    "🐶": "Bird Dog",
-    "🐦": "Bird Dog",
-    "DTS": "Direct To Seller",
-    "DTA": "Direct To Agent",
-    "ZD": "Zero Down Business",
-    "ZDB": "Zero Down Business",
-    "Zero Down": "Zero Down Business"
-}
+# Sender name cleanup (see clean_sender_name)
+SENDER_NAME_CACHE_SIZE = 4096
+
+SENDER_STATE_CODES = STATE_CODES
+
+SENDER_NOISE_PATTERN = re.compile(
+    r'\b\d{10,}\b'                               # 10+ digit phone numbers (e.g. 3852082523)
+    r'|\b\d{3}[-.)\s]?\d{3}[-.)\s]?\d{4}\b'      # Formatted phones (208-589-7775, (385) 208-2523)
+    r'|\b(?:TC|TTTC|TM|EA|VA|DTS|DTA|ZDB|OC)\b'  # Role tags (case-sensitive acronyms)
+)
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7F]+')
+TRAILING_STATE_PATTERN = re.compile(r'\s+(' + '|'.join(SENDER_STATE_CODES) + r')\s*$')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Deterministic noise rules applied before LLM analysis (see is_obvious_noise)
+REPLY_PREFIX_PATTERN = re.compile(r'^Replying to ".*?":\s*', re.IGNORECASE)
+REACTION_PATTERN = re.compile(
+    r'^(?:Reacted to ".*?" with \S+|Removed an? \S+ reaction from ".*?")\s*$',
+    re.IGNORECASE
+)
+POLL_ANSWER_PATTERN = re.compile(r'^[#(]?\d{1,2}[.)]?$')
+# Phrases that can answer "who needs a lender?" ("me", "me too", "same",
+# "yes please", "more") are never noise and stay with the LLM
+ADDRESSEE_SUFFIX = r'(?:\s+(?:all|everyone|everybody|guys|fam|family|y\'?all|team))?\W*$'
+SMALL_TALK_PATTERN = re.compile(
+    r'^\W*(?:hi|hello|hey|hiya|gm|good morning|good afternoon|good evening|welcome|'
+    r'thx|thanks|thank you|ty|lol|lmao|haha+|hahaha+|amen|love this|love it|awesome|great|nice)'
+    + ADDRESSEE_SUFFIX,
+    re.IGNORECASE
+)
+# Bare yes/no acknowledgements; only noise when not replying to a message,
+# since a reply's "yes" can answer a question
+ACKNOWLEDGEMENT_PATTERN = re.compile(
+    r'^\W*(?:yes|no|nope|nah|yeah|yep|yup|ok|okay|k|right|correct|sure|agreed|absolutely|true|so true)'
+    + ADDRESSEE_SUFFIX,
+    re.IGNORECASE
+)
 
 
 # =============================================================================
 # PARSING FUNCTIONS
 # =============================================================================
 
-def parse_transcript_lines(text: str) -> List[CleanedMessage]:
+def iter_transcript_messages(lines: Iterable[str]) -> Iterator[MessageRow]:
     """
-    Parse raw transcript text into structured messages.
-    Handles multi-line messages by appending to previous message.
+    Lazily parse transcript lines into structured messages.
+    Handles multi-line messages by collecting continuation lines for the
+    previous message; each message is yielded once the next header (or the
+    end of input) is seen.
     """
-    lines = text.split('\n')
-    parsed = []
     idx = 0
-    current_msg = None
+    header = None
+    parts: List[str] = []
 
     for line in lines:
         match = ZOOM_MSG_PATTERN.search(line)
         if match:
-            # Save previous message if exists
-            if current_msg:
-                parsed.append(current_msg)
-            
+            # Emit previous message if exists
+            if header:
+                yield MessageRow(header[0], header[1], " ".join(parts), header[2])
+
             timestamp = match.group(1).strip()
             raw_sender = match.group(2).strip()
-            initial_msg = match.group(3).strip()
-            
+
             # Clean sender name to remove phone numbers and role tags
-            sender = clean_sender_name(raw_sender)
-            
-            current_msg = CleanedMessage(
-                id=idx, 
-                sender=sender, 
-                message=initial_msg, 
-                timestamp=timestamp
-            )
+            header = (idx, clean_sender_name(raw_sender), timestamp)
+            parts = [match.group(3).strip()]
             idx += 1
-        elif current_msg:
+        elif header:
             # Append to current message if not a new header
             cleaned_line = line.strip()
             if cleaned_line:
-                current_msg.message += " " + cleaned_line
+                parts.append(cleaned_line)
 
     # Don't forget the last message
-    if current_msg:
-        parsed.append(current_msg)
-        
-    return parsed
+    if header:
+        yield MessageRow(header[0], header[1], " ".join(parts), header[2])
+
+
+def build_message_table(lines: Iterable[str]) -> MessageTable:
+    """Parse transcript lines straight into a columnar MessageTable."""
+    builder = MessageTableBuilder()
+    for msg in iter_transcript_messages(lines):
+        builder.append(*msg)
+    return builder.build()
+
+
+def parse_transcript_lines(text: str) -> MessageTable:
+    """
+    Parse raw transcript text into structured messages.
+    Lines are read lazily from the text instead of splitting it into a list.
+    """
+    return build_message_table(io.StringIO(text))
+
+
+def is_obvious_noise(message: str) -> bool:
+    """
+    Rule-based pre-filter for messages that never carry an offer or request:
+    empty "Replying to" stubs, reactions, emoji/punctuation-only messages,
+    poll answers ("1", "2)"), one-phrase greetings and, outside replies,
+    bare yes/no acknowledgements. Deliberately conservative; anything ambiguous is left for the LLM.
+    """
+    text = message.strip()
+    if REACTION_PATTERN.match(text):
+        return True
+
+    # Judge a reply by its own content, not the quoted message
+    is_reply = bool(REPLY_PREFIX_PATTERN.match(text))
+    text = REPLY_PREFIX_PATTERN.sub('', text, count=1)
+    if not text:
+        return True
+    if not any(ch.isalnum() for ch in text):
+        return True
+    if not is_reply and ACKNOWLEDGEMENT_PATTERN.match(text):
+        return True
+    return bool(POLL_ANSWER_PATTERN.match(text) or SMALL_TALK_PATTERN.match(text))
 
 
 def extract_roles(text: str) -> List[str]:
-    """Extract known roles from text using emoji/keyword mapping."""
-    found_roles: Set[str] = set()
-    
-    for marker, role_name in ROLES_MAP.items():
-        # For emojis and short codes
-        if not marker.isascii():
-            # Emoji check
-            if marker in text:
-                found_roles.add(role_name)
-        elif len(marker) > 2 and marker.isalpha():
-            # Longer text codes - use word boundary
-            if re.search(r'\b' + re.escape(marker) + r'\b', text, re.IGNORECASE):
-                found_roles.add(role_name)
-        else:
-            # Short ASCII codes (TC, OC) - case sensitive with boundary
-            if re.search(r'\b' + re.escape(marker) + r'\b', text):
-                found_roles.add(role_name)
-                
-    return list(found_roles)
+    """Extract known roles from text using emoji/keyword mapping (ROLES_MAP)."""
+    return list(scan_keywords(text)["roles"])
 
 
+@lru_cache(maxsize=SENDER_NAME_CACHE_SIZE)
 def clean_sender_name(raw_name: str) -> str:
     """
     Clean sender name by removing phone numbers and role tags.
@@ -247,50 +454,32 @@ def clean_sender_name(raw_name: str) -> str:
     - "Jesus Yuma AZ 7609785676"
     
     Returns cleaned name: "Micah Wylie", "Dr. Tami Romriell", "Jesus Yuma"
+    
+    Phones and role tags are removed in a single pass with a precompiled
+    pattern, and results are memoized per raw sender string since the same
+    few hundred senders repeat thousands of times in a long transcript.
     """
     name = raw_name.strip()
     
-    # Remove 10+ digit phone numbers (e.g. 3852082523)
-    name = re.sub(r'\b\d{10,}\b', '', name)
-    
-    # Remove formatted phone numbers (e.g. 208-589-7775, (385) 208-2523, 385.208.2523)
-    name = re.sub(r'\b\d{3}[-.)\s]?\d{3}[-.)\s]?\d{4}\b', '', name)
-    
-    # Remove common role tags that appear in names
-    # Case-insensitive for full words, case-sensitive for acronyms
-    role_patterns = [
-        r'\bTC\b',           # Transaction Coordinator
-        r'\bTTTC\b',         # Top Tier TC  
-        r'\bTM\b',           # Transaction Manager
-        r'\bEA\b',           # Executive Assistant
-        r'\bVA\b',           # Virtual Assistant
-        r'\bDTS\b',          # Direct To Seller
-        r'\bDTA\b',          # Direct To Agent
-        r'\bZDB\b',          # Zero Down Business
-        r'\bOC\b',           # Owners Club
-    ]
-    
-    for pattern in role_patterns:
-        name = re.sub(pattern, '', name)
+    # Remove phone numbers and role tags (one combined pass)
+    name = SENDER_NOISE_PATTERN.sub('', name)
     
     # Remove emojis (they're often roles: ✌️, 🐊, 🐕, 🐦)
     # Keep only ASCII characters, spaces, and common name characters (hyphens, apostrophes)
-    name = re.sub(r'[^\x00-\x7F]+', '', name)
+    name = NON_ASCII_PATTERN.sub('', name)
     
-    # Remove state codes at end of name (e.g., "Jesus Yuma AZ")
-    state_codes = [
-        'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
-        'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
-        'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
-        'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
-        'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
-    ]
-    for state in state_codes:
-        # Remove if it's the last word
-        name = re.sub(rf'\s+{state}\s*$', '', name)
+    # Remove state codes at end of name (e.g., "Jesus Yuma AZ").
+    # Codes are stripped in SENDER_STATE_CODES order, so "Smith TX AZ" loses
+    # both while "Smith AZ TX" only loses TX.
+    last_removed = -1
+    match = TRAILING_STATE_PATTERN.search(name)
+    while match and SENDER_STATE_CODES.index(match.group(1)) > last_removed:
+        last_removed = SENDER_STATE_CODES.index(match.group(1))
+        name = name[:match.start()]
+        match = TRAILING_STATE_PATTERN.search(name)
     
     # Clean up multiple spaces, leading/trailing whitespace
-    name = re.sub(r'\s+', ' ', name).strip()
+    name = WHITESPACE_PATTERN.sub(' ', name).strip()
     
     # If name is now empty or too short, return original (better to have weird name than no name)
     if len(name) < 2:
@@ -299,7 +488,7 @@ def clean_sender_name(raw_name: str) -> str:
     return name
 
 
-def extract_hard_contact_info(messages: List[CleanedMessage]) -> Dict[str, Dict]:
+def extract_hard_contact_info(messages: Iterable[MessageRow]) -> Dict[str, Dict]:
     """
     Pass 1: Regex extraction of Phone, Email, Links AND Roles.
     Returns a dict mapping sender name to their extracted info.
@@ -311,7 +500,8 @@ def extract_hard_contact_info(messages: List[CleanedMessage]) -> Dict[str, Dict]
         text = m.message
         
         if sender not in contacts_map:
-            contacts_map[sender] = {"email": None, "phone": None, "links": set(), "roles": set()}
+            # Sender roles only need to be scanned once per sender
+            contacts_map[sender] = {"email": None, "phone": None, "links": set(), "roles": set(extract_roles(sender))}
 
         # Check combined text (Name + Message) for contacts AND roles
         combined = f"{sender} {text}"
@@ -320,12 +510,8 @@ def extract_hard_contact_info(messages: List[CleanedMessage]) -> Dict[str, Dict]
         emails = re.findall(EMAIL_REGEX, combined)
         urls = re.findall(URL_REGEX, combined)
         
-        # Extract roles from sender name AND message
-        roles_in_sender = extract_roles(sender)
-        roles_in_msg = extract_roles(text)
-        
-        contacts_map[sender]["roles"].update(roles_in_sender)
-        contacts_map[sender]["roles"].update(roles_in_msg)
+        # Extract roles from message (single pass over all role markers)
+        contacts_map[sender]["roles"].update(extract_roles(text))
 
         if phones and not contacts_map[sender]["phone"]:
             contacts_map[sender]["phone"] = phones[0]
@@ -341,26 +527,13 @@ def extract_hard_contact_info(messages: List[CleanedMessage]) -> Dict[str, Dict]
 # LLM ANALYSIS FUNCTIONS
 # =============================================================================
 
-async def analyze_chunk(messages_chunk: List[CleanedMessage], chunk_index: int) -> IntentAnalysis:
-    """
-    Analyze a chunk of messages using LLM to extract offers/requests.
-    Uses centralized LLM factory with retry and rate limiting.
-    """
-    if not settings.OPENROUTER_API_KEY:
-        logger.warning("No API key configured, skipping LLM analysis")
-        return IntentAnalysis(services=[], noise_message_ids=[])
-
-    try:
-        # Get structured LLM with rate limiting
-        structured_llm = get_structured_llm(IntentAnalysis)
+# Bump when IntentAnalysis handling changes in a way the prompt text doesn't show
+ANALYZE_CHUNK_PROMPT_VERSION = 2
 
-        # Prepare transcript text
-        transcript_text = "\n".join([
-            f"[{m.id}] {m.sender}: {m.message}" 
-            for m in messages_chunk
-        ])
 
-        prompt = f"""
+def build_chunk_prompt(transcript_text: str, chunk_index) -> str:
+    """Render the intent-analysis prompt for one transcript chunk."""
+    return f"""
         # Role
         You are an expert Data Analyst. Your goal is to capture value from chat logs by extracting offers and requests EXACTLY as they were stated.
 
@@ -394,6 +567,7 @@ async def analyze_chunk(messages_chunk: List[CleanedMessage], chunk_index: int)
            - Type (offer/request)
            - Description: The VERBATIM (or slightly cleaned) message content preserving all links and details.
            - Sender Name: The exact name from the "From" field.
+           - Message ID: The [id] of the message it was taken from.
            
         4. **EXTRACT RICH PROFILE DATA**:
            For each person found, extract strictly what is present:
@@ -405,6 +579,9 @@ async def analyze_chunk(messages_chunk: List[CleanedMessage], chunk_index: int)
            - **"Help Me With"**: What they need.
            - **Socials**: Blinq, Website, etc.
 
+        5. **DIGEST**: Summarize what this part of the meeting discussed in 1-2 sentences
+           and list up to 5 key topics. These are combined into the meeting summary.
+
         # Role Identifiers (IMPORTANT)
         The following symbols/acronyms indicate specific roles. If seen in the name or message, they are VALUABLE context, not noise.
         - 🐊 / Gator -> Gator Lender
@@ -421,97 +598,335 @@ async def analyze_chunk(messages_chunk: List[CleanedMessage], chunk_index: int)
         {transcript_text}
         </transcript_chunk>
         """
+
+
+def chunk_transcript(messages: Sequence[MessageRow]) -> str:
+    """Prompt text of a chunk: one "[id] sender: message" line per message."""
+    return "\n".join(f"[{m.id}] {m.sender}: {m.message}" for m in messages)
+
+
+def chunk_cache_key(transcript_text: str, model: str) -> str:
+    """
+    Content address of a chunk result: the chunk text, the prompt template
+    (with chunk text and index left as placeholders) and the model name.
+    """
+    template = build_chunk_prompt("{transcript_text}", "{chunk_index}")
+    return content_key(ANALYZE_CHUNK_PROMPT_VERSION, model, template, transcript_text)
+
+
+def message_cache_key(msg: MessageRow, model: str, template_key: str) -> str:
+    """
+    Key for a message's classification: normalized sender and text plus the
+    chunk prompt and model, so the same intro pasted every week maps to one
+    entry while prompt or model changes start fresh.
+    """
+    sender = WHITESPACE_PATTERN.sub(' ', msg.sender).strip().casefold()
+    text = WHITESPACE_PATTERN.sub(' ', msg.message).strip().casefold()
+    return content_key(template_key, model, sender, text)
+
+
+def message_cache_keys(messages: Sequence[MessageRow], model: str) -> Dict[int, str]:
+    """message_cache_key of each message (by id) for `model`."""
+    template_key = chunk_cache_key("", model)
+    return {m.id: message_cache_key(m, model, template_key) for m in messages}
+
+
+def classify_messages(messages: Sequence[MessageRow], result: IntentAnalysis) -> Optional[Dict[int, Dict]]:
+    """
+    Per-message decisions from a chunk result: {message id: {"decision":
+    noise|offer|request|other, "services": [...]}}. Noise wins the decision
+    label but any services the model still extracted are kept, so a cached
+    result matches the original exactly. Returns None when a
+    service can't be traced back to one of the messages, since the
+    "other" decisions would then be unreliable.
+    """
+    decisions = {m.id: {"decision": "other", "services": []} for m in messages}
+    for msg_id in result.noise_message_ids:
+        if msg_id in decisions:
+            decisions[msg_id]["decision"] = "noise"
+    for svc in result.services:
+        if svc.message_id not in decisions:
+            return None
+        entry = decisions[svc.message_id]
+        if entry["decision"] == "other":
+            entry["decision"] = svc.type
+        entry["services"].append({"type": svc.type, "description": svc.description, "links": svc.links})
+    return decisions
+
+
+def intent_from_decisions(messages: Sequence[MessageRow], decisions: Dict[int, Dict]) -> IntentAnalysis:
+    """Rebuild the chunk-result form of cached decisions for these messages."""
+    services = []
+    noise_ids = []
+    for m in messages:
+        entry = decisions.get(m.id)
+        if entry is None:
+            continue
+        if entry["decision"] == "noise":
+            noise_ids.append(m.id)
+        for svc in entry["services"]:
+            services.append(ExtractedService(
+                type=svc["type"],
+                description=svc["description"],
+                contact_name=m.sender,
+                links=svc["links"],
+                message_id=m.id,
+            ))
+    return IntentAnalysis(services=services, noise_message_ids=noise_ids)
+
+
+# Receives each service of a chunk result as soon as it is known
+ServiceCallback = Callable[[ExtractedService], None]
+
+
+async def analyze_chunk(
+    messages_chunk: Sequence[MessageRow],
+    chunk_index: int,
+    on_service: Optional[ServiceCallback] = None,
+) -> Optional[IntentAnalysis]:
+    """
+    Analyze a chunk of messages using LLM to extract offers/requests.
+    Uses centralized LLM factory with retry and rate limiting.
+
+    Results are cached by chunk content and the model that produced them,
+    so reprocessing an unchanged transcript with the same prompt and model
+    makes no LLM calls and returns the full result, profiles included.
+    Otherwise, messages classified in an earlier meeting (same sender and
+    text) are answered from the message cache and never sent to the LLM;
+    their cached decisions are merged into the chunk result. If the LLM
+    response breaks off, the result holds what it completed; if the call
+    fails, the cached decisions are returned on their own. Either way it is
+    a PartialIntentAnalysis, which is not cached. None only if nothing is
+    known about the chunk.
+
+    on_service, if given, is called with the result's services in result
+    order while the LLM response is still streaming in (cached services
+    first). Streamed services are provisional: an attempt that breaks off
+    early is retried or replaced by the fallback model, whose services are
+    streamed again. The returned result is authoritative.
+    """
+    messages = list(messages_chunk)
+    chunk_cache = get_chunk_result_cache()
+    if chunk_cache:
+        found = await asyncio.to_thread(
+            chunk_cache.get, chunk_cache_key(chunk_transcript(messages), settings.LLM_MODEL)
+        )
+        if found:
+            try:
+                result = IntentAnalysis.model_validate_json(found)
+                logger.info(f"Chunk {chunk_index} served from cache.")
+                if on_service:
+                    for svc in result.services:
+                        on_service(svc)
+                return result
+            except ValueError as e:
+                logger.warning(f"Ignoring unreadable cached result for chunk {chunk_index}: {e}")
+
+    msg_cache = get_message_class_cache()
+    cached: Dict[int, Dict] = {}
+    keys: Dict[int, str] = {}
+
+    if msg_cache:
+        keys = message_cache_keys(messages, settings.LLM_MODEL)
+        found = await asyncio.to_thread(msg_cache.get_many, list(keys.values()))
+        for msg_id, key in keys.items():
+            if key in found:
+                cached[msg_id] = json.loads(found[key])
+
+    pending = [m for m in messages if m.id not in cached]
+    if cached:
+        logger.info(
+            f"Chunk {chunk_index}: {len(cached)}/{len(messages)} messages classified from cache"
+        )
+    if not pending:
+        return intent_from_decisions(messages, cached)
+
+    if on_service and cached:
+        for svc in intent_from_decisions(messages, cached).services:
+            on_service(svc)
+    analysis = await _analyze_messages(pending, chunk_index, on_service)
+    if analysis is None:
+        if not cached:
+            return None
+        logger.warning(
+            f"Chunk {chunk_index}: analysis failed, keeping the {len(cached)} cached message classifications"
+        )
+        return PartialIntentAnalysis.model_validate(intent_from_decisions(messages, cached).model_dump())
+    result, model = analysis
+    partial = isinstance(result, PartialIntentAnalysis)
+    if msg_cache and not partial:
+        decisions = classify_messages(pending, result)
+        if decisions is not None:
+            if model != settings.LLM_MODEL:
+                keys = message_cache_keys(pending, model)  # Answered by the fallback
+            await asyncio.to_thread(msg_cache.set_many, {
+                keys[msg_id]: json.dumps(entry) for msg_id, entry in decisions.items()
+            })
+
+    if cached:
+        from_cache = intent_from_decisions(messages, cached)
+        result = (PartialIntentAnalysis if partial else IntentAnalysis)(
+            services=from_cache.services + result.services,
+            profiles=result.profiles,
+            noise_message_ids=from_cache.noise_message_ids + result.noise_message_ids,
+            digest=result.digest,
+            key_topics=result.key_topics,
+        )
+    if chunk_cache and not partial:
+        await asyncio.to_thread(
+            chunk_cache.set, chunk_cache_key(chunk_transcript(messages), model), result.model_dump_json()
+        )
+    return result
+
+
+async def _analyze_messages(
+    messages: List[MessageRow],
+    chunk_index: int,
+    on_service: Optional[ServiceCallback] = None,
+) -> Optional[Tuple[IntentAnalysis, str]]:
+    """
+    LLM intent analysis of `messages`. Returns (result, model that produced
+    it) or None if no analysis could be made. A response that broke off
+    comes back as a PartialIntentAnalysis of what it completed.
+
+    With on_service, the response is streamed and each service is passed
+    on as soon as the model has finished writing it.
+    """
+    if not settings.OPENROUTER_API_KEY:
+        logger.warning("No API key configured, skipping LLM analysis")
+        return None
+
+    try:
+        prompt = build_chunk_prompt(chunk_transcript(messages), chunk_index)
         
-        logger.info(f"Analyzing chunk {chunk_index} ({len(messages_chunk)} messages)...")
-        result = await invoke_with_retry(structured_llm, prompt)
+        logger.info(f"Analyzing chunk {chunk_index} ({len(messages)} messages)...")
+        # Chunk results have their own content cache; keep them out of the response cache
+        on_item = None
+        if on_service:
+            def on_item(field: str, item: BaseModel):
+                if field == "services":
+                    on_service(item)
+        result, model = await invoke_with_fallback(
+            prompt, schema=IntentAnalysis, stage=STAGE_CHUNK_ANALYSIS, bypass_cache=True,
+            on_item=on_item, with_model=True,
+        )
         logger.info(f"Chunk {chunk_index} analysis complete.")
-        return result
+        return result, model
+
+    except TruncatedResponse as e:
+        logger.warning(f"Chunk {chunk_index} analysis broke off; keeping its partial result")
+        return PartialIntentAnalysis.model_validate(e.partial.model_dump()), e.model
 
     except Exception as e:
         logger.error(f"LLM Chunk Analysis Failed (Chunk {chunk_index}): {e}")
-        return IntentAnalysis(services=[], noise_message_ids=[])
+        return None
 
 
-async def validate_services(services: List[ExtractedService]) -> List[ExtractedService]:
+# Services per validator call
+VALIDATION_BATCH_SIZE = 20
+
+
+async def validate_service_batch(batch: List[ExtractedService], batch_label: str = "") -> List[ExtractedService]:
     """
-    Stage 2: Relevance Validator.
-    Filters out non-business items from the extracted services.
-    Processes in batches to avoid context limits.
+    Run the relevance validator on one batch of services (a single LLM call)
+    and return the ones it keeps. On failure or a mismatched response the
+    whole batch is kept.
     """
-    if not services or not settings.OPENROUTER_API_KEY:
-        return services
+    if not batch or not settings.OPENROUTER_API_KEY:
+        return batch
 
-    BATCH_SIZE = 20
-    validated_services = []
-    
     try:
-        structured_llm = get_structured_llm(ValidatedServiceList)
+        items_text = "\n".join([
+            f"{idx}. [{s.type.upper()}] {s.description}" 
+            for idx, s in enumerate(batch)
+        ])
         
-        for i in range(0, len(services), BATCH_SIZE):
-            batch = services[i:i + BATCH_SIZE]
-            items_text = "\n".join([
-                f"{idx}. [{s.type.upper()}] {s.description}" 
-                for idx, s in enumerate(batch)
-            ])
-            
-            prompt = f"""
-            You are a Quality Control Validator for a Real Estate & Creative Finance Database.
-            Your job is to keep REAL business offers/requests and REJECT noise/spam.
-            
-            === VALID (Keep) - Real business value ===
-            - TC Offers: "I'm a Top Tier Transaction Coordinator", "Let our team make sure you make it to closing"
-            - Lender Offers: "I can fund your deals with hard money and DSCR loans", "I have capital to deploy"
-            - Buyer Offers: "We are buying in Atlanta", "Looking for deals under $500k", "Nashville seller, who wants it, SFH?"
-            - Service Offers: "Bird dog service: off-market outreach → qualified lead", "I do title work"
-            - Specific Requests: "I am looking for a TC to join my team in Idaho", "Need a lender for a $200k deal"
-            - Deal Posts: "I have a lead in Rock Springs Wyoming that really wants to sell"
-            
-            === INVALID (Reject) - Common noise patterns ===
-            - One-word responses: "Less", "Nope", "Yes", "Guilty", "Same", "Mine", "True", "Me", "No"
-            - Poll responses: "1", "2", "3" (answering polls without business context)
-            - Social chatter: "Good morning", "Happy Saturday", "Love this", "So true", "Heck yeah!"
-            - Blinq-only: "https://blinq.me/..." without any offer/request context
-            - Reactions/agreements: "🔥", "❤️", "Me too", "Count me in", "Amen"
-            - Vague connection requests: "would like to connect", "let's connect", "sent you my blinq" (without business context)
-            - Off-topic discussion: Marriage advice, jokes, personal comments, logistics
-            - Duplicate spam: Same message posted 3+ times by same person (keep only first)
-            
-            === GRAY AREA (Use judgment) ===
-            - "Let's connect [blinq link]" after stating a service → KEEP (the service is the value)
-            - "Happy to help! [blinq]" without specifics → REJECT (too vague)
-            - "I'm a buyer in TX, let's connect" → KEEP (buyer offer with location)
-            - "Anyone doing wholesaling?" → REJECT (learning question, not deal request)
-            
-            Items to Validate:
-            {items_text}
-            
-            Return a list of validation results matching the order of input items.
-            """
-            
-            logger.info(f"Validating batch {i // BATCH_SIZE + 1} ({len(batch)} items)...")
-            res = await invoke_with_retry(structured_llm, prompt)
-            
-            if res and len(res.results) == len(batch):
-                for idx, result in enumerate(res.results):
-                    if result.is_valid:
-                        validated_services.append(batch[idx])
-                    else:
-                        logger.info(
-                            f"Validator Dropped: {batch[idx].description[:50]}... "
-                            f"(Reason: {result.reason})"
-                        )
-            else:
-                logger.warning(
-                    f"Validator batch mismatch ({len(res.results) if res else 0} vs {len(batch)}). "
-                    "Keeping batch."
-                )
-                validated_services.extend(batch)
-                
-        return validated_services
+        prompt = f"""
+        You are a Quality Control Validator for a Real Estate & Creative Finance Database.
+        Your job is to keep REAL business offers/requests and REJECT noise/spam.
+        
+        === VALID (Keep) - Real business value ===
+        - TC Offers: "I'm a Top Tier Transaction Coordinator", "Let our team make sure you make it to closing"
+        - Lender Offers: "I can fund your deals with hard money and DSCR loans", "I have capital to deploy"
+        - Buyer Offers: "We are buying in Atlanta", "Looking for deals under $500k", "Nashville seller, who wants it, SFH?"
+        - Service Offers: "Bird dog service: off-market outreach → qualified lead", "I do title work"
+        - Specific Requests: "I am looking for a TC to join my team in Idaho", "Need a lender for a $200k deal"
+        - Deal Posts: "I have a lead in Rock Springs Wyoming that really wants to sell"
+        
+        === INVALID (Reject) - Common noise patterns ===
+        - One-word responses: "Less", "Nope", "Yes", "Guilty", "Same", "Mine", "True", "Me", "No"
+        - Poll responses: "1", "2", "3" (answering polls without business context)
+        - Social chatter: "Good morning", "Happy Saturday", "Love this", "So true", "Heck yeah!"
+        - Blinq-only: "https://blinq.me/..." without any offer/request context
+        - Reactions/agreements: "🔥", "❤️", "Me too", "Count me in", "Amen"
+        - Vague connection requests: "would like to connect", "let's connect", "sent you my blinq" (without business context)
+        - Off-topic discussion: Marriage advice, jokes, personal comments, logistics
+        - Duplicate spam: Same message posted 3+ times by same person (keep only first)
         
+        === GRAY AREA (Use judgment) ===
+        - "Let's connect [blinq link]" after stating a service → KEEP (the service is the value)
+        - "Happy to help! [blinq]" without specifics → REJECT (too vague)
+        - "I'm a buyer in TX, let's connect" → KEEP (buyer offer with location)
+        - "Anyone doing wholesaling?" → REJECT (learning question, not deal request)
+        
+        Items to Validate:
+        {items_text}
+        
+        Return a list of validation results matching the order of input items.
+        """
+        
+        logger.info(f"Validating batch {batch_label} ({len(batch)} items)...")
+        res = await invoke_with_fallback(prompt, schema=ValidatedServiceList, stage=STAGE_VALIDATION)
+        
+        if res and len(res.results) == len(batch):
+            kept = []
+            for idx, result in enumerate(res.results):
+                if result.is_valid:
+                    kept.append(batch[idx])
+                else:
+                    logger.info(
+                        f"Validator Dropped: {batch[idx].description[:50]}... "
+                        f"(Reason: {result.reason})"
+                    )
+            return kept
+
+        logger.warning(
+            f"Validator batch mismatch ({len(res.results) if res else 0} vs {len(batch)}). "
+            "Keeping batch."
+        )
+        return batch
+
     except Exception as e:
         logger.error(f"Validator Failed: {e}")
-        return services  # Return original on failure
+        return batch  # Keep originals on failure
+
+
+PROFILE_ENRICHMENT_TASK = """
+        Task:
+        1. Infer their **Role** (e.g., Wholesaler, Lender, Gator, Buyer).
+        2. Identify **Communities** they mentioned (e.g. Subto, Astro, Gator).
+        3. Identify **Asset Classes** they deal with (e.g. SFH, Multifamily).
+        4. Construct a **Bio** (message_to_world) summarizing who they are.
+        5. Extract **Hot Plate** (what are they working on NOW? specific deals?).
+        6. Extract **Buy Box** criteria if they mentioned buying.
+        7. Extract **I Can Help With** (what do they offer?) and **Help Me With** (what do they need?).
+"""
+
+# Batched enrichment: several contacts' service lists per call
+ENRICHMENT_BATCH_TOKEN_BUDGET = 2500  # Estimated tokens of service text per call
+ENRICHMENT_BATCH_MAX_CONTACTS = 8
+
+
+class ContactProfileResult(BaseModel):
+    """Enriched profile for one contact of a batch."""
+    contact_id: str = Field(description="The contact ID exactly as given in the input")
+    profile: ExtractedProfile
+
+
+class BatchProfileEnrichment(BaseModel):
+    """Profiles for a batch of contacts, one entry per input contact."""
+    profiles: List[ContactProfileResult]
+
 
 async def enrich_profile_from_services_with_llm(name: str, services: List[str]) -> ExtractedProfile:
     """
@@ -523,8 +938,6 @@ async def enrich_profile_from_services_with_llm(name: str, services: List[str])
         return ExtractedProfile(name=name)
 
     try:
-        structured_llm = get_structured_llm(ExtractedProfile)
-        
         services_text = "\n".join([f"- {s}" for s in services])
         
         prompt = f"""
@@ -534,22 +947,13 @@ async def enrich_profile_from_services_with_llm(name: str, services: List[str])
         Analyze the following list of Offers and Requests they have posted:
         
         {services_text}
-        
-        Task:
-        1. Infer their **Role** (e.g., Wholesaler, Lender, Gator, Buyer).
-        2. Identify **Communities** they mentioned (e.g. Subto, Astro, Gator).
-        3. Identify **Asset Classes** they deal with (e.g. SFH, Multifamily).
-        4. Construct a **Bio** (message_to_world) summarizing who they are.
-        5. Extract **Hot Plate** (what are they working on NOW? specific deals?).
-        6. Extract **Buy Box** criteria if they mentioned buying.
-        7. Extract **I Can Help With** (what do they offer?) and **Help Me With** (what do they need?).
-        
+        {PROFILE_ENRICHMENT_TASK}
         Output a structured JSON profile.
         If strict data is missing, leave fields empty. Do NOT hallucinate.
         """
         
         logger.info(f"Enriching profile for {name} from {len(services)} services...")
-        result = await invoke_with_retry(structured_llm, prompt)
+        result = await invoke_with_fallback(prompt, schema=ExtractedProfile, stage=STAGE_ENRICHMENT)
         
         # Ensure name is preserved
         if result:
@@ -562,23 +966,196 @@ async def enrich_profile_from_services_with_llm(name: str, services: List[str])
         return ExtractedProfile(name=name)
 
 
-async def extract_summary_with_llm(text: str) -> MeetingSummary:
-    """Generate a meeting summary using LLM."""
+async def enrich_profiles_batch_with_llm(
+    contacts: Sequence[Tuple[str, str, List[str]]],
+) -> Optional[Dict[str, ExtractedProfile]]:
+    """
+    Enrich several contacts in one call. `contacts` holds (contact_id, name,
+    services) tuples. Returns {contact_id: profile}, or None if the response
+    doesn't line up with the input (missing, extra or repeated ids) or the
+    call fails, so the caller can fall back to single-contact calls.
+    """
     if not settings.OPENROUTER_API_KEY:
-        return MeetingSummary(summary="No API Key configured.", key_topics=[])
+        return {cid: ExtractedProfile(name=name) for cid, name, _ in contacts}
 
-    try:
-        structured_llm = get_structured_llm(MeetingSummary)
-        
-        # Truncate to avoid context limits
-        prompt = f"Summarize this meeting transcript (max 15000 chars):\n{text[:15000]}"
-        
-        logger.info("Generating Summary...")
-        return await invoke_with_retry(structured_llm, prompt)
+    sections = []
+    for cid, name, services in contacts:
+        services_text = "\n".join(f"- {s}" for s in services)
+        label = name.replace('"', "'")
+        sections.append(f'<contact id="{cid}" name="{label}">\n{services_text}\n</contact>')
+    contacts_text = "\n\n".join(sections)
+
+    prompt = f"""
+        You are an expert Real Estate Investor Profile Analyzer.
+        Build a separate Rich Profile for EACH contact below, based only on
+        that contact's own history of service posts (Offers and Requests).
         
+        {contacts_text}
+        {PROFILE_ENRICHMENT_TASK}
+        Return exactly one entry per contact, with contact_id copied exactly from its id.
+        Never mix information between contacts.
+        If strict data is missing, leave fields empty. Do NOT hallucinate.
+        """
+
+    try:
+        logger.info(f"Enriching {len(contacts)} profiles in one batch...")
+        result = await invoke_with_fallback(prompt, schema=BatchProfileEnrichment, stage=STAGE_ENRICHMENT)
     except Exception as e:
-        logger.error(f"Summary Generation Failed: {e}")
-        return MeetingSummary(summary="Summary generation failed.", key_topics=[])
+        logger.error(f"Batch Profile Enrichment Failed: {e}")
+        return None
+
+    expected = {cid: name for cid, name, _ in contacts}
+    profiles: Dict[str, ExtractedProfile] = {}
+    for entry in result.profiles if result else []:
+        if entry.contact_id not in expected or entry.contact_id in profiles:
+            break
+        entry.profile.name = expected[entry.contact_id]
+        profiles[entry.contact_id] = entry.profile
+    else:
+        if len(profiles) == len(expected):
+            return profiles
+
+    logger.warning(
+        f"Batch enrichment response doesn't match input "
+        f"({len(result.profiles) if result else 0} entries for {len(contacts)} contacts)"
+    )
+    return None
+
+
+def pack_enrichment_batches(
+    contacts: Sequence[Tuple[str, str, List[str]]],
+) -> List[List[Tuple[str, str, List[str]]]]:
+    """
+    Group contacts for batched enrichment, up to ENRICHMENT_BATCH_TOKEN_BUDGET
+    estimated tokens and ENRICHMENT_BATCH_MAX_CONTACTS contacts per batch.
+    A contact too large to share a call ends up in a batch of its own.
+    """
+    batches: List[List[Tuple[str, str, List[str]]]] = []
+    current: List[Tuple[str, str, List[str]]] = []
+    current_tokens = 0
+    for contact in contacts:
+        tokens = estimate_tokens(contact[1]) + sum(estimate_tokens(s) for s in contact[2])
+        if current and (
+            current_tokens + tokens > ENRICHMENT_BATCH_TOKEN_BUDGET
+            or len(current) >= ENRICHMENT_BATCH_MAX_CONTACTS
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(contact)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def enrich_profiles_from_services(
+    contacts: Sequence[Tuple[str, str, List[str]]],
+) -> Dict[str, ExtractedProfile]:
+    """
+    Enrich many contacts with as few calls as possible: contacts are packed
+    into batches (see pack_enrichment_batches) that run concurrently; a batch
+    whose response doesn't line up is redone one contact per call.
+    Returns {contact_id: profile} for every input contact.
+    """
+    async def run_batch(batch):
+        if len(batch) > 1:
+            profiles = await enrich_profiles_batch_with_llm(batch)
+            if profiles is not None:
+                return profiles
+            logger.info(f"Falling back to single-contact enrichment for {len(batch)} contacts")
+        singles = await asyncio.gather(*[
+            enrich_profile_from_services_with_llm(name, services) for _, name, services in batch
+        ])
+        return {cid: profile for (cid, _, _), profile in zip(batch, singles)}
+
+    batches = pack_enrichment_batches(contacts)
+    logger.info(f"Enriching {len(contacts)} profiles in {len(batches)} batches...")
+    results = await asyncio.gather(*[run_batch(batch) for batch in batches])
+    return {cid: profile for batch in results for cid, profile in batch.items()}
+
+
+# Digests per reduce call; longer meetings are reduced hierarchically
+SUMMARY_REDUCE_FAN_IN = 25
+SUMMARY_MAX_TOPICS = 10
+
+
+def chunk_digest(result: IntentAnalysis) -> Optional[MeetingSummary]:
+    """
+    A chunk's contribution to the meeting summary. Chunks answered entirely
+    from the message cache carry no digest; their offers/requests stand in.
+    """
+    if result.digest:
+        return MeetingSummary(summary=result.digest, key_topics=result.key_topics)
+    if result.services:
+        return MeetingSummary(
+            summary=" ".join(f"{svc.type.title()}: {svc.description[:120]}" for svc in result.services[:5]),
+            key_topics=result.key_topics,
+        )
+    return None
+
+
+def merge_digests_locally(digests: List[MeetingSummary]) -> MeetingSummary:
+    """Fallback reduce without an LLM: first digests joined, most frequent topics."""
+    topic_counts: Dict[str, int] = {}
+    topic_names: Dict[str, str] = {}
+    for digest in digests:
+        for topic in digest.key_topics:
+            key = topic.strip().lower()
+            if key:
+                topic_counts[key] = topic_counts.get(key, 0) + 1
+                topic_names.setdefault(key, topic.strip())
+    top = sorted(topic_counts, key=lambda k: -topic_counts[k])[:SUMMARY_MAX_TOPICS]
+    return MeetingSummary(
+        summary=" ".join(d.summary for d in digests[:5]),
+        key_topics=[topic_names[k] for k in top],
+    )
+
+
+async def _reduce_digests(digests: List[MeetingSummary], final: bool) -> MeetingSummary:
+    """One reduce call: merge consecutive digests into a single summary."""
+    parts = "\n".join(
+        f"{idx + 1}. {d.summary} (Topics: {', '.join(d.key_topics) or 'none'})"
+        for idx, d in enumerate(digests)
+    )
+    length = "3-5 sentences" if final else "2-3 sentences"
+    prompt = f"""
+        Below are summaries of consecutive parts of one meeting chat, in order.
+        Combine them into a single summary of {length} covering the whole span
+        (not just the first parts), and list at most {SUMMARY_MAX_TOPICS} key topics.
+
+        {parts}
+        """
+    try:
+        return await invoke_with_fallback(prompt, schema=MeetingSummary, stage=STAGE_SUMMARY)
+    except Exception as e:
+        logger.error(f"Summary reduce failed: {e}")
+        return merge_digests_locally(digests)
+
+
+async def summarize_chunk_digests(digests: List[MeetingSummary]) -> MeetingSummary:
+    """
+    Reduce step of the meeting summary: merge per-chunk digests (in meeting
+    order) into one MeetingSummary. Groups of SUMMARY_REDUCE_FAN_IN digests
+    are reduced concurrently, level by level, until one call can take the rest.
+    """
+    if not settings.OPENROUTER_API_KEY:
+        return MeetingSummary(summary="No API Key configured.", key_topics=[])
+    if not digests:
+        return MeetingSummary(summary="No discussion content found.", key_topics=[])
+
+    level = 0
+    while len(digests) > SUMMARY_REDUCE_FAN_IN:
+        level += 1
+        groups = [
+            digests[i:i + SUMMARY_REDUCE_FAN_IN]
+            for i in range(0, len(digests), SUMMARY_REDUCE_FAN_IN)
+        ]
+        logger.info(f"Summary reduce level {level}: {len(digests)} digests -> {len(groups)}")
+        digests = list(await asyncio.gather(*[_reduce_digests(g, final=False) for g in groups]))
+
+    logger.info(f"Generating Summary from {len(digests)} digests...")
+    return await _reduce_digests(digests, final=True)
+
 
 # =============================================================================
 # AI MERGE PROPOSAL
@@ -593,7 +1170,7 @@ class MergedProfileResult(BaseModel):
     all_role_tags: List[str] = Field(default_factory=list, description="Union of all role tags")
     reasoning: str = Field(description="Why this name/email was chosen")
 
-def generate_merge_suggestion(contacts: List[Dict]) -> MergedProfileResult:
+async def generate_merge_suggestion(contacts: List[Dict]) -> MergedProfileResult:
     """
     Uses LLM to propose a 'Golden Record' from a list of duplicate contacts.
     """
@@ -638,8 +1215,7 @@ Contact {i+1}:
     """
     
     try:
-        llm = get_structured_llm(MergedProfileResult)
-        result = invoke_with_retry(llm, prompt)
+        result = await invoke_with_fallback(prompt, schema=MergedProfileResult, stage=STAGE_MERGE_SUGGESTION)
         return result
     except Exception as e:
         logger.error(f"Error generating merge suggestion: {e}")
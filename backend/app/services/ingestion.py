@@ -1,13 +1,20 @@
 import re
+import codecs
 import hashlib
+from typing import List, Optional
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
+# Block size for streaming uploads (see StreamingCleaner)
+UPLOAD_READ_BLOCK_SIZE = 64 * 1024
+
+INLINE_WHITESPACE_PATTERN = re.compile(r'[ \t]+')
+
 def clean_text(text: str) -> str:
     # Simple cleaning: remove excessive whitespace, null bytes
     text = text.replace("\x00", "")
     # Remove multiple spaces but KEEP newlines
     # 1. Replace multiple spaces/tabs within a line
-    text = re.sub(r'[ \t]+', ' ', text)
+    text = INLINE_WHITESPACE_PATTERN.sub(' ', text)
     # 2. Normalize newlines (remove empty lines if desired, or just collapse multiple \n)
     text = re.sub(r'\n\s*\n', '\n', text) 
     return text.strip()
@@ -15,6 +22,66 @@ def clean_text(text: str) -> str:
 def compute_hash(text: str) -> str:
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
+def clean_line(line: str) -> str:
+    """Per-line part of clean_text(): drop null bytes, collapse spaces/tabs."""
+    return INLINE_WHITESPACE_PATTERN.sub(' ', line.replace("\x00", ""))
+
+class StreamingCleaner:
+    """
+    Incremental equivalent of clean_text() + compute_hash() for uploads.
+
+    Bytes are fed in blocks; they are decoded, split on newlines and cleaned
+    line by line while a SHA-256 digest is updated as lines are finalized, so
+    the raw upload, the decoded text and the cleaned text never coexist in
+    memory. finish() returns exactly clean_text(raw.decode("utf-8")) and
+    hexdigest() exactly compute_hash() of it.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._digest = hashlib.sha256()
+        self._partial = ""  # Decoded text after the last newline
+        self._pending: Optional[str] = None  # Last kept line (may still need rstrip)
+        self._lines: List[str] = []
+        self._finished = False
+
+    def feed(self, data: bytes) -> None:
+        """Decode and clean a block of bytes. Raises UnicodeDecodeError on invalid UTF-8."""
+        text = self._partial + self._decoder.decode(data)
+        *complete, self._partial = text.split("\n")
+        for line in complete:
+            self._add_line(line)
+
+    def finish(self) -> str:
+        """Flush remaining input and return the full cleaned text."""
+        if not self._finished:
+            self._add_line(self._partial + self._decoder.decode(b"", final=True))
+            self._partial = ""
+            if self._pending is not None:
+                last = self._pending.rstrip()
+                self._digest.update(last.encode("utf-8"))
+                self._lines.append(last)
+                self._pending = None
+            self._finished = True
+        return "\n".join(self._lines)
+
+    def hexdigest(self) -> str:
+        """SHA-256 of the cleaned text (call after finish())."""
+        return self._digest.hexdigest()
+
+    def _add_line(self, raw_line: str) -> None:
+        line = clean_line(raw_line)
+        # Whitespace-only lines are collapsed away (clean_text's \n\s*\n rule)
+        if not line.strip():
+            return
+        if self._pending is None:
+            # First kept line: leading whitespace is stripped
+            self._pending = line.lstrip()
+            return
+        self._digest.update(self._pending.encode("utf-8") + b"\n")
+        self._lines.append(self._pending)
+        self._pending = line
+
 def normalize_link(link: str) -> str:
     link = link.strip()
     
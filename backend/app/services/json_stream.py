@@ -0,0 +1,103 @@
+"""
+Incremental JSON Item Parser
+
+Scans a JSON object as it streams in and hands back each element of
+selected top-level arrays as soon as that element's object closes, e.g.
+every entry of "services" in an IntentAnalysis response while the model is
+still writing the rest.
+
+The scanner only tracks strings, nesting and the key of each top-level
+field; elements are parsed with json.loads once their closing brace
+arrives. Everything received is kept, so the whole text can be parsed (or
+partially parsed after a truncated response) at the end.
+"""
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class JSONArrayItemStream:
+    """
+    Feed text chunks of a JSON object; get (field, element) pairs for each
+    completed object element of the top-level arrays named in `fields`.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = set(fields)
+        self._parts: List[str] = []
+        self._text = ""
+        self._pos = 0  # Next character to scan in _text
+        # One entry per open container: [kind, key] where kind is "{" or "[";
+        # for objects key is the last key read, for arrays the parent's key
+        self._stack: List[List[Any]] = []
+        self._expect_key = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if self._parts:
+            self._text += "".join(self._parts)
+            self._parts = []
+        return self._text
+
+    def _in_item_array(self) -> bool:
+        return (
+            len(self._stack) == 2
+            and self._stack[0][0] == "{"
+            and self._stack[1][0] == "["
+            and self._stack[1][1] in self.fields
+        )
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consume a chunk; return the elements completed by it, in order."""
+        if not chunk:
+            return []
+        self._parts.append(chunk)
+        text = self.text
+        completed = []
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._expect_key and self._stack and self._stack[-1][0] == "{":
+                        self._stack[-1][1] = json.loads(text[self._string_start:i + 1])
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == "{" or c == "[":
+                if c == "{" and self._in_item_array():
+                    self._item_start = i
+                parent_key = self._stack[-1][1] if self._stack and self._stack[-1][0] == "{" else None
+                self._stack.append([c, parent_key if c == "[" else None])
+                self._expect_key = c == "{"
+            elif c == "}" or c == "]":
+                if self._stack:
+                    self._stack.pop()
+                if c == "}" and self._item_start is not None and self._in_item_array():
+                    try:
+                        completed.append((self._stack[1][1], json.loads(text[self._item_start:i + 1])))
+                    except ValueError as e:
+                        logger.warning(f"Skipping unparseable streamed item: {e}")
+                    self._item_start = None
+                self._expect_key = False
+            elif c == ":":
+                self._expect_key = False
+            elif c == ",":
+                self._expect_key = bool(self._stack) and self._stack[-1][0] == "{"
+
+        self._pos = len(text)
+        return completed
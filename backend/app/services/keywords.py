@@ -0,0 +1,238 @@
+"""
+Keywords Module
+
+Shared keyword dictionaries (roles, role tags, asset classes, markets) and a
+single-pass multi-pattern matcher built over all of them.
+
+The matcher is an Aho-Corasick automaton compiled once at import. A text is
+scanned exactly once regardless of how many keywords are registered, and
+every hit is reported (including overlapping ones such as "gator lender"
+matching both 'gator' and 'lender'). Each keyword keeps its own matching
+rules, mirroring the per-keyword regex/substring checks it replaces:
+- case_sensitive: the matched slice must equal the keyword exactly
+- word_boundary: the match must not touch a word character (regex \\b)
+"""
+from typing import Dict, List, Set, Tuple
+
+
+# =============================================================================
+# KEYWORD DICTIONARIES
+# =============================================================================
+
+# Role identifiers (emojis and keywords) found in sender names and messages
+ROLES_MAP = {
+    "TC": "Transaction Coordinator",
+    "TTTC": "Top Tier Transaction Coordinator",
+    "TTC": "Transaction Coordinator",
+    "Gator": "Gator Lender",
+    "🐊": "Gator Lender",
+    "Subto": "Subto Student",
+    "✌️": "Subto Student",
+    "✌🏼": "Subto Student",
+    "✌🏽": "Subto Student",
+    "✌🏾": "Subto Student",
+    "✌": "Subto Student",
+    "OC": "Owners Club",
+    "Bird Dog": "Bird Dog",
+    "BirdDog": "Bird Dog",
+    "🐕": "Bird Dog",
+    "🐶": "Bird Dog",
+    "🐦": "Bird Dog",
+    "DTS": "Direct To Seller",
+    "DTA": "Direct To Agent",
+    "ZD": "Zero Down Business",
+    "ZDB": "Zero Down Business",
+    "Zero Down": "Zero Down Business"
+}
+
+# Role tag keywords to detect from service descriptions
+ROLE_TAG_KEYWORDS = {
+    'buyer': ['buyer', 'buying', 'purchase', 'acquire', 'looking for deals', 'looking for properties'],
+    'seller': ['seller', 'selling', 'have deal', 'have property', 'disposing'],
+    'wholesaler': ['wholesaler', 'wholesale', 'assign', 'assignment fee'],
+    'lender': ['lender', 'lending', 'fund', 'funding', 'capital', 'hard money', 'private money', 'money to lend'],
+    'investor': ['investor', 'investing', 'invest', 'deploy capital'],
+    'tc': ['tc', 'transaction coordinator', 'coordination', 'closing'],
+    'gator': ['gator', 'gator lender', 'earnest money', 'emd'],
+    'subto': ['subto', 'subject to', 'sub-to', 'sub2', 'creative finance'],
+    'bird_dog': ['bird dog', 'birddog', 'finding deals', 'lead generation'],
+}
+
+# Asset class keywords
+ASSET_CLASS_KEYWORDS = {
+    'SFH': ['sfh', 'single family', 'single-family', 'house', 'home'],
+    'Multifamily': ['multifamily', 'multi-family', 'apartment', 'duplex', 'triplex', 'fourplex', 'unit'],
+    'Commercial': ['commercial', 'office', 'retail', 'shopping'],
+    'Land': ['land', 'lot', 'acreage', 'vacant'],
+    'Mobile Home': ['mobile home', 'manufactured', 'trailer', 'mh'],
+    'Industrial': ['industrial', 'warehouse', 'distribution'],
+}
+
+# State codes to detect markets
+STATE_CODES = [
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+    'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
+    'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
+    'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+    'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
+]
+
+STATE_NAMES = {
+    'texas': 'TX', 'florida': 'FL', 'california': 'CA', 'missouri': 'MO',
+    'ohio': 'OH', 'georgia': 'GA', 'arizona': 'AZ', 'colorado': 'CO',
+    'new york': 'NY', 'north carolina': 'NC', 'tennessee': 'TN', 'indiana': 'IN',
+    'michigan': 'MI', 'pennsylvania': 'PA', 'nevada': 'NV', 'oklahoma': 'OK',
+    'nationwide': 'Nationwide', 'all states': 'Nationwide'
+}
+
+
+# =============================================================================
+# MATCHER
+# =============================================================================
+
+def _is_word_char(ch: str) -> bool:
+    """Same notion of a word character as regex \\w on str patterns."""
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of keywords.
+
+    Keywords are matched against a lowercased copy of the text; case-sensitive
+    and word-boundary rules are then checked per hit against the original.
+    Call build() after the last add() and before scan().
+    """
+
+    def __init__(self):
+        # Each output is (keyword, length, category, label, case_sensitive, word_boundary)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[Tuple[str, int, str, str, bool, bool]]] = [[]]
+        self._delta: List[Dict[str, int]] = []
+        self._categories: Set[str] = set()
+
+    def add(
+        self,
+        keyword: str,
+        category: str,
+        label: str,
+        case_sensitive: bool = False,
+        word_boundary: bool = False,
+    ) -> None:
+        """Register a keyword; a hit adds `label` to the `category` result set."""
+        if self._delta:
+            raise RuntimeError("Cannot add keywords after build()")
+
+        state = 0
+        for ch in keyword.lower():
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._outputs.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+
+        self._outputs[state].append(
+            (keyword, len(keyword), category, label, case_sensitive, word_boundary)
+        )
+        self._categories.add(category)
+
+    def build(self) -> "KeywordMatcher":
+        """Compute failure links and flatten them into a transition table."""
+        fail = [0] * len(self._goto)
+        delta: List[Dict[str, int]] = [dict(self._goto[0])]
+        delta.extend({} for _ in range(len(self._goto) - 1))
+
+        # Breadth-first so a state's failure target is always complete first
+        queue = list(self._goto[0].values())
+        for state in queue:
+            # Inherit outputs and transitions from the failure state
+            self._outputs[state] = self._outputs[state] + self._outputs[fail[state]]
+            delta[state] = {**delta[fail[state]], **self._goto[state]}
+            for ch, child in self._goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+
+        self._delta = delta
+        return self
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """Scan `text` once and return the labels hit, grouped by category."""
+        hits: Dict[str, Set[str]] = {category: set() for category in self._categories}
+        if not text:
+            return hits
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to several; keep offsets aligned
+            lowered = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+        delta = self._delta
+        outputs = self._outputs
+        text_len = len(text)
+        state = 0
+
+        for end, ch in enumerate(lowered, start=1):
+            state = delta[state].get(ch, 0)
+            if not outputs[state]:
+                continue
+
+            for keyword, length, category, label, case_sensitive, word_boundary in outputs[state]:
+                start = end - length
+                if case_sensitive and text[start:end] != keyword:
+                    continue
+                if word_boundary and (
+                    (start > 0 and _is_word_char(text[start - 1]))
+                    or (end < text_len and _is_word_char(text[end]))
+                ):
+                    continue
+                hits[category].add(label)
+
+        return hits
+
+
+def build_keyword_matcher() -> KeywordMatcher:
+    """
+    Build the shared matcher from the dictionaries above, preserving the
+    matching rules of the original per-keyword checks.
+    """
+    matcher = KeywordMatcher()
+
+    for marker, role_name in ROLES_MAP.items():
+        if not marker.isascii():
+            # Emojis: plain substring
+            matcher.add(marker, "roles", role_name, case_sensitive=True)
+        elif len(marker) > 2 and marker.isalpha():
+            # Longer text codes: case-insensitive, word boundary
+            matcher.add(marker, "roles", role_name, word_boundary=True)
+        else:
+            # Short ASCII codes (TC, OC) and multi-word markers: case-sensitive, word boundary
+            matcher.add(marker, "roles", role_name, case_sensitive=True, word_boundary=True)
+
+    for role, keywords in ROLE_TAG_KEYWORDS.items():
+        for kw in keywords:
+            matcher.add(kw, "role_tags", role)
+
+    for asset, keywords in ASSET_CLASS_KEYWORDS.items():
+        for kw in keywords:
+            matcher.add(kw, "asset_classes", asset)
+
+    for code in STATE_CODES:
+        matcher.add(code, "markets", code, word_boundary=True)
+    for name, code in STATE_NAMES.items():
+        matcher.add(name, "markets", code)
+
+    return matcher.build()
+
+
+# Singleton matcher (built once at import)
+KEYWORD_MATCHER = build_keyword_matcher()
+
+
+def scan_keywords(text: str) -> Dict[str, Set[str]]:
+    """
+    Single pass over `text` returning every keyword hit, e.g.
+    {"roles": {"Gator Lender"}, "role_tags": {"lender"}, "asset_classes": set(), "markets": {"TX"}}
+    """
+    return KEYWORD_MATCHER.scan(text)
@@ -7,7 +7,7 @@ tool-based database access.
 
 Features:
 - Tool-based database queries (contacts, services, chats)
-- Rate-limited LLM calls via llm_factory
+- Rate-limited LLM calls via llm_factory, scheduled ahead of background work
 - Retry logic for transient failures
 - Structured response formatting for UI
 """
@@ -29,7 +29,8 @@ from langchain_core.runnables import RunnableConfig
 from typing import Annotated
 
 from app.services import tools as db_tools
-from app.services.llm_factory import get_llm, invoke_with_retry
+from app.services.llm_factory import get_llm, invoke_with_retry, llm_job, LLMPriority
+from app.services.llm_telemetry import STAGE_ASSISTANT_FORMATTER, STAGE_ASSISTANT_PLANNER
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -203,7 +204,7 @@ async def planner_node(state: AgentState) -> Dict[str, Any]:
     Uses centralized LLM factory with retry.
     """
     # Get LLM with rate limiting
-    model = get_llm()
+    model = get_llm(stage=STAGE_ASSISTANT_PLANNER)
     
     # Build messages with system prompt
     system_msg = SystemMessage(content=SYSTEM_PROMPT)
@@ -213,8 +214,9 @@ async def planner_node(state: AgentState) -> Dict[str, Any]:
     model_with_tools = model.bind_tools(ALL_TOOLS)
     
     try:
-        # Use retry wrapper for robustness
-        response = await invoke_with_retry(model_with_tools, messages)
+        # Use retry wrapper for robustness; a user is waiting, so jump the queue
+        with llm_job(LLMPriority.INTERACTIVE):
+            response = await invoke_with_retry(model_with_tools, messages)
         return {"messages": [response]}
     except Exception as e:
         logger.error(f"Planner node failed: {e}")
@@ -294,10 +296,11 @@ async def formatter_node(state: AgentState) -> Dict[str, Any]:
     """
     Generates final response and formats for UI.
     """
-    model = get_llm()
+    model = get_llm(stage=STAGE_ASSISTANT_FORMATTER)
     
     try:
-        response = await invoke_with_retry(model, state["messages"])
+        with llm_job(LLMPriority.INTERACTIVE):
+            response = await invoke_with_retry(model, state["messages"])
     except Exception as e:
         logger.error(f"Formatter node failed: {e}")
         response = AIMessage(content="I encountered an error. Please try again.")
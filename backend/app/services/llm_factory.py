@@ -2,41 +2,309 @@
 LLM Factory - Centralized LLM instantiation with retry, rate limiting, and fallback.
 
 This module provides a single source of truth for LLM configuration across the application.
-All LLM calls should use get_llm() or get_structured_llm() from this module.
+All LLM calls should use get_llm() or get_structured_llm() from this module and go
+through invoke_with_retry(), which applies the adaptive per-model rate limiter and
+reports each outcome (latency, 429s) back to it.
+
+Calls are also scheduled by priority: wrap work in llm_job() to mark it as
+interactive, upload extraction or background (reprocess/scans). A global
+concurrency budget is handed out in priority order, with a per-job cap so one
+large job can't take every slot.
+
+Pass stage= to get_llm()/get_structured_llm() to name the pipeline stage a
+call belongs to; invoke_with_retry records tokens, latency, retries and
+limiter wait per stage (see llm_telemetry).
+
+invoke_with_fallback() pairs LLM_MODEL with LLM_FALLBACK_MODEL behind a
+per-model circuit breaker (see circuit_breaker) and, with LLM_HEDGE_ENABLED,
+hedges slow primary calls with a fallback call.
+
+Structured calls can be streamed: pass on_item= to invoke_with_retry() or
+invoke_with_fallback() to receive each element of the schema's list fields
+(e.g. every ExtractedService) as soon as the model has finished writing it.
+Streamed elements are provisional; the returned result is authoritative. A
+response that breaks off raises TruncatedResponse holding the elements it
+completed.
 """
 import asyncio
+import heapq
+import inspect
+import itertools
 import logging
-from typing import TypeVar, Type, Optional, Any
-from functools import wraps
+import time
+import warnings
+import weakref
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, TypeVar, Type, Optional, Any, Dict, List, Tuple, get_args, get_origin
+from functools import lru_cache, wraps
 
+from langchain_core.utils.json import parse_partial_json
 from langchain_openai import ChatOpenAI
-from langchain_core.rate_limiters import InMemoryRateLimiter
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.services.cache_store import content_key, get_llm_response_cache
+from app.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.services.json_stream import JSONArrayItemStream
+from app.services.rate_limiter import (
+    AdaptiveRateLimiter,
+    get_model_rate_limiter,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
+from app.services.llm_telemetry import (
+    UNTAGGED_STAGE,
+    LLMCallRecord,
+    TokenUsageCallback,
+    get_llm_telemetry,
+)
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=BaseModel)
 
-# Singleton rate limiter instance (shared across all LLM calls)
-_rate_limiter: Optional[InMemoryRateLimiter] = None
+# Runnables from get_llm/get_structured_llm name their rate-limit bucket
+# (model) under this metadata key; invoke_with_retry acquires from it
+RATE_LIMIT_METADATA_KEY = "rate_limit_model"
 
+# Structured runnables carry a description of the call under this metadata
+# key so invoke_with_retry can key the response cache
+RESPONSE_CACHE_METADATA_KEY = "response_cache"
 
-def get_rate_limiter() -> InMemoryRateLimiter:
-    """Get or create the singleton rate limiter."""
-    global _rate_limiter
-    if _rate_limiter is None:
-        _rate_limiter = InMemoryRateLimiter(
-            requests_per_second=settings.LLM_RATE_LIMIT_RPS,
-            check_every_n_seconds=0.1,
-            max_bucket_size=settings.LLM_RATE_LIMIT_BURST,
-        )
-        logger.info(
-            f"Rate limiter initialized: {settings.LLM_RATE_LIMIT_RPS} RPS, "
-            f"burst={settings.LLM_RATE_LIMIT_BURST}"
-        )
-    return _rate_limiter
+# Runnables from get_llm/get_structured_llm name their telemetry stage under
+# this metadata key
+STAGE_METADATA_KEY = "llm_stage"
+
+# Set by invoke_with_fallback while it calls the fallback model
+FALLBACK_CALL = "fallback"
+HEDGE_CALL = "hedge"
+_fallback_call: ContextVar[Optional[str]] = ContextVar("llm_fallback_call", default=None)
+
+# Set by invoke_with_fallback on primary calls: stop retrying once the
+# model's circuit opens, so the fallback takes over
+_fail_fast_on_open_circuit: ContextVar[bool] = ContextVar("llm_fail_fast", default=False)
+
+# Schemas seen by get_structured_llm, for rebuilding cached responses
+_response_schemas: Dict[str, Type[BaseModel]] = {}
+
+# Streaming a structured (json_schema) response makes langchain_openai dump
+# each chunk of the SDK's stream, whose `parsed` field is typed None; pydantic
+# then warns once per chunk. Harmless, and it floods stderr.
+warnings.filterwarnings(
+    "ignore",
+    message=r"Pydantic serializer warnings:\s+PydanticSerializationUnexpectedValue\(Expected `none`[^\n]*field_name='parsed'",
+    category=UserWarning,
+    module=r"pydantic\.main",
+)
+
+
+class TruncatedResponse(Exception):
+    """
+    A streamed structured response broke off after some list items were
+    emitted. `partial` holds the completed items (and any other fields
+    written in full); it is never cached, and callers should treat it as
+    incomplete (not cache or checkpoint it either).
+    """
+
+    def __init__(self, partial: BaseModel, model: Optional[str], cause: BaseException):
+        super().__init__(f"Response from {model} broke off: {cause}")
+        self.partial = partial
+        self.model = model
+
+
+# =============================================================================
+# SCHEDULING
+# =============================================================================
+
+class LLMPriority(IntEnum):
+    """Scheduling class of an LLM call; lower values are served first."""
+    INTERACTIVE = 0  # A user is waiting on the answer (assistant)
+    EXTRACTION = 1  # Extraction of a freshly uploaded chat
+    BACKGROUND = 2  # Reprocessing, profile scans
+
+
+@dataclass(frozen=True)
+class LLMJob:
+    priority: LLMPriority
+    job_id: Optional[str] = None  # Calls sharing a job_id share the per-job cap
+    max_concurrency: Optional[int] = None  # Overrides LLM_JOB_MAX_CONCURRENCY
+
+
+DEFAULT_LLM_JOB = LLMJob(LLMPriority.EXTRACTION)
+
+_current_llm_job: ContextVar[Optional[LLMJob]] = ContextVar("llm_job", default=None)
+
+
+@contextmanager
+def llm_job(
+    priority: LLMPriority,
+    job_id: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+):
+    """
+    Schedule LLM calls made inside this block (including tasks created in it)
+    under `priority`, counted against `job_id`'s concurrency cap.
+    """
+    token = _current_llm_job.set(LLMJob(priority, job_id, max_concurrency))
+    try:
+        yield
+    finally:
+        _current_llm_job.reset(token)
+
+
+class LLMScheduler:
+    """
+    Hands out up to `budget` concurrent call slots, most urgent priority
+    first (FIFO within a priority). Interactive calls have no per-job cap;
+    other jobs hold at most `job_cap` slots at once. Slots are held for one
+    attempt, including its rate-limiter wait, and released before backoff.
+    """
+
+    def __init__(self, budget: int, job_cap: int):
+        self.budget = budget
+        self.job_cap = job_cap
+        self.in_flight = 0
+        self._job_in_flight: Dict[str, int] = {}
+        self._in_flight_by_priority: Counter = Counter()
+        self._waiting: List[Tuple[int, int, asyncio.Future, LLMJob]] = []
+        self._seq = itertools.count()
+        # Metrics
+        self.max_queue_depth = 0
+        self._granted: Counter = Counter()
+        self._wait_seconds: Counter = Counter()
+
+    def _cap(self, job: LLMJob) -> Optional[int]:
+        if job.max_concurrency:
+            return job.max_concurrency
+        return None if job.priority == LLMPriority.INTERACTIVE else self.job_cap
+
+    def _eligible(self, job: LLMJob) -> bool:
+        cap = self._cap(job)
+        return job.job_id is None or cap is None or self._job_in_flight.get(job.job_id, 0) < cap
+
+    def _grant(self, job: LLMJob) -> None:
+        self.in_flight += 1
+        self._in_flight_by_priority[job.priority] += 1
+        if job.job_id is not None:
+            self._job_in_flight[job.job_id] = self._job_in_flight.get(job.job_id, 0) + 1
+
+    def _release(self, job: LLMJob) -> None:
+        self.in_flight -= 1
+        self._in_flight_by_priority[job.priority] -= 1
+        if job.job_id is not None:
+            remaining = self._job_in_flight[job.job_id] - 1
+            if remaining:
+                self._job_in_flight[job.job_id] = remaining
+            else:
+                del self._job_in_flight[job.job_id]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the most urgent waiters whose job is under its cap."""
+        capped = []
+        while self._waiting and self.in_flight < self.budget:
+            entry = heapq.heappop(self._waiting)
+            fut, job = entry[2], entry[3]
+            if fut.done():
+                continue  # Cancelled while queued
+            if not self._eligible(job):
+                capped.append(entry)
+                continue
+            self._grant(job)
+            fut.set_result(None)
+        for entry in capped:
+            heapq.heappush(self._waiting, entry)
+
+    @asynccontextmanager
+    async def slot(self, job: LLMJob):
+        start = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (job.priority, next(self._seq), fut, job))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(job)  # Granted just before cancellation
+            raise
+        self._granted[job.priority] += 1
+        self._wait_seconds[job.priority] += time.monotonic() - start
+        try:
+            yield
+        finally:
+            self._release(job)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight calls and waits, by priority class."""
+        queued = Counter(job.priority for _, _, fut, job in self._waiting if not fut.done())
+        return {
+            "budget": self.budget,
+            "job_cap": self.job_cap,
+            "in_flight": self.in_flight,
+            "queued": sum(queued.values()),
+            "max_queue_depth": self.max_queue_depth,
+            "jobs_in_flight": dict(self._job_in_flight),
+            "by_priority": {
+                priority.name.lower(): {
+                    "queued": queued[priority],
+                    "in_flight": self._in_flight_by_priority[priority],
+                    "granted": self._granted[priority],
+                    "avg_wait_seconds": round(
+                        self._wait_seconds[priority] / self._granted[priority], 3
+                    ) if self._granted[priority] else 0.0,
+                }
+                for priority in LLMPriority
+            },
+        }
+
+
+# Futures belong to one event loop (CLI scripts may run several)
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMScheduler]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get the scheduler for the running event loop."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = LLMScheduler(settings.LLM_MAX_CONCURRENCY, settings.LLM_JOB_MAX_CONCURRENCY)
+        _schedulers[loop] = scheduler
+    return scheduler
+
+
+def get_llm_scheduler_stats() -> Dict[str, Any]:
+    """Queue-depth metrics of the scheduler in the running event loop."""
+    return get_llm_scheduler().stats()
+
+
+def get_rate_limiter(model: Optional[str] = None) -> AdaptiveRateLimiter:
+    """Get the adaptive rate limiter for a model (defaults to settings.LLM_MODEL)."""
+    return get_model_rate_limiter(model or settings.LLM_MODEL)
+
+
+def _runnable_metadata(llm_or_chain: Any, key: str) -> Optional[Any]:
+    """Metadata value set by the factory, looking through wrapper runnables."""
+    runnable = llm_or_chain
+    while runnable is not None:
+        config_metadata = (getattr(runnable, "config", None) or {}).get("metadata") or {}
+        own_metadata = getattr(runnable, "metadata", None) or {}
+        for metadata in (config_metadata, own_metadata):
+            if key in metadata:
+                return metadata[key]
+        runnable = getattr(runnable, "bound", None)  # e.g. bind_tools() wrappers
+    return None
+
+
+def _rate_limit_model(llm_or_chain: Any) -> Optional[str]:
+    """Model whose bucket a runnable draws from, or None if it isn't rate limited."""
+    return _runnable_metadata(llm_or_chain, RATE_LIMIT_METADATA_KEY)
 
 
 def get_llm(
@@ -44,6 +312,7 @@ def get_llm(
     temperature: float = 0,
     timeout: Optional[int] = None,
     with_rate_limit: bool = True,
+    stage: Optional[str] = None,
 ) -> ChatOpenAI:
     """
     Get a configured ChatOpenAI instance.
@@ -52,7 +321,8 @@ def get_llm(
         model: Model name (defaults to settings.LLM_MODEL)
         temperature: Sampling temperature (0 = deterministic)
         timeout: Request timeout in seconds
-        with_rate_limit: Whether to apply rate limiting
+        with_rate_limit: Whether to apply rate limiting (in invoke_with_retry)
+        stage: Pipeline stage the calls are recorded under in telemetry
     
     Returns:
         Configured ChatOpenAI instance
@@ -60,16 +330,26 @@ def get_llm(
     if not settings.OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY not configured")
     
+    model_name = model or settings.LLM_MODEL
     kwargs = {
-        "model": model or settings.LLM_MODEL,
+        "model": model_name,
         "openai_api_key": settings.OPENROUTER_API_KEY,
         "openai_api_base": settings.OPENROUTER_BASE_URL,
         "temperature": temperature,
         "request_timeout": timeout or settings.LLM_REQUEST_TIMEOUT,
+        # Retries happen in invoke_with_retry, where 429s reach the rate limiter
+        "max_retries": 0,
+        # Report token usage on streamed responses too
+        "stream_usage": True,
     }
     
+    metadata = {}
     if with_rate_limit:
-        kwargs["rate_limiter"] = get_rate_limiter()
+        metadata[RATE_LIMIT_METADATA_KEY] = model_name
+    if stage:
+        metadata[STAGE_METADATA_KEY] = stage
+    if metadata:
+        kwargs["metadata"] = metadata
     
     return ChatOpenAI(**kwargs)
 
@@ -80,6 +360,7 @@ def get_structured_llm(
     temperature: float = 0,
     timeout: Optional[int] = None,
     with_rate_limit: bool = True,
+    stage: Optional[str] = None,
 ) -> Any:
     """
     Get a ChatOpenAI instance configured for structured output.
@@ -90,6 +371,7 @@ def get_structured_llm(
         temperature: Sampling temperature
         timeout: Request timeout in seconds
         with_rate_limit: Whether to apply rate limiting
+        stage: Pipeline stage the calls are recorded under in telemetry
     
     Returns:
         ChatOpenAI instance with .with_structured_output() applied
@@ -99,8 +381,194 @@ def get_structured_llm(
         temperature=temperature,
         timeout=timeout,
         with_rate_limit=with_rate_limit,
+        stage=stage,
     )
-    return llm.with_structured_output(schema)
+    schema_name = f"{schema.__module__}.{schema.__qualname__}"
+    _response_schemas[schema_name] = schema
+    metadata = {RATE_LIMIT_METADATA_KEY: llm.model_name} if with_rate_limit else {}
+    if stage:
+        metadata[STAGE_METADATA_KEY] = stage
+    return llm.with_structured_output(schema).with_config(metadata={
+        **metadata,
+        RESPONSE_CACHE_METADATA_KEY: {
+            "model": llm.model_name,
+            "temperature": temperature,
+            "schema": schema_name,
+            "schema_hash": _schema_fingerprint(schema),
+        }
+    })
+
+
+@lru_cache(maxsize=None)
+def _schema_fingerprint(schema: Type[BaseModel]) -> str:
+    """Hash of the JSON schema, so schema edits invalidate cached responses."""
+    return content_key(schema.model_json_schema())
+
+
+# =============================================================================
+# STREAMED STRUCTURED OUTPUT
+# =============================================================================
+
+# Called with (field name, item) for each streamed list element; may be async
+ItemCallback = Callable[[str, BaseModel], Any]
+
+
+def _list_item_types(schema: Type[BaseModel]) -> Dict[str, Type[BaseModel]]:
+    """Top-level List[Model] fields of a schema, with their item model."""
+    item_types = {}
+    for name, field in schema.model_fields.items():
+        if get_origin(field.annotation) is list:
+            args = get_args(field.annotation)
+            if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+                item_types[name] = args[0]
+    return item_types
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Raw JSON text carried by a streamed message chunk (content or tool-call args)."""
+    tool_call_chunks = getattr(chunk, "tool_call_chunks", None)
+    if tool_call_chunks:
+        return "".join(tc.get("args") or "" for tc in tool_call_chunks)
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return content or ""
+
+
+async def _emit_item(on_item: ItemCallback, field: str, item: BaseModel) -> None:
+    outcome = on_item(field, item)
+    if inspect.isawaitable(outcome):
+        await outcome
+
+
+async def _emit_items(on_item: ItemCallback, result: BaseModel) -> None:
+    """Emit every list element of a complete result (e.g. one served from cache)."""
+    for field in _list_item_types(type(result)):
+        for item in getattr(result, field):
+            await _emit_item(on_item, field, item)
+
+
+class _StructuredStream:
+    """One streamed attempt of a structured call, passing finished list items to on_item."""
+
+    def __init__(self, schema: Type[BaseModel], on_item: ItemCallback):
+        self.schema = schema
+        self.on_item = on_item
+        self.item_types = _list_item_types(schema)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.items: Dict[str, List[BaseModel]] = {field: [] for field in self.item_types}
+        self.parser = JSONArrayItemStream(self.item_types)
+
+    @property
+    def emitted(self) -> int:
+        return sum(len(items) for items in self.items.values())
+
+    async def _feed(self, text: str) -> None:
+        for field, raw in self.parser.feed(text):
+            try:
+                item = self.item_types[field].model_validate(raw)
+            except ValueError as e:
+                logger.warning(f"Skipping invalid streamed {field} item: {e}")
+                continue
+            self.items[field].append(item)
+            await _emit_item(self.on_item, field, item)
+
+    async def run(self, llm_or_chain: Any, input_data: Any, config: Dict[str, Any]) -> BaseModel:
+        self._reset()  # Retried attempts start over (only ones without items are retried)
+        result = None
+        async for event in llm_or_chain.astream_events(input_data, config=config, version="v2"):
+            if event["event"] == "on_chat_model_stream":
+                await self._feed(_chunk_text(event["data"]["chunk"]))
+            elif event["event"] in ("on_chain_end", "on_chat_model_end") and not event.get("parent_ids"):
+                result = event["data"].get("output")
+        if not isinstance(result, self.schema):
+            # Root output missing (e.g. a bare model): parse the streamed text
+            result = self.schema.model_validate_json(self.parser.text)
+        return result
+
+    def partial_result(self) -> Optional[BaseModel]:
+        """
+        Result built from a response that broke off: the list items completed
+        so far, plus any other fields already written in full. Required list
+        fields that never arrived are left empty. None if it doesn't validate.
+        """
+        try:
+            data = parse_partial_json(self.parser.text)
+        except ValueError:
+            data = None
+        data = dict(data) if isinstance(data, dict) else {}
+        if data:
+            # The last field may have been cut mid-value
+            last_field = list(data)[-1]
+            if last_field not in self.item_types:
+                del data[last_field]
+        data.update(self.items)
+        for name, field in self.schema.model_fields.items():
+            if name not in data and field.is_required() and get_origin(field.annotation) is list:
+                data[name] = []
+        try:
+            return self.schema.model_validate(data)
+        except ValueError:
+            return None
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+
+def _response_cache_key(llm_or_chain: Any, input_data: Any) -> Optional[str]:
+    """
+    Cache key covering model, temperature, schema and prompt, or None if the
+    runnable wasn't built by get_structured_llm (plain chat/tool calls are
+    never cached).
+    """
+    config = getattr(llm_or_chain, "config", None) or {}
+    descriptor = (config.get("metadata") or {}).get(RESPONSE_CACHE_METADATA_KEY)
+    if not descriptor:
+        return None
+
+    if isinstance(input_data, str):
+        prompt = input_data
+    elif isinstance(input_data, list):
+        prompt = [(getattr(m, "type", None), getattr(m, "content", m)) for m in input_data]
+    else:
+        prompt = str(input_data)
+
+    return content_key(
+        descriptor["model"],
+        descriptor["temperature"],
+        descriptor["schema"],
+        descriptor["schema_hash"],
+        prompt,
+    )
+
+
+def _structured_schema(llm_or_chain: Any) -> Optional[Type[BaseModel]]:
+    """Output schema of a runnable built by get_structured_llm, else None."""
+    config = getattr(llm_or_chain, "config", None) or {}
+    descriptor = (config.get("metadata") or {}).get(RESPONSE_CACHE_METADATA_KEY)
+    return _response_schemas.get(descriptor["schema"]) if descriptor else None
+
+
+def _load_cached_response(llm_or_chain: Any, value: str) -> Optional[BaseModel]:
+    schema = _structured_schema(llm_or_chain)
+    if schema is None:
+        return None
+    try:
+        return schema.model_validate_json(value)
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable cached LLM response: {e}")
+        return None
+
+
+def get_response_cache_stats() -> Optional[Dict[str, Any]]:
+    """Hit/miss counters and size of the response cache (None if disabled)."""
+    cache = get_llm_response_cache()
+    return cache.stats() if cache else None
 
 
 async def invoke_with_retry(
@@ -110,9 +578,18 @@ async def invoke_with_retry(
     initial_delay: Optional[float] = None,
     backoff_factor: Optional[float] = None,
     max_delay: Optional[float] = None,
+    bypass_cache: bool = False,
+    on_item: Optional[ItemCallback] = None,
 ) -> Any:
     """
     Invoke an LLM or chain with exponential backoff retry.
+
+    When LLM_RESPONSE_CACHE_ENABLED is set, structured calls (runnables from
+    get_structured_llm) are answered from the response cache if the same
+    model, temperature, schema and prompt were seen before.
+
+    Each call is recorded in the per-stage LLM telemetry (stage from the
+    runnable's factory metadata, "untagged" otherwise).
     
     Args:
         llm_or_chain: LLM instance or chain to invoke
@@ -121,31 +598,161 @@ async def invoke_with_retry(
         initial_delay: Initial delay between retries
         backoff_factor: Multiplier for each retry delay
         max_delay: Maximum delay cap
+        bypass_cache: Skip the response cache for this call (no read, no write)
+        on_item: For runnables from get_structured_llm, stream the response and
+            call on_item(field, item) for each element of the schema's list
+            fields as soon as it is complete. Items are provisional: an
+            attempt that breaks off before a usable partial result is
+            retried, so its items may be emitted again or differ; only the
+            returned result counts. If the response breaks off after some
+            items, the call is not retried and TruncatedResponse is raised
+            with a result holding the completed items.
     
     Returns:
         LLM response
     
     Raises:
-        Last exception if all retries fail
+        TruncatedResponse for a streamed response that broke off;
+        otherwise the last exception if all retries fail
+    """
+    record = LLMCallRecord(
+        stage=_runnable_metadata(llm_or_chain, STAGE_METADATA_KEY) or UNTAGGED_STAGE,
+        model=_rate_limit_model(llm_or_chain),
+        fallback=_fallback_call.get() is not None,
+        hedge=_fallback_call.get() == HEDGE_CALL,
+    )
+    telemetry = get_llm_telemetry()
+    schema = _structured_schema(llm_or_chain) if on_item else None
+    cache = None if bypass_cache else get_llm_response_cache()
+    cache_key = _response_cache_key(llm_or_chain, input_data) if cache else None
+
+    if cache_key:
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            result = _load_cached_response(llm_or_chain, cached)
+            if result is not None:
+                logger.debug("LLM response served from cache")
+                record.cached = True
+                telemetry.record(record)
+                if schema:
+                    await _emit_items(on_item, result)
+                return result
+
+    try:
+        result = await _invoke_with_backoff(
+            llm_or_chain, input_data, max_retries, initial_delay, backoff_factor, max_delay,
+            record, _StructuredStream(schema, on_item) if schema else None,
+        )
+    except asyncio.CancelledError:
+        record.cancelled = True
+        raise
+    except TruncatedResponse:
+        raise  # Counted as truncated, not failed
+    except Exception:
+        record.failed = True
+        raise
+    finally:
+        telemetry.record(record)
+
+    if cache_key and isinstance(result, BaseModel):
+        await asyncio.to_thread(cache.set, cache_key, result.model_dump_json())
+    return result
+
+
+async def _invoke_with_backoff(
+    llm_or_chain: Any,
+    input_data: Any,
+    max_retries: Optional[int],
+    initial_delay: Optional[float],
+    backoff_factor: Optional[float],
+    max_delay: Optional[float],
+    record: LLMCallRecord,
+    stream: Optional[_StructuredStream] = None,
+) -> Any:
+    """
+    Retry loop behind invoke_with_retry; each attempt waits for the model's
+    rate limiter and reports its outcome to the model's circuit breaker.
+    Fills in record's tokens, latency, retries and waits. With `stream`,
+    attempts are streamed and a broken-off one that already produced items
+    raises TruncatedResponse with its partial result instead of being retried.
     """
     _max_retries = max_retries or settings.LLM_MAX_RETRIES
     _initial_delay = initial_delay or settings.LLM_RETRY_INITIAL_DELAY
     _backoff_factor = backoff_factor or settings.LLM_RETRY_BACKOFF_FACTOR
     _max_delay = max_delay or settings.LLM_RETRY_MAX_DELAY
     
+    model = _rate_limit_model(llm_or_chain)
+    limiter = get_rate_limiter(model) if model else None
+    breaker = get_circuit_breaker(model) if model else None
+    fail_fast = _fail_fast_on_open_circuit.get()
+    job = _current_llm_job.get() or DEFAULT_LLM_JOB
+    scheduler = get_llm_scheduler()
+    
     last_exception = None
     
     for attempt in range(_max_retries + 1):
+        if attempt and fail_fast and breaker and breaker.is_open():
+            raise CircuitOpenError(model) from last_exception
+        record.retries = attempt
+        usage = TokenUsageCallback()
+        config = {"callbacks": [usage]}
+        start = None
         try:
-            # Use async invoke if available
-            if hasattr(llm_or_chain, 'ainvoke'):
-                return await llm_or_chain.ainvoke(input_data)
-            else:
-                # Fallback to sync invoke in thread
-                return await asyncio.to_thread(llm_or_chain.invoke, input_data)
+            queued = time.monotonic()
+            async with scheduler.slot(job):
+                record.queue_wait += time.monotonic() - queued
+                if limiter:
+                    waiting = time.monotonic()
+                    await limiter.aacquire(priority=job.priority)
+                    record.limiter_wait += time.monotonic() - waiting
+                start = time.monotonic()
+                if stream is not None:
+                    result = await stream.run(llm_or_chain, input_data, config)
+                # Use async invoke if available
+                elif hasattr(llm_or_chain, 'ainvoke'):
+                    result = await llm_or_chain.ainvoke(input_data, config=config)
+                else:
+                    # Fallback to sync invoke in thread
+                    result = await asyncio.to_thread(llm_or_chain.invoke, input_data, config=config)
+                latency = time.monotonic() - start
+            record.latency = latency
+            record.prompt_tokens += usage.prompt_tokens
+            record.completion_tokens += usage.completion_tokens
+            if limiter:
+                await limiter.arecord_success(latency)
+            if breaker:
+                breaker.record_success(latency, record.stage)
+            return result
+
+        except asyncio.CancelledError:
+            if breaker and start is not None:
+                breaker.record_abandoned(time.monotonic() - start)
+            raise
                 
         except Exception as e:
             last_exception = e
+            if start is not None:
+                record.latency = time.monotonic() - start
+            # Failed attempts are billed too when the provider got that far
+            record.prompt_tokens += usage.prompt_tokens
+            record.completion_tokens += usage.completion_tokens
+            rate_limited = is_rate_limit_error(e)
+            record.rate_limited += rate_limited
+            if limiter and rate_limited:
+                await limiter.arecord_rate_limited(retry_after_seconds(e))
+            if breaker and not rate_limited:
+                breaker.record_failure()
+
+            if stream is not None and stream.emitted:
+                # Its items are already out; keep them rather than start over
+                partial = stream.partial_result()
+                if partial is not None:
+                    logger.warning(
+                        f"LLM response broke off after {stream.emitted} complete items ({e}); "
+                        f"keeping them"
+                    )
+                    record.truncated = True
+                    raise TruncatedResponse(partial, model, e) from e
             
             if attempt == _max_retries:
                 logger.error(
@@ -153,6 +760,12 @@ async def invoke_with_retry(
                 )
                 raise
             
+            if limiter and rate_limited:
+                # The limiter has paused this model's bucket; the next
+                # attempt waits in aacquire() instead of a blind backoff
+                logger.warning(f"LLM call attempt {attempt + 1} rate limited, retrying via limiter...")
+                continue
+            
             # Calculate delay with exponential backoff
             delay = min(
                 _initial_delay * (_backoff_factor ** attempt),
@@ -180,46 +793,130 @@ async def invoke_with_fallback(
     schema: Optional[Type[T]] = None,
     temperature: float = 0,
     timeout: Optional[int] = None,
+    bypass_cache: bool = False,
+    stage: Optional[str] = None,
+    on_item: Optional[ItemCallback] = None,
+    with_model: bool = False,
 ) -> Any:
     """
     Invoke LLM with automatic fallback to secondary model if primary fails.
+
+    While the primary model's circuit breaker is open, calls go straight to
+    the fallback; a primary call stops retrying as soon as it opens. With
+    LLM_HEDGE_ENABLED, a primary call still pending after the stage's
+    LLM_HEDGE_PERCENTILE latency is raced against a fallback call (not for
+    streamed calls, whose items would arrive twice).
     
     Args:
         input_data: Input to pass to the LLM
         schema: Optional Pydantic schema for structured output
         temperature: Sampling temperature
         timeout: Request timeout in seconds
+        bypass_cache: Skip the response cache for this call
+        stage: Pipeline stage the calls are recorded under in telemetry
+        on_item: Stream the structured response (needs schema); see invoke_with_retry.
+            Items streamed by a primary call that then fails over to the
+            fallback are not withdrawn; only the returned result counts.
+            A TruncatedResponse is passed on rather than falling back.
+        with_model: Return (response, model that produced it), e.g. to key a
+            cache by the model that actually answered
     
     Returns:
         LLM response
     """
-    models = [settings.LLM_MODEL, settings.LLM_FALLBACK_MODEL]
-    
-    for i, model in enumerate(models):
+    primary, fallback = settings.LLM_MODEL, settings.LLM_FALLBACK_MODEL
+
+    async def call(model: str, kind: Optional[str]) -> Tuple[Any, str]:
+        if schema:
+            llm = get_structured_llm(
+                schema=schema,
+                model=model,
+                temperature=temperature,
+                timeout=timeout,
+                stage=stage,
+            )
+        else:
+            llm = get_llm(
+                model=model,
+                temperature=temperature,
+                timeout=timeout,
+                stage=stage,
+            )
+        
+        kind_token = _fallback_call.set(kind)
+        fail_fast_token = _fail_fast_on_open_circuit.set(kind is None)
         try:
-            if schema:
-                llm = get_structured_llm(
-                    schema=schema,
-                    model=model,
-                    temperature=temperature,
-                    timeout=timeout,
-                )
-            else:
-                llm = get_llm(
-                    model=model,
-                    temperature=temperature,
-                    timeout=timeout,
-                )
-            
-            return await invoke_with_retry(llm, input_data)
-            
-        except Exception as e:
-            if i == len(models) - 1:
-                # Last model, re-raise
-                raise
-            
-            logger.warning(
-                f"Model {model} failed: {e}. Trying fallback model..."
+            result = await invoke_with_retry(
+                llm, input_data, bypass_cache=bypass_cache, on_item=on_item if schema else None
             )
-    
-    raise RuntimeError("All models failed")  # Should not reach here
+            return result, model
+        finally:
+            _fail_fast_on_open_circuit.reset(fail_fast_token)
+            _fallback_call.reset(kind_token)
+
+    result, model = await _invoke_primary_or_fallback(call, primary, fallback, stage, hedge=not on_item)
+    return (result, model) if with_model else result
+
+
+async def _invoke_primary_or_fallback(call, primary: str, fallback: str, stage: Optional[str], hedge: bool):
+    """invoke_with_fallback's routing; returns (result, model that produced it)."""
+    if primary == fallback:
+        return await call(primary, None)
+
+    breaker = get_circuit_breaker(primary)
+    if not breaker.allow_request():
+        logger.debug(f"Circuit for {primary} open or probing, using {fallback}")
+        return await call(fallback, FALLBACK_CALL)
+
+    hedge_delay = _hedge_delay(primary, stage) if hedge and settings.LLM_HEDGE_ENABLED else None
+    if hedge_delay is not None:
+        return await _invoke_hedged(call, primary, fallback, hedge_delay)
+
+    try:
+        return await call(primary, None)
+    except TruncatedResponse:
+        raise  # The partial result is usable and its items are out
+    except Exception as e:
+        logger.warning(
+            f"Model {primary} failed: {e}. Trying fallback model..."
+        )
+    return await call(fallback, FALLBACK_CALL)
+
+
+def _hedge_delay(model: str, stage: Optional[str]) -> float:
+    """Seconds to wait on the primary before hedging: its recent latency percentile for the stage."""
+    delay = get_circuit_breaker(model).latency_percentile(
+        stage or UNTAGGED_STAGE, settings.LLM_HEDGE_PERCENTILE, settings.LLM_HEDGE_MIN_SAMPLES
+    )
+    if delay is None:
+        delay = settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+    return max(delay, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+
+async def _invoke_hedged(call, primary: str, fallback: str, hedge_delay: float) -> Any:
+    """Run the primary call; past hedge_delay, race it against the fallback and keep the first answer."""
+    primary_task = asyncio.create_task(call(primary, None))
+    pending = {primary_task}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+        if done:
+            try:
+                return primary_task.result()
+            except Exception as e:
+                logger.warning(f"Model {primary} failed: {e}. Trying fallback model...")
+                return await call(fallback, FALLBACK_CALL)
+
+        logger.info(f"Model {primary} slower than {hedge_delay:.1f}s, hedging with {fallback}")
+        pending.add(asyncio.create_task(call(fallback, HEDGE_CALL)))
+        last_exception = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_exception = task.exception()
+                logger.warning(f"Hedged call failed: {last_exception}")
+        raise last_exception
+    finally:
+        for task in pending:
+            task.cancel()
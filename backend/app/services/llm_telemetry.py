@@ -0,0 +1,283 @@
+"""
+LLM Telemetry Module
+
+Per-stage statistics for LLM calls made through invoke_with_retry. Every
+call is tagged with the pipeline stage that made it (chunk analysis,
+validation, summary, ...) and records token usage, latency, retries,
+fallback use and time spent waiting on the scheduler and rate limiter.
+
+Stats are aggregated in memory, per process, into fixed-bucket histograms:
+cheap enough to record on every call, and mergeable by eye across workers.
+They are served by the admin API and summarized in the logs every
+LLM_TELEMETRY_LOG_INTERVAL_SECONDS.
+"""
+import bisect
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Stage names used by the app's call sites
+STAGE_CHUNK_ANALYSIS = "chunk_analysis"
+STAGE_VALIDATION = "validation"
+STAGE_SUMMARY = "summary"
+STAGE_ENRICHMENT = "enrichment"
+STAGE_MERGE_SUGGESTION = "merge_suggestion"
+STAGE_ASSISTANT_PLANNER = "assistant_planner"
+STAGE_ASSISTANT_FORMATTER = "assistant_formatter"
+UNTAGGED_STAGE = "untagged"
+
+# Histogram bucket upper bounds (the last bucket is open-ended)
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)  # seconds
+WAIT_BUCKETS = (0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60)  # seconds
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+RETRY_BUCKETS = (0, 1, 2, 3, 5)
+
+
+# =============================================================================
+# HISTOGRAMS
+# =============================================================================
+
+class Histogram:
+    """Fixed-bucket histogram with count/sum/max and bucket-estimated percentiles."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+# =============================================================================
+# CALL RECORDS & AGGREGATION
+# =============================================================================
+
+@dataclass
+class LLMCallRecord:
+    """One invoke_with_retry call (all attempts)."""
+    stage: str
+    model: Optional[str]
+    latency: float = 0.0  # Seconds in the successful (or last) attempt
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    retries: int = 0
+    rate_limited: int = 0  # Attempts answered with a 429
+    limiter_wait: float = 0.0  # Seconds waiting on the model's rate limiter
+    queue_wait: float = 0.0  # Seconds waiting for a scheduler slot
+    fallback: bool = False  # Made by invoke_with_fallback on the fallback model
+    hedge: bool = False  # Fallback call racing a slow primary call
+    cached: bool = False  # Served from the response cache
+    failed: bool = False
+    cancelled: bool = False  # Abandoned by the caller (e.g. lost a hedge race)
+    truncated: bool = False  # Streamed response broke off; partial result kept
+
+
+class _StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.hedges = 0
+        self.cancelled = 0
+        self.truncated = 0
+        self.rate_limited = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.models: Dict[str, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.limiter_wait = Histogram(WAIT_BUCKETS)
+        self.queue_wait = Histogram(WAIT_BUCKETS)
+        self.prompt_token_hist = Histogram(TOKEN_BUCKETS)
+        self.completion_token_hist = Histogram(TOKEN_BUCKETS)
+        self.retries = Histogram(RETRY_BUCKETS)
+
+    def add(self, record: LLMCallRecord) -> None:
+        self.calls += 1
+        if record.cached:
+            # No request was made; only the hit is worth counting
+            self.cache_hits += 1
+            return
+        if record.model:
+            self.models[record.model] = self.models.get(record.model, 0) + 1
+        self.failures += record.failed
+        self.fallbacks += record.fallback
+        self.hedges += record.hedge
+        self.truncated += record.truncated
+        self.rate_limited += record.rate_limited
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        if record.cancelled:
+            # Its latency says nothing about the model's, only that it lost
+            self.cancelled += 1
+            return
+        self.latency.observe(record.latency)
+        self.limiter_wait.observe(record.limiter_wait)
+        self.queue_wait.observe(record.queue_wait)
+        self.retries.observe(record.retries)
+        if not record.failed:
+            self.prompt_token_hist.observe(record.prompt_tokens)
+            self.completion_token_hist.observe(record.completion_tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "cache_hits": self.cache_hits,
+            "fallbacks": self.fallbacks,
+            "hedges": self.hedges,
+            "cancelled": self.cancelled,
+            "truncated": self.truncated,
+            "rate_limited": self.rate_limited,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "models": dict(self.models),
+            "latency_seconds": self.latency.snapshot(),
+            "limiter_wait_seconds": self.limiter_wait.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "prompt_tokens_per_call": self.prompt_token_hist.snapshot(),
+            "completion_tokens_per_call": self.completion_token_hist.snapshot(),
+            "retries_per_call": self.retries.snapshot(),
+        }
+
+    def summary_line(self, stage: str) -> str:
+        latency = self.latency.snapshot()
+        return (
+            f"{stage}: {self.calls} calls ({self.failures} failed, {self.cache_hits} cached, "
+            f"{self.fallbacks} fallback, {self.hedges} hedged), tokens {self.prompt_tokens}+{self.completion_tokens}, "
+            f"latency p50={latency['p50']} p95={latency['p95']}s, "
+            f"limiter wait {self.limiter_wait.total:.1f}s, {int(self.retries.total)} retries"
+        )
+
+
+class LLMTelemetry:
+    """Thread-safe per-stage aggregation of LLMCallRecords."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _StageStats] = {}
+        self._since = time.time()
+        self._last_log = time.monotonic()
+
+    def record(self, record: LLMCallRecord) -> None:
+        with self._lock:
+            stats = self._stages.get(record.stage)
+            if stats is None:
+                stats = self._stages[record.stage] = _StageStats()
+            stats.add(record)
+            log_due = self._log_due()
+
+        if not record.cached:
+            logger.debug(
+                f"LLM call [{record.stage}] model={record.model} latency={record.latency:.2f}s "
+                f"tokens={record.prompt_tokens}+{record.completion_tokens} retries={record.retries} "
+                f"limiter_wait={record.limiter_wait:.2f}s fallback={record.fallback} failed={record.failed} "
+                f"cancelled={record.cancelled}"
+            )
+        if log_due:
+            self.log_summary()
+
+    def _log_due(self) -> bool:
+        interval = settings.LLM_TELEMETRY_LOG_INTERVAL_SECONDS
+        if interval <= 0 or time.monotonic() - self._last_log < interval:
+            return False
+        self._last_log = time.monotonic()
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "since": self._since,
+                "stages": {stage: stats.snapshot() for stage, stats in sorted(self._stages.items())},
+            }
+
+    def summary_lines(self) -> List[str]:
+        with self._lock:
+            return [stats.summary_line(stage) for stage, stats in sorted(self._stages.items())]
+
+    def log_summary(self) -> None:
+        lines = self.summary_lines()
+        if lines:
+            logger.info("LLM telemetry by stage:\n  " + "\n  ".join(lines))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._since = time.time()
+
+
+_telemetry = LLMTelemetry()
+
+
+def get_llm_telemetry() -> LLMTelemetry:
+    return _telemetry
+
+
+# =============================================================================
+# TOKEN USAGE
+# =============================================================================
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """
+    Collects token usage reported by chat model runs. Passed as a callback on
+    each attempt, so it also sees usage of structured-output calls, whose
+    parsed result no longer carries the raw message.
+    """
+    run_inline = True
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        found = False
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    found = True
+                    self.prompt_tokens += usage.get("input_tokens", 0)
+                    self.completion_tokens += usage.get("output_tokens", 0)
+        if not found:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+            self.completion_tokens += usage.get("completion_tokens", 0) or 0
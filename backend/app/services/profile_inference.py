@@ -10,100 +10,30 @@ import logging
 from typing import Dict, List, Any, Optional
 
 from app.core.config import settings
+from app.services.keywords import scan_keywords
+from app.services.profile_merge import ProfileMerge
+from app.services.round_trips import RoundTrips
 
 logger = logging.getLogger(__name__)
 
 
-# =============================================================================
-# KEYWORD DICTIONARIES
-# =============================================================================
-
-# Role tag keywords to detect from service descriptions
-ROLE_TAG_KEYWORDS = {
-    'buyer': ['buyer', 'buying', 'purchase', 'acquire', 'looking for deals', 'looking for properties'],
-    'seller': ['seller', 'selling', 'have deal', 'have property', 'disposing'],
-    'wholesaler': ['wholesaler', 'wholesale', 'assign', 'assignment fee'],
-    'lender': ['lender', 'lending', 'fund', 'funding', 'capital', 'hard money', 'private money', 'money to lend'],
-    'investor': ['investor', 'investing', 'invest', 'deploy capital'],
-    'tc': ['tc', 'transaction coordinator', 'coordination', 'closing'],
-    'gator': ['gator', 'gator lender', 'earnest money', 'emd'],
-    'subto': ['subto', 'subject to', 'sub-to', 'sub2', 'creative finance'],
-    'bird_dog': ['bird dog', 'birddog', 'finding deals', 'lead generation'],
-}
-
-# Asset class keywords
-ASSET_CLASS_KEYWORDS = {
-    'SFH': ['sfh', 'single family', 'single-family', 'house', 'home'],
-    'Multifamily': ['multifamily', 'multi-family', 'apartment', 'duplex', 'triplex', 'fourplex', 'unit'],
-    'Commercial': ['commercial', 'office', 'retail', 'shopping'],
-    'Land': ['land', 'lot', 'acreage', 'vacant'],
-    'Mobile Home': ['mobile home', 'manufactured', 'trailer', 'mh'],
-    'Industrial': ['industrial', 'warehouse', 'distribution'],
-}
-
-# State codes to detect markets
-STATE_CODES = [
-    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 
-    'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD', 
-    'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 
-    'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 
-    'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
-]
-
-STATE_NAMES = {
-    'texas': 'TX', 'florida': 'FL', 'california': 'CA', 'missouri': 'MO',
-    'ohio': 'OH', 'georgia': 'GA', 'arizona': 'AZ', 'colorado': 'CO',
-    'new york': 'NY', 'north carolina': 'NC', 'tennessee': 'TN', 'indiana': 'IN',
-    'michigan': 'MI', 'pennsylvania': 'PA', 'nevada': 'NV', 'oklahoma': 'OK',
-    'nationwide': 'Nationwide', 'all states': 'Nationwide'
-}
-
-
 # =============================================================================
 # EXTRACTION FUNCTIONS
 # =============================================================================
 
 def extract_role_tags(text: str) -> List[str]:
     """Extract role tags from text based on keyword matching."""
-    text_lower = text.lower()
-    detected = set()
-    for role, keywords in ROLE_TAG_KEYWORDS.items():
-        for kw in keywords:
-            if kw in text_lower:
-                detected.add(role)
-                break
-    return list(detected)
+    return list(scan_keywords(text)["role_tags"])
 
 
 def extract_asset_classes(text: str) -> List[str]:
     """Extract asset classes from text."""
-    text_lower = text.lower()
-    detected = set()
-    for asset, keywords in ASSET_CLASS_KEYWORDS.items():
-        for kw in keywords:
-            if kw in text_lower:
-                detected.add(asset)
-                break
-    return list(detected)
+    return list(scan_keywords(text)["asset_classes"])
 
 
 def extract_markets(text: str) -> List[str]:
     """Extract geographic markets (states) from text."""
-    detected = set()
-    text_upper = text.upper()
-    text_lower = text.lower()
-    
-    # Check for state codes (with word boundaries)
-    for code in STATE_CODES:
-        if re.search(rf'\b{code}\b', text_upper):
-            detected.add(code)
-    
-    # Check for state names
-    for name, code in STATE_NAMES.items():
-        if name in text_lower:
-            detected.add(code)
-    
-    return list(detected)
+    return list(scan_keywords(text)["markets"])
 
 
 def extract_prices(text: str) -> Dict[str, Optional[float]]:
@@ -163,16 +93,17 @@ def infer_profile_from_services(services: List[Dict[str, Any]], contact_name: st
     
     combined_text = ' '.join(all_descriptions)
     
-    # Extract fields
-    role_tags = extract_role_tags(combined_text)
+    # Extract fields (one keyword scan covers roles, assets and markets)
+    keyword_hits = scan_keywords(combined_text)
+    role_tags = list(keyword_hits["role_tags"])
     
     # Merge explicit extracted roles (e.g. from Emojis/Regex)
     if extracted_roles:
         # Normalize and dedup
         role_tags.extend([r for r in extracted_roles if r not in role_tags])
         
-    assets = extract_asset_classes(combined_text)
-    markets = extract_markets(combined_text)
+    assets = list(keyword_hits["asset_classes"])
+    markets = list(keyword_hits["markets"])
     prices = extract_prices(combined_text)
     
     # Extract "Hot Plate" (simple heuristic)
@@ -268,35 +199,13 @@ def update_contact_profile_from_services(client, contact_id: str, user_id: str,
         if not inferred or len(inferred) <= 1:  # Only has field_provenance
             return False
         
-        # Check if profile exists
-        existing = client.table("contact_profiles").select("*").eq("contact_id", contact_id).execute()
-        
-        if existing.data:
-            # Update only empty fields
-            current = existing.data[0]
-            current_provenance = current.get('field_provenance', {}) or {}
-            new_provenance = inferred.pop('field_provenance', {})
-            
-            updates = {}
-            for field, value in inferred.items():
-                # Only update if current field is empty/null
-                if not current.get(field) or (isinstance(current.get(field), list) and len(current.get(field)) == 0):
-                    updates[field] = value
-                    current_provenance[field] = new_provenance.get(field, 'ai_generated')
-            
-            if updates:
-                updates['field_provenance'] = current_provenance
-                client.table("contact_profiles").update(updates).eq("contact_id", contact_id).execute()
-                logger.info(f"Updated profile for {contact_name} with AI-inferred: {list(updates.keys())}")
-                return True
-        else:
-            # Create new profile with inferred data
-            inferred['contact_id'] = contact_id
-            inferred['user_id'] = user_id
-            client.table("contact_profiles").insert(inferred).execute()
-            logger.info(f"Created AI-inferred profile for {contact_name}")
+        merge = ProfileMerge(RoundTrips(client))
+        merge.load([contact_id])
+        merge.fill_inferred(contact_id, inferred, user_id)
+        changed = merge.save()
+        if changed:
+            logger.info(f"Updated profile for {contact_name} with AI-inferred: {list(changed[contact_id])}")
             return True
-        
         return False
         
     except Exception as e:
@@ -0,0 +1,146 @@
+"""
+Profile Merge Module
+
+Writes AI profile data into contact_profiles under the field_provenance
+rules, for any number of contacts at once:
+- Inferred fields (regex, see profile_inference) only fill fields that
+  are still empty.
+- Extracted fields (LLM rich profiles) overwrite any field that is not
+  user_verified.
+
+Usage: load() the contacts' current profiles (one `in` query per
+IN_FILTER_SIZE contacts), apply inferred/extracted data in memory, then
+save() them: existing profiles with one set-based UPDATE (the
+update_contact_profiles function, migration 013), new ones with one bulk
+insert.
+"""
+import datetime
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.hybrid_extraction import ExtractedProfile
+from app.services.round_trips import WRITE_BATCH_SIZE, RoundTrips
+
+logger = logging.getLogger(__name__)
+
+AI_GENERATED = "ai_generated"
+USER_VERIFIED = "user_verified"
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or (isinstance(value, (list, dict)) and not value)
+
+
+def extracted_profile_fields(profile: ExtractedProfile) -> List[Tuple[str, Any]]:
+    """(column, value) pairs an extracted rich profile writes."""
+    fields = [
+        ("bio", profile.message_to_world),
+        ("hot_plate", profile.hot_plate),
+        ("i_can_help_with", profile.i_can_help_with),
+        ("help_me_with", profile.help_me_with),
+        ("message_to_world", profile.message_to_world),
+        ("communities", profile.communities),
+        ("asset_classes", profile.asset_classes),
+        ("role_tags", profile.role_tags),
+    ]
+    if profile.buy_box:
+        fields += [
+            ("min_target_price", profile.buy_box.min_price),
+            ("max_target_price", profile.buy_box.max_price),
+            ("buy_box", profile.buy_box.model_dump()),
+        ]
+    fields += [
+        ("blinq", profile.blinq),
+        ("website", profile.website),
+        ("social_media", {link.platform: link.url for link in profile.social_media}),
+    ]
+    return fields
+
+
+class ProfileMerge:
+    """Pending profile changes for a set of contacts, written in bulk by save()."""
+
+    def __init__(self, db: RoundTrips):
+        self.db = db
+        self._current: Dict[str, Dict[str, Any]] = {}  # contact id -> profile row ({} if none)
+        self._existing: set = set()
+        self._owners: Dict[str, Optional[str]] = {}  # contact id -> user_id for new profiles
+        self._updates: Dict[str, Dict[str, Any]] = {}
+        self.skipped: List[str] = []  # New profiles the last save() left out (no owner)
+
+    def load(self, contact_ids: Iterable[str], new_contact_ids: Iterable[str] = ()) -> None:
+        """
+        Fetch the current profiles of contact_ids. Contacts in
+        new_contact_ids were just created, so they are known to have no
+        profile and are not queried.
+        """
+        contact_ids = [cid for cid in dict.fromkeys(contact_ids) if cid not in self._current]
+        for row in self.db.select_in("contact_profiles", "*", "contact_id", contact_ids):
+            self._current[row["contact_id"]] = row
+            self._existing.add(row["contact_id"])
+        for cid in [*contact_ids, *new_contact_ids]:
+            self._current.setdefault(cid, {})
+
+    def _set(self, contact_id: str, field: str, value: Any, provenance: str) -> None:
+        current = self._current[contact_id]
+        updates = self._updates.setdefault(contact_id, {})
+        current[field] = updates[field] = value
+        field_provenance = dict(current.get("field_provenance") or {})
+        field_provenance[field] = provenance
+        current["field_provenance"] = updates["field_provenance"] = field_provenance
+
+    def fill_inferred(self, contact_id: str, inferred: Dict[str, Any], user_id: Optional[str]) -> None:
+        """Inferred fields (infer_profile_from_services output) fill only fields that are still empty."""
+        inferred = dict(inferred)
+        inferred_provenance = inferred.pop("field_provenance", {})
+        self._owners.setdefault(contact_id, user_id)
+        for field, value in inferred.items():
+            if _is_empty(self._current[contact_id].get(field)):
+                self._set(contact_id, field, value, inferred_provenance.get(field, AI_GENERATED))
+
+    def apply_extracted(self, contact_id: str, profile: ExtractedProfile, user_id: Optional[str]) -> None:
+        """Extracted fields overwrite anything that isn't user_verified."""
+        self._owners.setdefault(contact_id, user_id)
+        provenance = self._current[contact_id].get("field_provenance") or {}
+        changed = False
+        for field, value in extracted_profile_fields(profile):
+            if _is_empty(value) or provenance.get(field) == USER_VERIFIED:
+                continue
+            self._set(contact_id, field, value, AI_GENERATED)
+            changed = True
+        if changed:
+            self._current[contact_id]["updated_at"] = self._updates[contact_id]["updated_at"] = (
+                datetime.datetime.now(datetime.timezone.utc).isoformat()
+            )
+
+    def save(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Write all pending changes; returns contact id -> changed fields.
+        New profiles need an owner (user_id is NOT NULL); ones without are
+        skipped and listed in self.skipped.
+        """
+        changed = {cid: updates for cid, updates in self._updates.items() if updates}
+        # Existing profiles: partial updates through update_contact_profiles
+        # (migration 013), one set-based UPDATE per batch
+        existing = [{**updates, "contact_id": cid} for cid, updates in changed.items() if cid in self._existing]
+        for start in range(0, len(existing), WRITE_BATCH_SIZE):
+            self.db.rpc("update_contact_profiles", {"profiles": existing[start:start + WRITE_BATCH_SIZE]})
+
+        # New profiles leave unset columns to their defaults
+        new_rows = []
+        self.skipped = []
+        for cid, updates in changed.items():
+            if cid in self._existing:
+                continue
+            if not self._owners.get(cid):
+                logger.warning(f"Skipping new profile for contact {cid}: no owner")
+                self.skipped.append(cid)
+                continue
+            new_rows.append({**updates, "contact_id": cid, "user_id": self._owners[cid]})
+        self.db.upsert("contact_profiles", new_rows, on_conflict="contact_id", default_to_null=False)
+
+        for cid in self.skipped:
+            del changed[cid]
+        self._existing.update(changed)
+        self._updates.clear()
+        return changed
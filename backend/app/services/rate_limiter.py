@@ -0,0 +1,381 @@
+"""
+Rate Limiter Module
+
+Adaptive token-bucket rate limiting for LLM calls, one bucket per model.
+
+The request rate follows provider feedback (AIMD): every call that comes
+back within LLM_RATE_LIMIT_TARGET_LATENCY adds LLM_RATE_LIMIT_INCREASE
+requests/second, while a 429 halves the rate and pauses the bucket (for the
+Retry-After time when the provider sends one). Slow responses back off
+gently. Throughput therefore climbs to what the provider allows instead of
+sitting at a fixed LLM_RATE_LIMIT_RPS, without repeated 429 storms.
+
+Bucket state lives in a local SQLite file (LLM_RATE_LIMIT_SHARED), so all
+uvicorn workers and CLI scripts on the host draw from the same buckets.
+Within a process, waiters queue by priority (lower value first, see
+llm_factory.LLMPriority); the one at the head sleeps exactly until the
+bucket can serve it, or until a feedback event or a more urgent waiter
+wakes it, rather than polling.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DECREASE_FACTOR = 0.5  # Rate multiplier on a 429
+SLOW_DECREASE_FACTOR = 0.9  # Rate multiplier on a response slower than the target
+MIN_DECREASE_INTERVAL = 1.0  # Seconds; one burst of 429s counts as one decrease
+
+# Bucket fields: rate (req/s), tokens, updated_at, blocked_until, last_decrease
+Bucket = Dict[str, float]
+
+
+# =============================================================================
+# BUCKET STATE
+# =============================================================================
+
+class BucketStore:
+    """
+    Bucket state keyed by model. Updates run as one SQLite write transaction
+    so processes sharing the file never interleave read-modify-write; if the
+    file can't be used, state falls back to this process only.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._local: Dict[str, Bucket] = {}
+        self._disabled = path is None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=10, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                " model TEXT PRIMARY KEY,"
+                " rate REAL NOT NULL,"
+                " tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " blocked_until REAL NOT NULL,"
+                " last_decrease REAL NOT NULL)"
+            )
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Shared rate limit state {self.path} unavailable, using per-process limits: {e}")
+            self._disabled = True
+        return self._conn
+
+    def update(self, model: str, initial: Bucket, fn: Callable[[Bucket], float]) -> float:
+        """Apply fn to the model's bucket (created from `initial`) and save it."""
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        row = conn.execute(
+                            "SELECT rate, tokens, updated_at, blocked_until, last_decrease"
+                            " FROM rate_limit_buckets WHERE model = ?",
+                            (model,),
+                        ).fetchone()
+                        bucket = dict(zip(initial, row)) if row else dict(initial)
+                        result = fn(bucket)
+                        conn.execute(
+                            "INSERT OR REPLACE INTO rate_limit_buckets"
+                            " (model, rate, tokens, updated_at, blocked_until, last_decrease)"
+                            " VALUES (?, ?, ?, ?, ?, ?)",
+                            (model, *(bucket[k] for k in initial)),
+                        )
+                        conn.execute("COMMIT")
+                        return result
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                except sqlite3.Error as e:
+                    logger.warning(f"Shared rate limit update failed, using per-process limits: {e}")
+                    self._disabled = True
+
+            bucket = self._local.setdefault(model, dict(initial))
+            return fn(bucket)
+
+
+# =============================================================================
+# LIMITER
+# =============================================================================
+
+class PriorityLock:
+    """
+    asyncio lock that is handed to the waiter with the lowest priority value
+    on release (FIFO within a priority).
+    """
+
+    def __init__(self):
+        self._locked = False
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.owner_priority: Optional[int] = None
+
+    def locked(self) -> bool:
+        return self._locked
+
+    def has_waiter_before(self, priority: int) -> bool:
+        """True if a pending waiter has a more urgent (lower) priority."""
+        return any(p < priority and not fut.done() for p, _, fut in self._waiters)
+
+    async def acquire(self, priority: int = 0) -> None:
+        if not self._locked and not self._waiters:
+            self._locked = True
+            self.owner_priority = priority
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # Ownership was handed over just before cancellation
+            raise
+        self.owner_priority = priority
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)  # Ownership passes directly to this waiter
+                return
+        self._locked = False
+        self.owner_priority = None
+
+
+class AdaptiveRateLimiter(BaseRateLimiter):
+    """
+    AIMD token bucket for one model. Use aacquire() before a request and
+    report the outcome with arecord_success() or arecord_rate_limited()
+    (or their sync counterparts).
+    """
+
+    def __init__(
+        self,
+        model: str,
+        store: BucketStore,
+        initial_rps: float,
+        min_rps: float,
+        max_rps: float,
+        burst: int,
+        increase: float,
+        target_latency: float,
+    ):
+        self.model = model
+        self.store = store
+        self.initial_rps = initial_rps
+        self.min_rps = min_rps
+        self.max_rps = max_rps
+        self.burst = burst
+        self.increase = increase
+        self.target_latency = target_latency
+        self._thread_lock = threading.Lock()
+        # asyncio primitives are bound to one event loop (CLI scripts may run several)
+        self._loop_waiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[PriorityLock, asyncio.Event]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _initial_bucket(self) -> Bucket:
+        now = time.time()
+        return {
+            "rate": self.initial_rps,
+            "tokens": 1.0,
+            "updated_at": now,
+            "blocked_until": 0.0,
+            "last_decrease": 0.0,
+        }
+
+    def _refill(self, bucket: Bucket, now: float) -> None:
+        bucket["rate"] = min(self.max_rps, max(self.min_rps, bucket["rate"]))
+        elapsed = max(0.0, now - bucket["updated_at"])
+        bucket["tokens"] = min(float(self.burst), bucket["tokens"] + elapsed * bucket["rate"])
+        bucket["updated_at"] = now
+
+    def _take(self) -> float:
+        """Take a token if one is available; otherwise return seconds to wait."""
+        def take(bucket: Bucket) -> float:
+            now = time.time()
+            self._refill(bucket, now)
+            if now < bucket["blocked_until"]:
+                return bucket["blocked_until"] - now
+            if bucket["tokens"] >= 1:
+                bucket["tokens"] -= 1
+                return 0.0
+            return (1 - bucket["tokens"]) / bucket["rate"]
+        return self.store.update(self.model, self._initial_bucket(), take)
+
+    def _waiters(self) -> Tuple[PriorityLock, asyncio.Event]:
+        loop = asyncio.get_running_loop()
+        waiters = self._loop_waiters.get(loop)
+        if waiters is None:
+            waiters = (PriorityLock(), asyncio.Event())
+            self._loop_waiters[loop] = waiters
+        return waiters
+
+    def _notify(self) -> None:
+        """Wake this loop's head waiter to re-check the bucket after a rate change."""
+        waiters = self._loop_waiters.get(asyncio.get_running_loop())
+        if waiters:
+            waiters[1].set()
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        with self._thread_lock:
+            while True:
+                wait = self._take()
+                if wait <= 0:
+                    return True
+                if not blocking:
+                    return False
+                time.sleep(wait)
+
+    async def aacquire(self, *, blocking: bool = True, priority: int = 0) -> bool:
+        lock, changed = self._waiters()
+        if lock.locked() and lock.owner_priority is not None and priority < lock.owner_priority:
+            # Wake the less urgent head so it steps aside for us
+            changed.set()
+        await lock.acquire(priority)
+        owned = True  # False while re-queued behind a more urgent waiter
+        try:
+            while True:
+                wait = await asyncio.to_thread(self._take)
+                if wait <= 0:
+                    return True
+                if not blocking:
+                    return False
+                if lock.has_waiter_before(priority):
+                    lock.release()
+                    owned = False
+                    await lock.acquire(priority)
+                    owned = True
+                    continue
+                changed.clear()
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if owned:
+                lock.release()
+
+    async def arecord_success(self, latency: float) -> None:
+        await asyncio.to_thread(self.record_success, latency)
+        self._notify()
+
+    async def arecord_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.record_rate_limited, retry_after)
+
+    def record_success(self, latency: float) -> None:
+        """Additive increase after a timely response; gentle decrease if slow."""
+        def update(bucket: Bucket) -> float:
+            now = time.time()
+            self._refill(bucket, now)
+            if latency <= self.target_latency:
+                bucket["rate"] = min(self.max_rps, bucket["rate"] + self.increase)
+            elif now - bucket["last_decrease"] >= max(MIN_DECREASE_INTERVAL, 1 / bucket["rate"]):
+                bucket["rate"] = max(self.min_rps, bucket["rate"] * SLOW_DECREASE_FACTOR)
+                bucket["last_decrease"] = now
+            return bucket["rate"]
+        self.store.update(self.model, self._initial_bucket(), update)
+
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease on a 429 and pause the bucket."""
+        def update(bucket: Bucket) -> float:
+            now = time.time()
+            self._refill(bucket, now)
+            if now - bucket["last_decrease"] >= max(MIN_DECREASE_INTERVAL, 1 / bucket["rate"]):
+                bucket["rate"] = max(self.min_rps, bucket["rate"] * DECREASE_FACTOR)
+                bucket["last_decrease"] = now
+            pause = retry_after if retry_after is not None else 1 / bucket["rate"]
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + pause)
+            bucket["tokens"] = 0.0
+            return bucket["rate"]
+        rate = self.store.update(self.model, self._initial_bucket(), update)
+        logger.warning(f"Rate limited by provider ({self.model}): now {rate:.2f} req/s")
+
+    def current_rate(self) -> float:
+        """Current allowed requests/second for this model."""
+        def read(bucket: Bucket) -> float:
+            self._refill(bucket, time.time())
+            return bucket["rate"]
+        return self.store.update(self.model, self._initial_bucket(), read)
+
+
+# =============================================================================
+# SHARED LIMITERS
+# =============================================================================
+
+_bucket_store: Optional[BucketStore] = None
+_rate_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_model_rate_limiter(model: str) -> AdaptiveRateLimiter:
+    """Get the limiter for `model` (buckets are shared across processes if enabled)."""
+    global _bucket_store
+    if _bucket_store is None:
+        path = (
+            os.path.join(settings.CACHE_DIR, "llm_rate_limits.sqlite")
+            if settings.LLM_RATE_LIMIT_SHARED else None
+        )
+        _bucket_store = BucketStore(path)
+
+    limiter = _rate_limiters.get(model)
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(
+            model,
+            _bucket_store,
+            initial_rps=settings.LLM_RATE_LIMIT_RPS,
+            min_rps=settings.LLM_RATE_LIMIT_MIN_RPS,
+            max_rps=settings.LLM_RATE_LIMIT_MAX_RPS,
+            burst=settings.LLM_RATE_LIMIT_BURST,
+            increase=settings.LLM_RATE_LIMIT_INCREASE,
+            target_latency=settings.LLM_RATE_LIMIT_TARGET_LATENCY,
+        )
+        _rate_limiters[model] = limiter
+        logger.info(
+            f"Rate limiter initialized for {model}: start {settings.LLM_RATE_LIMIT_RPS} RPS "
+            f"(adaptive {settings.LLM_RATE_LIMIT_MIN_RPS}-{settings.LLM_RATE_LIMIT_MAX_RPS}), "
+            f"burst={settings.LLM_RATE_LIMIT_BURST}"
+        )
+    return limiter
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True if `error` is a provider 429 (openai.RateLimitError or similar)."""
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After from a 429 response, in seconds, if the provider sent one."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,111 @@
+"""
+Round Trips Module
+
+Bulk PostgREST helpers that count their requests, so a caller can batch
+reads and writes (`in` filters, paged selects, multi-row inserts and
+upserts) and log how many round trips an operation took.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from postgrest.types import ReturnMethod
+from supabase import Client
+
+IN_FILTER_SIZE = 100  # Values per `in` filter (keeps request URLs short)
+WRITE_BATCH_SIZE = 500  # Rows per bulk insert/upsert
+PAGE_SIZE = 1000  # PostgREST's default max rows per response
+
+
+class RoundTrips:
+    """Executes PostgREST queries and counts them."""
+
+    def __init__(self, client: Client):
+        self.client = client
+        self.count = 0
+
+    def execute(self, query: Any) -> Any:
+        self.count += 1
+        return query.execute()
+
+    def select_all(self, build_query: Callable[[], Any]) -> List[Dict[str, Any]]:
+        """All rows of a select, paged past the max-rows limit."""
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = self.execute(build_query().range(offset, offset + PAGE_SIZE - 1)).data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            offset += PAGE_SIZE
+
+    def select_in(
+        self,
+        table: str,
+        columns: str,
+        column: str,
+        values: Iterable[Any],
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rows whose `column` is one of `values`, in IN_FILTER_SIZE slices."""
+        values = list(dict.fromkeys(v for v in values if v))
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(values), IN_FILTER_SIZE):
+            def build_query(chunk=values[start:start + IN_FILTER_SIZE]):
+                query = self.client.table(table).select(columns)
+                for key, value in (filters or {}).items():
+                    query = query.eq(key, value)
+                return query.in_(column, chunk)
+            rows.extend(self.select_all(build_query))
+        return rows
+
+    def insert(
+        self,
+        table: str,
+        rows: Sequence[Dict[str, Any]],
+        skip_conflicts_on: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Bulk insert; returns the inserted rows in input order. With
+        skip_conflicts_on (a unique column), rows conflicting on it are
+        skipped (ON CONFLICT DO NOTHING) and left out of the result.
+        """
+        inserted: List[Dict[str, Any]] = []
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            batch = list(rows[start:start + WRITE_BATCH_SIZE])
+            if skip_conflicts_on:
+                query = self.client.table(table).upsert(batch, on_conflict=skip_conflicts_on, ignore_duplicates=True)
+            else:
+                query = self.client.table(table).insert(batch)
+            inserted.extend(self.execute(query).data or [])
+        return inserted
+
+    def rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        """Call a database function; returns its result."""
+        return self.execute(self.client.rpc(function, params)).data
+
+    def upsert(
+        self,
+        table: str,
+        rows: Sequence[Dict[str, Any]],
+        on_conflict: str,
+        default_to_null: bool = True,
+    ) -> None:
+        """
+        Bulk upsert. A bulk request sets every column named by any of its
+        rows, missing ones to null, so rows are grouped by their columns.
+        With default_to_null=False missing columns take their defaults
+        instead, which is only safe for rows that are new.
+        """
+        groups: Dict[frozenset, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            groups[frozenset(row) if default_to_null else frozenset()].append(row)
+        for group in groups.values():
+            for start in range(0, len(group), WRITE_BATCH_SIZE):
+                self.execute(
+                    self.client.table(table).upsert(
+                        group[start:start + WRITE_BATCH_SIZE],
+                        on_conflict=on_conflict,
+                        returning=ReturnMethod.minimal,
+                        default_to_null=default_to_null,
+                    )
+                )
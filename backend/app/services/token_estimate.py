@@ -0,0 +1,21 @@
+"""
+Token Estimate Module
+
+Local token estimator shared by chunk packing (chunking) and batched
+profile enrichment (hybrid_extraction); no tokenizer download or API call.
+It is deliberately approximate: it only needs to keep prompts comparable
+and below the model's context, not to bill usage.
+"""
+import re
+
+# Words, short digit groups and individual symbols/emoji roughly follow how
+# BPE tokenizers split chat text; long words cost one extra token per 8 chars
+TOKEN_PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text` for budget packing."""
+    tokens = 0
+    for piece in TOKEN_PIECE_PATTERN.findall(text):
+        tokens += 1 + len(piece) // 8
+    return tokens
@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Any
 import logging
 from supabase import Client
+from app.services.contact_resolver import contact_search_filter
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +38,11 @@ def get_meeting_chat(client: Client, meeting_id: str) -> Dict[str, Any]:
 def search_contacts(client: Client, query: str) -> List[Dict[str, Any]]:
     """Search contacts by name, email, or phone."""
     try:
-        # Supabase/Postgres simple ILIKE search
+        # Supabase/Postgres simple ILIKE search (phone-like queries match phone_digits)
         # For more complex search we'd use full text search
         res = client.table("contacts")\
             .select("*, profile:contact_profiles(*), services(*)")\
-            .or_(f"name.ilike.%{query}%,email.ilike.%{query}%,phone.ilike.%{query}%")\
+            .or_(contact_search_filter(query))\
             .limit(20)\
             .execute()
         
@@ -148,9 +149,7 @@ def advanced_contact_search(
         
         # Text search on contacts
         if query:
-            contact_query = contact_query.or_(
-                f"name.ilike.%{query}%,email.ilike.%{query}%,phone.ilike.%{query}%"
-            )
+            contact_query = contact_query.or_(contact_search_filter(query))
             filters_applied.append(f"text: '{query}'")
         
         # Execute initial contact search
@@ -0,0 +1,46 @@
+-- Migration 011: Canonical Phone Digits
+-- Phones are stored as captured ("(385) 208-2523", "385.208.2523", "3852082523").
+-- contacts.phone_digits holds one canonical form for lookups and duplicate
+-- grouping, kept current by a trigger on every insert/update.
+
+-- Same rules as canonical_phone() in app/services/contact_resolver.py:
+-- ASCII digits only, leading US country code dropped, NULL if under 7 digits
+CREATE OR REPLACE FUNCTION public.canonical_phone(raw TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN length(d) = 11 AND left(d, 1) = '1' THEN substr(d, 2)
+        WHEN length(d) >= 7 THEN d
+        ELSE NULL
+    END
+    FROM (SELECT regexp_replace(coalesce(raw, ''), '[^0-9]', '', 'g') AS d) AS digits;
+$$;
+
+ALTER TABLE contacts ADD COLUMN IF NOT EXISTS phone_digits TEXT;
+
+CREATE OR REPLACE FUNCTION public.set_contact_phone_digits()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.phone_digits := public.canonical_phone(NEW.phone);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS contacts_phone_digits ON contacts;
+CREATE TRIGGER contacts_phone_digits
+    BEFORE INSERT OR UPDATE OF phone, phone_digits ON contacts
+    FOR EACH ROW EXECUTE FUNCTION public.set_contact_phone_digits();
+
+-- Backfill
+UPDATE contacts
+SET phone_digits = public.canonical_phone(phone)
+WHERE phone_digits IS DISTINCT FROM public.canonical_phone(phone);
+
+CREATE INDEX IF NOT EXISTS idx_contacts_org_phone_digits
+ON contacts(org_id, phone_digits) WHERE phone_digits IS NOT NULL;
+
+COMMENT ON COLUMN contacts.phone_digits IS 'canonical_phone(phone); maintained by trigger contacts_phone_digits';
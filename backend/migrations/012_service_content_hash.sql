@@ -0,0 +1,74 @@
+-- Migration 012: Service Content Hash
+-- A service is a duplicate of another in the same chat when contact, type
+-- and the start of the normalized description match. services.content_hash
+-- identifies that key and carries a unique index, so extraction saves can
+-- bulk insert with ON CONFLICT (content_hash) DO NOTHING instead of running
+-- an ILIKE prefix query per service. Services added by hand (POST /services)
+-- have no chat and no hash, so the index never applies to them.
+
+-- Same rules as service_content_hash() in app/services/extraction_store.py:
+-- description trimmed, whitespace runs collapsed, lowercased, first 50
+-- characters; sha256 over chat|contact|type|description
+CREATE OR REPLACE FUNCTION public.service_content_hash(
+    chat_id UUID, contact_id UUID, service_type TEXT, description TEXT
+)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT encode(sha256(convert_to(concat_ws('|',
+        coalesce(chat_id::text, ''),
+        coalesce(contact_id::text, ''),
+        coalesce(service_type, ''),
+        left(lower(btrim(regexp_replace(coalesce(description, ''), '\s+', ' ', 'g'))), 50)
+    ), 'UTF8')), 'hex');
+$$;
+
+ALTER TABLE services ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Backfill; rows that duplicate an earlier one keep a NULL hash
+WITH hashed AS (
+    SELECT id,
+           public.service_content_hash(meeting_chat_id, contact_id, type, description) AS hash,
+           row_number() OVER (
+               PARTITION BY public.service_content_hash(meeting_chat_id, contact_id, type, description)
+               ORDER BY created_at, id
+           ) AS n
+    FROM services
+    WHERE meeting_chat_id IS NOT NULL
+)
+UPDATE services s
+SET content_hash = CASE WHEN hashed.n = 1 THEN hashed.hash END
+FROM hashed
+WHERE s.id = hashed.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_services_content_hash ON services(content_hash);
+
+-- Kept current on every write. Extracted inserts always get the hash, so
+-- duplicate inserts conflict; an update that turns a row into a duplicate (e.g. a
+-- contact merge reassigning services) clears it instead of failing.
+CREATE OR REPLACE FUNCTION public.set_service_content_hash()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.meeting_chat_id IS NULL THEN
+        NEW.content_hash := NULL;
+        RETURN NEW;
+    END IF;
+    NEW.content_hash := public.service_content_hash(NEW.meeting_chat_id, NEW.contact_id, NEW.type, NEW.description);
+    IF TG_OP = 'UPDATE' AND EXISTS (
+        SELECT 1 FROM services WHERE content_hash = NEW.content_hash AND id <> NEW.id
+    ) THEN
+        NEW.content_hash := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS services_content_hash ON services;
+CREATE TRIGGER services_content_hash
+    BEFORE INSERT OR UPDATE OF meeting_chat_id, contact_id, type, description, content_hash ON services
+    FOR EACH ROW EXECUTE FUNCTION public.set_service_content_hash();
+
+COMMENT ON COLUMN services.content_hash IS 'service_content_hash(meeting_chat_id, contact_id, type, description); NULL for known duplicates and services without a chat';
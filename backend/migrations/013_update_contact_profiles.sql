@@ -0,0 +1,39 @@
+-- Migration 013: Bulk Profile Updates
+-- update_contact_profiles(profiles) applies partial updates to many existing
+-- contact_profiles rows in one set-based UPDATE. Each element is a JSON
+-- object with contact_id and the columns to change; columns it leaves out
+-- keep their current values. Used by ProfileMerge (app/services/profile_merge.py)
+-- instead of an upsert, which would have to send every NOT NULL column and
+-- pass the INSERT policy for rows that already exist.
+--
+-- SECURITY INVOKER: the caller's UPDATE policy applies, so rows it may not
+-- update are skipped, as with a plain UPDATE. Returns the number of rows updated.
+
+CREATE OR REPLACE FUNCTION public.update_contact_profiles(profiles JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+SECURITY INVOKER
+AS $$
+    WITH updated AS (
+        UPDATE contact_profiles p
+        SET (
+            blinq, website, cell_phone, office_phone,
+            bio, avatar_url, social_media, communities, role_tags,
+            hot_plate, i_can_help_with, help_me_with, message_to_world,
+            asset_classes, markets, min_target_price, max_target_price,
+            buy_box, field_provenance, updated_at
+        ) = (
+            SELECT
+                m.blinq, m.website, m.cell_phone, m.office_phone,
+                m.bio, m.avatar_url, m.social_media, m.communities, m.role_tags,
+                m.hot_plate, m.i_can_help_with, m.help_me_with, m.message_to_world,
+                m.asset_classes, m.markets, m.min_target_price, m.max_target_price,
+                m.buy_box, m.field_provenance, m.updated_at
+            FROM jsonb_populate_record(p, changes.value) AS m
+        )
+        FROM jsonb_array_elements(profiles) AS changes(value)
+        WHERE p.contact_id = (changes.value->>'contact_id')::uuid
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM updated;
+$$;
@@ -0,0 +1,138 @@
+"""
+Extraction Pipeline Benchmark
+
+Runs the full extraction graph (run_extraction_pipeline) on example_chat.txt
+and on scaled synthetic transcripts against the fake LLM server
+(fake_llm_server.py), and reports per run: wall time, LLM calls per stage,
+rate-limiter and scheduler wait, and peak memory.
+
+The fake server is started in-process unless --server-url points at one
+already running. Result caches and checkpoints are disabled so every run
+makes all of its LLM calls; the rate limiter and scheduler run with the
+usual settings (override with --rps / --max-concurrency). No database or
+API key is needed.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm_server import add_behavior_arguments, behavior_from_args, create_app
+
+
+def configure_environment(args, base_url: str) -> None:
+    """Settings are read at import time, so this runs before any app import."""
+    os.environ.setdefault("SUPABASE_URL", "http://localhost")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+    os.environ.update({
+        "OPENROUTER_API_KEY": "benchmark",
+        "OPENROUTER_BASE_URL": base_url,
+        "CACHE_DIR": tempfile.mkdtemp(prefix="mv-benchmark-"),
+        "CHUNK_CACHE_ENABLED": "false",
+        "MESSAGE_CACHE_ENABLED": "false",
+        "LLM_RESPONSE_CACHE_ENABLED": "false",
+        "EXTRACTION_CHECKPOINTS_ENABLED": "false",
+        "LLM_RATE_LIMIT_SHARED": "false",
+        "LLM_TELEMETRY_LOG_INTERVAL_SECONDS": "0",
+    })
+    if args.rps:
+        os.environ["LLM_RATE_LIMIT_RPS"] = str(args.rps)
+    if args.max_concurrency:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.max_concurrency)
+        os.environ["LLM_JOB_MAX_CONCURRENCY"] = str(args.max_concurrency)
+
+
+def start_server(behavior, port: int) -> None:
+    """Run the fake server on a background thread."""
+    import uvicorn
+
+    config = uvicorn.Config(create_app(behavior), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+
+def run_case(label: str, text: str, trace_memory: bool):
+    from app.services.extraction_graph import run_extraction_pipeline
+    from app.services.llm_telemetry import get_llm_telemetry
+
+    telemetry = get_llm_telemetry()
+    telemetry.reset()
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    data = asyncio.run(run_extraction_pipeline(text))
+    wall = time.perf_counter() - start
+
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    stages = telemetry.snapshot()["stages"]
+
+    print(f"\n=== {label} ===")
+    print(f"Messages:          {len(data.transcript):,} kept")
+    print(f"Extracted:         {len(data.services):,} services, {len(data.contacts):,} contacts")
+    print(f"Wall time:         {wall:,.2f} s")
+    print(f"LLM calls:         {sum(s['calls'] for s in stages.values()):,}")
+    for stage, s in stages.items():
+        print(
+            f"  {stage:<16} {s['calls']:>5} calls  {s['failures']:>3} failed  "
+            f"latency mean {s['latency_seconds']['mean'] or 0:6.2f}s  "
+            f"limiter wait {s['limiter_wait_seconds']['sum']:8.2f}s  "
+            f"queue wait {s['queue_wait_seconds']['sum']:8.2f}s  "
+            f"{s['rate_limited']} x 429"
+        )
+    print(f"Limiter wait:      {sum(s['limiter_wait_seconds']['sum'] for s in stages.values()):,.2f} s (summed over calls)")
+    if peak is not None:
+        print(f"Peak traced mem:   {peak / 1024 / 1024:,.1f} MB")
+    print(f"Process max RSS:   {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline against a fake LLM")
+    parser.add_argument("--chat", default="example_chat.txt", help="Path to a Zoom chat export")
+    parser.add_argument("--scales", default="1,4",
+                        help="Comma-separated transcript sizes as multiples of the chat's message count "
+                             "(1 = the chat itself, others are synthetic)")
+    parser.add_argument("--server-url", default=None, help="Use a running fake server (its /v1 base URL)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the in-process fake server")
+    parser.add_argument("--rps", type=float, default=None, help="Override LLM_RATE_LIMIT_RPS")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Override LLM_MAX_CONCURRENCY")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip peak memory tracing (faster)")
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    base_url = args.server_url or f"http://127.0.0.1:{args.port}/v1"
+    configure_environment(args, base_url)
+    if not args.server_url:
+        start_server(behavior_from_args(args), args.port)
+
+    from benchmark_parsing import build_synthetic_transcript
+    from app.services.hybrid_extraction import ZOOM_MSG_PATTERN
+
+    with open(args.chat, 'r', encoding='utf-8') as f:
+        source = f.read()
+    message_count = sum(1 for _ in ZOOM_MSG_PATTERN.finditer(source))
+
+    for scale in [float(s) for s in args.scales.split(",")]:
+        if scale == 1:
+            run_case(args.chat, source, not args.no_tracemalloc)
+        else:
+            size = int(message_count * scale)
+            run_case(f"synthetic x{scale:g} ({size:,} messages)",
+                     build_synthetic_transcript(source, size), not args.no_tracemalloc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Transcript Parsing Benchmark
+
+Measures parse_transcript_lines() on example_chat.txt and on a synthetic
+100k-message transcript, comparing the current (precompiled + memoized)
+sender-name normalizer against the original per-call regex implementation.
+No database or LLM access is needed.
+"""
+import sys
+import os
+import re
+import random
+import time
+import argparse
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+# Settings require Supabase values at import time; the benchmark never uses them
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+
+from app.services import hybrid_extraction
+from app.services.hybrid_extraction import ZOOM_MSG_PATTERN, parse_transcript_lines
+
+
+LEGACY_STATE_CODES = [
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+    'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
+    'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
+    'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+    'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
+]
+
+
+def legacy_clean_sender_name(raw_name: str) -> str:
+    """Original implementation (uncompiled regexes, no caching) used as the baseline."""
+    name = raw_name.strip()
+    name = re.sub(r'\b\d{10,}\b', '', name)
+    name = re.sub(r'\b\d{3}[-.)\s]?\d{3}[-.)\s]?\d{4}\b', '', name)
+    for pattern in [r'\bTC\b', r'\bTTTC\b', r'\bTM\b', r'\bEA\b', r'\bVA\b',
+                    r'\bDTS\b', r'\bDTA\b', r'\bZDB\b', r'\bOC\b']:
+        name = re.sub(pattern, '', name)
+    name = re.sub(r'[^\x00-\x7F]+', '', name)
+    for state in LEGACY_STATE_CODES:
+        name = re.sub(rf'\s+{state}\s*$', '', name)
+    name = re.sub(r'\s+', ' ', name).strip()
+    if len(name) < 2:
+        return raw_name.strip()
+    return name
+
+
+def build_synthetic_transcript(source: str, message_count: int, sender_count: int = 300) -> str:
+    """
+    Build a large transcript by resampling message bodies from the source chat
+    and attributing them to a fixed pool of (uncleaned) sender names.
+    """
+    blocks = re.split(r'\n(?=\S.*\bFrom\b)', source)
+    bodies = []
+    senders = []
+    for block in blocks:
+        header, _, body = block.partition('\n')
+        match = ZOOM_MSG_PATTERN.search(header)
+        if match:
+            senders.append(match.group(2).strip())
+            bodies.append(match.group(3) + ('\n' + body if body else ''))
+
+    rng = random.Random(42)
+    sender_pool = list(dict.fromkeys(senders))
+    while len(sender_pool) < sender_count:
+        base = rng.choice(senders)
+        sender_pool.append(f"{base} {rng.randint(200, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}")
+    sender_pool = sender_pool[:sender_count]
+
+    lines = []
+    for i in range(message_count):
+        seconds = i % 60
+        minutes = (i // 60) % 60
+        hours = 9 + (i // 3600) % 12
+        lines.append(
+            f"2025-11-08 {hours:02d}:{minutes:02d}:{seconds:02d} From {rng.choice(sender_pool)} to Everyone:"
+            f"{rng.choice(bodies)}"
+        )
+    return '\n'.join(lines)
+
+
+def time_parse(text: str, repeat: int) -> float:
+    """Return the best wall time (seconds) of parse_transcript_lines over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        hybrid_extraction.clean_sender_name.cache_clear()
+        start = time.perf_counter()
+        parse_transcript_lines(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_parse_legacy(text: str, repeat: int) -> float:
+    """Same as time_parse() but with the legacy sender cleaner patched in."""
+    current = hybrid_extraction.clean_sender_name
+    hybrid_extraction.clean_sender_name = legacy_clean_sender_name
+    try:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse_transcript_lines(text)
+            best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        hybrid_extraction.clean_sender_name = current
+
+
+def run_case(label: str, text: str, repeat: int):
+    messages = parse_transcript_lines(text)
+    senders = {m.sender for m in messages}
+
+    # Sanity check: both implementations must agree on every sender
+    raw_senders = {m.group(2).strip() for m in ZOOM_MSG_PATTERN.finditer(text)}
+    mismatches = [s for s in raw_senders
+                  if legacy_clean_sender_name(s) != hybrid_extraction.clean_sender_name(s)]
+
+    legacy = time_parse_legacy(text, repeat)
+    current = time_parse(text, repeat)
+    info = hybrid_extraction.clean_sender_name.cache_info()
+
+    print(f"\n=== {label} ===")
+    print(f"Messages:          {len(messages):,}")
+    print(f"Unique senders:    {len(senders):,} (raw: {len(raw_senders):,})")
+    print(f"Legacy parse:      {legacy * 1000:,.1f} ms")
+    print(f"Current parse:     {current * 1000:,.1f} ms")
+    print(f"Speedup:           {legacy / current:.2f}x")
+    print(f"Sender cache:      {info.hits:,} hits / {info.misses:,} misses")
+    print(f"Name mismatches:   {len(mismatches)}")
+    for raw in mismatches[:5]:
+        print(f"  {raw!r}: {legacy_clean_sender_name(raw)!r} != {hybrid_extraction.clean_sender_name(raw)!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript parsing")
+    parser.add_argument("--chat", default="example_chat.txt", help="Path to a Zoom chat export")
+    parser.add_argument("--messages", type=int, default=100_000, help="Synthetic transcript size")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    with open(args.chat, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    run_case(args.chat, source, args.repeat)
+    run_case(f"synthetic ({args.messages:,} messages)",
+             build_synthetic_transcript(source, args.messages), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""
+Fake OpenAI-Compatible LLM Server
+
+A local stand-in for OpenRouter's /v1/chat/completions, so the extraction
+pipeline can be run and measured without an API key or spend.
+
+Structured calls are answered from the requested schema (the json_schema
+response_format name, or the tool name for function calling) with cheap
+heuristics over the prompt:
+- IntentAnalysis: keyword-matched offers/requests, short messages as noise,
+  a profile per poster, a digest
+- ValidatedServiceList: one result per numbered item
+- MeetingSummary: stitched from the digests being reduced
+- ExtractedProfile / BatchProfileEnrichment: role tags from the services
+Other schemas get a minimal instance built from their JSON schema. Known
+schemas are validated against the app's models before being returned.
+
+Latency, 500s and 429s (random, or above a requests-per-second cap) are
+configurable; streamed requests are answered as SSE chunks with usage.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@lru_cache(maxsize=None)
+def app_schemas() -> Dict[str, Any]:
+    """
+    The app's models for the schemas answered heuristically. Imported on
+    first use, so a benchmark can configure settings before the app loads.
+    """
+    # Settings require Supabase values at import time; the server never uses them
+    os.environ.setdefault("SUPABASE_URL", "http://localhost")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "fake-llm-server")
+    from app.services.hybrid_extraction import (
+        BatchProfileEnrichment,
+        ExtractedProfile,
+        IntentAnalysis,
+        MeetingSummary,
+        ValidatedServiceList,
+    )
+    return {
+        model.__name__: model
+        for model in (IntentAnalysis, ValidatedServiceList, MeetingSummary, ExtractedProfile, BatchProfileEnrichment)
+    }
+
+
+@dataclass
+class FakeLLMBehavior:
+    """How the fake server responds; shared with the request handlers."""
+    latency: float = 1.0  # Mean seconds per response (spread over streamed chunks)
+    jitter: float = 0.25  # +/- fraction of latency
+    error_rate: float = 0.0  # Share of requests answered with a 500
+    rate_limit_rate: float = 0.0  # Share of requests answered with a 429
+    rate_limit_rps: float = 0.0  # Requests/second above which requests get a 429 (0 = no cap)
+    stream_chunk_chars: int = 40
+    seed: Optional[int] = None
+    # Counters, by schema name ("chat" for unstructured calls)
+    calls: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    rate_limited: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._tokens = self.rate_limit_rps
+        self._refilled = time.monotonic()
+
+    def take_rate_token(self) -> bool:
+        """Token bucket for rate_limit_rps (burst of one second's worth)."""
+        if self.rate_limit_rps <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate_limit_rps, self._tokens + (now - self._refilled) * self.rate_limit_rps
+            )
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def response_latency(self) -> float:
+        return max(0.0, self.latency * (1 + self.jitter * (2 * self.rng.random() - 1)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": dict(self.calls),
+            "errors": dict(self.errors),
+            "rate_limited": dict(self.rate_limited),
+        }
+
+    def reset_stats(self) -> None:
+        self.calls.clear()
+        self.errors.clear()
+        self.rate_limited.clear()
+
+
+# =============================================================================
+# HEURISTIC RESPONSES
+# =============================================================================
+
+MESSAGE_LINE = re.compile(r"^\s*\[(\d+)\] ([^:\n]+): ?(.*)$", re.MULTILINE)
+OFFER_PATTERN = re.compile(
+    r"\b(i have|i am a|i'm a|we are buying|we buy|i can|offering|we provide|i do|i fund|"
+    r"available|my company|we help|i help|dm me|hit me up)\b",
+    re.IGNORECASE,
+)
+REQUEST_PATTERN = re.compile(
+    r"\b(looking for|need|seeking|anyone|who has|who wants|how do i|does anyone|recommend)\b|\?",
+    re.IGNORECASE,
+)
+ROLE_KEYWORDS = {
+    "Lender": ("lender", "capital", "fund", "dscr", "hard money", "gator"),
+    "Transaction Coordinator": ("tc", "transaction coordinator"),
+    "Buyer": ("buyer", "buying", "buy box"),
+    "Wholesaler": ("wholesal", "assignment"),
+    "Agent": ("agent", "realtor", "broker"),
+    "Investor": ("investor", "rental", "portfolio", "flip"),
+}
+STOPWORDS = {
+    "about", "their", "there", "would", "could", "should", "which", "these", "those",
+    "thanks", "thank", "everyone", "please", "really", "looking", "anyone", "people",
+    "messages", "participants", "offers", "requests",
+}
+
+
+def role_tags(texts: List[str]) -> List[str]:
+    blob = " ".join(texts).lower()
+    return [role for role, words in ROLE_KEYWORDS.items() if any(re.search(rf"\b{re.escape(w)}", blob) for w in words)]
+
+
+def top_words(texts: List[str], limit: int) -> List[str]:
+    counts = Counter(
+        word for text in texts for word in re.findall(r"[a-z]{6,}", text.lower()) if word not in STOPWORDS
+    )
+    return [word for word, _ in counts.most_common(limit)]
+
+
+def intent_analysis(prompt: str) -> Dict[str, Any]:
+    services, noise, offers_by_sender = [], [], {}
+    senders = set()
+    for msg_id, sender, text in MESSAGE_LINE.findall(prompt):
+        sender = sender.strip()
+        senders.add(sender)
+        body = text.strip()
+        if len(body) < 12:
+            noise.append(int(msg_id))
+            continue
+        if OFFER_PATTERN.search(body):
+            kind = "offer"
+        elif REQUEST_PATTERN.search(body):
+            kind = "request"
+        else:
+            continue
+        services.append({
+            "type": kind,
+            "description": body[:300],
+            "contact_name": sender,
+            "links": re.findall(r"https?://\S+", body),
+            "message_id": int(msg_id),
+        })
+        offers_by_sender.setdefault(sender, []).append(body)
+
+    profiles = [
+        {"name": sender, "role_tags": role_tags(texts), "i_can_help_with": texts[0][:120]}
+        for sender, texts in offers_by_sender.items()
+    ]
+    texts = [s["description"] for s in services]
+    digest = (
+        f"{len(senders)} participants posted {sum(s['type'] == 'offer' for s in services)} offers "
+        f"and {sum(s['type'] == 'request' for s in services)} requests."
+    )
+    return {
+        "services": services,
+        "profiles": profiles,
+        "noise_message_ids": noise,
+        "digest": digest,
+        "key_topics": top_words(texts, 5),
+    }
+
+
+def validated_service_list(prompt: str) -> Dict[str, Any]:
+    items = re.findall(r"^\s*\d+\. \[(\w+)\] (.*)$", prompt, re.MULTILINE)
+    return {"results": [
+        {"is_valid": len(description) >= 20, "reason": "" if len(description) >= 20 else "Too short"}
+        for _, description in items
+    ]}
+
+
+def meeting_summary(prompt: str) -> Dict[str, Any]:
+    parts = re.findall(r"^\s*\d+\. (.*?)(?: \(Topics: (.*)\))?$", prompt, re.MULTILINE)
+    topics = Counter(t.strip() for _, line in parts for t in line.split(",") if t.strip() and t.strip() != "none")
+    summary = " ".join(text for text, _ in parts[:5])[:600] or "No discussion content found."
+    return {"summary": summary, "key_topics": [t for t, _ in topics.most_common(10)]}
+
+
+def profile_from_services(name: str, services: List[str]) -> Dict[str, Any]:
+    offers = [s for s in services if "[OFFER]" in s.upper()]
+    requests = [s for s in services if "[REQUEST]" in s.upper()]
+    return {
+        "name": name,
+        "role_tags": role_tags(services),
+        "i_can_help_with": offers[0][:120] if offers else None,
+        "help_me_with": requests[0][:120] if requests else None,
+    }
+
+
+def extracted_profile(prompt: str) -> Dict[str, Any]:
+    match = re.search(r"Rich Profile for '(.*?)'", prompt)
+    return profile_from_services(match.group(1) if match else "Unknown", re.findall(r"^\s*- (.*)$", prompt, re.MULTILINE))
+
+
+def batch_profile_enrichment(prompt: str) -> Dict[str, Any]:
+    return {"profiles": [
+        {"contact_id": cid, "profile": profile_from_services(name, [l.strip() for l in body.splitlines() if l.strip()])}
+        for cid, name, body in re.findall(r'<contact id="([^"]+)" name="([^"]*)">(.*?)</contact>', prompt, re.DOTALL)
+    ]}
+
+
+RESPONDERS = {
+    "IntentAnalysis": intent_analysis,
+    "ValidatedServiceList": validated_service_list,
+    "MeetingSummary": meeting_summary,
+    "ExtractedProfile": extracted_profile,
+    "BatchProfileEnrichment": batch_profile_enrichment,
+}
+
+
+def minimal_instance(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """Smallest value satisfying a JSON schema's required fields."""
+    if "$ref" in schema:
+        return minimal_instance(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        return minimal_instance(schema["anyOf"][0], defs)
+    kind = schema.get("type")
+    if kind == "object":
+        props = schema.get("properties", {})
+        return {name: minimal_instance(props[name], defs) for name in schema.get("required", props)}
+    return {"string": "", "integer": 0, "number": 0, "boolean": False, "array": []}.get(kind)
+
+
+def structured_response(name: str, json_schema: Dict[str, Any], prompt: str) -> str:
+    responder = RESPONDERS.get(name)
+    if responder is None:
+        return json.dumps(minimal_instance(json_schema, json_schema.get("$defs", {})))
+    data = responder(prompt)
+    app_schemas()[name].model_validate(data)  # Never hand out a response the app can't parse
+    return json.dumps(data)
+
+
+# =============================================================================
+# HTTP API
+# =============================================================================
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = "".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+def _requested_schema(body: Dict[str, Any]):
+    """(name, JSON schema, via tool call) of a structured request, or (None, None, False)."""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        spec = response_format["json_schema"]
+        return spec.get("name"), spec.get("schema") or {}, False
+    choice = body.get("tool_choice")
+    tools = body.get("tools") or []
+    if tools and choice not in (None, "auto", "none"):
+        function = tools[0]["function"]
+        return function["name"], function.get("parameters") or {}, True
+    return None, None, False
+
+
+def create_app(behavior: FakeLLMBehavior) -> FastAPI:
+    app = FastAPI(title="Fake LLM server")
+
+    @app.get("/stats")
+    async def stats():
+        return behavior.stats()
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        behavior.reset_stats()
+        return behavior.stats()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        name, json_schema, as_tool = _requested_schema(body)
+        label = name or "chat"
+        behavior.calls[label] += 1
+
+        if not behavior.take_rate_token() or behavior.rng.random() < behavior.rate_limit_rate:
+            behavior.rate_limited[label] += 1
+            await asyncio.sleep(0.05)
+            return JSONResponse(
+                {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error", "code": 429}},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        latency = behavior.response_latency()
+        if behavior.rng.random() < behavior.error_rate:
+            behavior.errors[label] += 1
+            await asyncio.sleep(latency / 2)
+            return JSONResponse(
+                {"error": {"message": "Injected upstream error", "type": "server_error", "code": 500}},
+                status_code=500,
+            )
+
+        prompt = _prompt_text(body.get("messages") or [])
+        text = structured_response(name, json_schema, prompt) if name else "OK"
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(text) // 4,
+            "total_tokens": (len(prompt) + len(text)) // 4,
+        }
+        tool_call = {"id": "call_0", "type": "function", "function": {"name": name, "arguments": text}}
+        base = {"id": "fake", "created": int(time.time()), "model": body.get("model", "fake")}
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            message = {"role": "assistant", "content": None if as_tool else text}
+            if as_tool:
+                message["tool_calls"] = [tool_call]
+            return JSONResponse({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if as_tool else "stop"}],
+                "usage": usage,
+            })
+
+        async def events():
+            pieces = [text[i:i + behavior.stream_chunk_chars] for i in range(0, len(text), behavior.stream_chunk_chars)] or [""]
+            for index, piece in enumerate(pieces):
+                await asyncio.sleep(latency / len(pieces))
+                delta = {"role": "assistant"} if index == 0 else {}
+                if as_tool:
+                    call = {"index": 0, "function": {"arguments": piece}}
+                    if index == 0:
+                        call.update(id=tool_call["id"], type="function")
+                        call["function"]["name"] = name
+                    delta["tool_calls"] = [call]
+                else:
+                    delta["content"] = piece
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            finish = {**base, "object": "chat.completion.chunk",
+                      "choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls" if as_tool else "stop"}]}
+            yield f"data: {json.dumps(finish)}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def add_behavior_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=1.0, help="Mean seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.25, help="Latency jitter (+/- fraction)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests failing with 429")
+    parser.add_argument("--rate-limit-rps", type=float, default=0.0, help="429 above this many requests/second (0 = off)")
+    parser.add_argument("--stream-chunk-chars", type=int, default=40,
+                        help="Characters per streamed chunk (the client parses every chunk; smaller = more CPU)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency/error randomness")
+
+
+def behavior_from_args(args: argparse.Namespace) -> FakeLLMBehavior:
+    return FakeLLMBehavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        rate_limit_rps=args.rate_limit_rps,
+        stream_chunk_chars=args.stream_chunk_chars,
+        seed=args.seed,
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"Point OPENROUTER_BASE_URL at http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(behavior_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
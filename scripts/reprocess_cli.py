@@ -9,6 +9,7 @@ sys.path.append(os.path.join(os.getcwd(), 'backend'))
 from app.api.upload import run_core_extraction_logic
 from supabase import create_client
 from app.core.config import settings
+from app.services.cache_store import get_chunk_result_cache
 
 async def main():
     # Setup Client
@@ -35,6 +36,10 @@ async def main():
     try:
         await run_core_extraction_logic(client, chat['id'], chat['user_id'], chat['org_id'], chat['cleaned_text'])
         print("Success!")
+        cache = get_chunk_result_cache()
+        if cache:
+            stats = cache.stats()
+            print(f"Chunk cache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} entries)")
     except Exception as e:
         print(f"Error: {e}")
 
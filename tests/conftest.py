@@ -0,0 +1,112 @@
+"""
+Shared test setup.
+
+The backend package is imported from backend/. Settings require Supabase
+credentials; placeholders are set here and nothing is ever contacted.
+
+Database tests (the `pg` fixture) run against a real Postgres with schema.sql
+and the migrations under test applied: TEST_DATABASE_URL if set, otherwise a
+throwaway server from the `pgserver` package. Without either they are skipped.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="meetingvault-tests-"))
+
+MIGRATIONS = ROOT / "backend" / "migrations"
+
+# Migrations applied on top of schema.sql (which includes everything up to 009)
+SCHEMA_MIGRATIONS = (
+    "010_add_profile_columns.sql",
+    "011_contact_phone_digits.sql",
+    "012_service_content_hash.sql",
+    "013_update_contact_profiles.sql",
+)
+
+# What Supabase provides and schema.sql assumes: auth.users, auth.uid() from
+# the request JWT, the API role, and organizations/memberships (migration 001)
+SUPABASE_STUBS = """
+CREATE SCHEMA auth;
+CREATE TABLE auth.users (id UUID PRIMARY KEY);
+CREATE FUNCTION auth.uid() RETURNS UUID LANGUAGE sql STABLE AS $$
+    SELECT nullif(current_setting('request.jwt.claim.sub', true), '')::uuid
+$$;
+
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+        CREATE ROLE authenticated NOLOGIN;
+    END IF;
+END $$;
+
+CREATE TABLE public.organizations (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE TABLE public.memberships (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    org_id UUID NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    role TEXT NOT NULL CHECK (role IN ('admin', 'user')),
+    UNIQUE (org_id, user_id)
+);
+"""
+
+SCHEMA_FIXUPS = """
+ALTER TABLE public.services ADD COLUMN IF NOT EXISTS org_id UUID REFERENCES public.organizations(id);
+GRANT USAGE ON SCHEMA public, auth TO authenticated;
+GRANT ALL ON ALL TABLES IN SCHEMA public TO authenticated;
+GRANT SELECT ON auth.users TO authenticated;
+"""
+
+
+def _database_url():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url:
+        return url, None
+    pgserver = pytest.importorskip("pgserver", reason="needs TEST_DATABASE_URL or the pgserver package")
+    server = pgserver.get_server(tempfile.mkdtemp(prefix="meetingvault-pg-"), cleanup_mode="stop")
+    return server.get_uri(), server
+
+
+@pytest.fixture(scope="session")
+def pg_database():
+    """A database with the app schema, created once per run."""
+    psycopg = pytest.importorskip("psycopg")
+    url, server = _database_url()
+    name = "meetingvault_test"
+    with psycopg.connect(url, autocommit=True) as admin:
+        admin.execute(f"DROP DATABASE IF EXISTS {name}")
+        admin.execute(f"CREATE DATABASE {name}")
+    test_url = psycopg.conninfo.make_conninfo(url, dbname=name)
+    with psycopg.connect(test_url, autocommit=True) as conn:
+        conn.execute(SUPABASE_STUBS)
+        schema = (ROOT / "schema.sql").read_text()
+        if not conn.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pgcrypto'").fetchone():
+            # Only used for gen_random_uuid(), built in since Postgres 13
+            schema = schema.replace('CREATE EXTENSION IF NOT EXISTS "pgcrypto";', "")
+        conn.execute(schema)
+        conn.execute(SCHEMA_FIXUPS)
+        for migration in SCHEMA_MIGRATIONS:
+            conn.execute((MIGRATIONS / migration).read_text())
+    yield test_url
+    # A pgserver instance (server) is stopped at interpreter exit
+
+
+@pytest.fixture
+def pg(pg_database):
+    """A connection inside a transaction that is rolled back after the test."""
+    import psycopg
+
+    with psycopg.connect(pg_database) as conn:
+        yield conn
+        conn.rollback()
@@ -0,0 +1,166 @@
+"""
+Runs the supabase client calls the app makes as the SQL PostgREST would,
+on a psycopg connection, so bulk writes meet real constraints, triggers and
+row level security.
+
+Covers what RoundTrips (app/services/round_trips.py) uses: select with
+eq/in_/range, insert, upsert (on_conflict, ignore_duplicates,
+default_to_null), update with eq, and rpc with JSON arguments. Bulk rows
+go through json_populate_recordset like PostgREST's own queries; with
+default_to_null=False (Prefer: missing=default) rows are inserted one
+statement each so missing columns take their defaults.
+"""
+from typing import Any, Dict, List, Optional
+
+from psycopg import sql
+from psycopg.types.json import Jsonb
+
+
+class Response:
+    def __init__(self, data: Optional[List[Dict[str, Any]]]):
+        self.data = data
+
+
+class Query:
+    def __init__(self, conn, table: str):
+        self.conn = conn
+        self.table = table
+        self.op = "select"
+        self.columns = "*"
+        self.filters: List[sql.Composable] = []
+        self.params: List[Any] = []
+        self.payload: Any = None
+        self.options: Dict[str, Any] = {}
+        self.bounds = None
+
+    # Builders ---------------------------------------------------------------
+
+    def select(self, columns: str = "*", **_):
+        self.op, self.columns = "select", columns
+        return self
+
+    def eq(self, column: str, value: Any):
+        self.filters.append(sql.SQL("{}::text = %s").format(sql.Identifier(column)))
+        self.params.append(str(value))
+        return self
+
+    def in_(self, column: str, values):
+        self.filters.append(sql.SQL("{}::text = ANY(%s)").format(sql.Identifier(column)))
+        self.params.append([str(v) for v in values])
+        return self
+
+    def range(self, start: int, end: int):
+        self.bounds = (start, end)
+        return self
+
+    def insert(self, payload, **options):
+        self.op, self.payload, self.options = "insert", payload, options
+        return self
+
+    def upsert(self, payload, **options):
+        self.op, self.payload, self.options = "upsert", payload, options
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    # Execution --------------------------------------------------------------
+
+    def _where(self) -> sql.Composable:
+        if not self.filters:
+            return sql.SQL("")
+        return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(self.filters)
+
+    def _fetch(self, query: sql.Composable, params) -> List[Dict[str, Any]]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            return [row[0] for row in cur.fetchall()] if cur.description else []
+
+    def execute(self) -> Response:
+        table = sql.Identifier(self.table)
+        if self.op == "select":
+            query = sql.SQL("SELECT to_jsonb(t) FROM {} t").format(table) + self._where()
+            query += sql.SQL(" ORDER BY ctid")
+            if self.bounds:
+                query += sql.SQL(" LIMIT {} OFFSET {}").format(
+                    sql.Literal(self.bounds[1] - self.bounds[0] + 1), sql.Literal(self.bounds[0])
+                )
+            rows = self._fetch(query, self.params)
+            if self.columns.strip() != "*":
+                keep = [c.strip() for c in self.columns.split(",")]
+                rows = [{c: row.get(c) for c in keep} for row in rows]
+            return Response(rows)
+
+        if self.op == "update":
+            columns = sql.SQL(", ").join(map(sql.Identifier, self.payload))
+            query = sql.SQL(
+                "UPDATE {} t SET ({}) = (SELECT {} FROM json_populate_record(NULL::{}, %s::json) r)"
+            ).format(table, columns, columns, table) + self._where() + sql.SQL(" RETURNING to_jsonb(t)")
+            return Response(self._fetch(query, [Jsonb(self.payload), *self.params]))
+
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        if not rows:
+            return Response([])
+        if self.op == "upsert" and not self.options.get("default_to_null", True):
+            inserted = []
+            for row in rows:
+                inserted += self._insert([row], list(row))
+            return Response(inserted)
+        return Response(self._insert(rows, list(dict.fromkeys(k for row in rows for k in row))))
+
+    def _insert(self, rows, column_names) -> List[Dict[str, Any]]:
+        table = sql.Identifier(self.table)
+        columns = sql.SQL(", ").join(map(sql.Identifier, column_names))
+        query = sql.SQL("INSERT INTO {} AS t ({}) SELECT {} FROM json_populate_recordset(NULL::{}, %s::json)").format(
+            table, columns, columns, table
+        )
+        if self.op == "upsert":
+            target = sql.SQL(", ").join(
+                sql.Identifier(c.strip()) for c in (self.options.get("on_conflict") or "id").split(",")
+            )
+            if self.options.get("ignore_duplicates"):
+                query += sql.SQL(" ON CONFLICT ({}) DO NOTHING").format(target)
+            else:
+                query += sql.SQL(" ON CONFLICT ({}) DO UPDATE SET ").format(target) + sql.SQL(", ").join(
+                    sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c)) for c in column_names
+                )
+        query += sql.SQL(" RETURNING to_jsonb(t)")
+        return self._fetch(query, [Jsonb(rows)])
+
+
+class RPC:
+    def __init__(self, conn, function: str, params: Dict[str, Any]):
+        self.conn, self.function, self.params = conn, function, params
+
+    def execute(self) -> Response:
+        args = sql.SQL(", ").join(
+            sql.SQL("{} => %s::jsonb").format(sql.Identifier(name)) for name in self.params
+        )
+        query = sql.SQL("SELECT to_jsonb({}({}))").format(sql.Identifier(self.function), args)
+        with self.conn.cursor() as cur:
+            cur.execute(query, [Jsonb(v) for v in self.params.values()])
+            return Response(cur.fetchone()[0])
+
+
+class PostgrestEmulator:
+    """Stands in for a supabase Client (table() and rpc()) over a psycopg connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def table(self, name: str) -> Query:
+        return Query(self.conn, name)
+
+    def rpc(self, function: str, params: Dict[str, Any]) -> RPC:
+        return RPC(self.conn, function, params)
+
+
+def act_as(conn, user_id: Optional[str]) -> None:
+    """Run the rest of the transaction as an API user (None: the table owner, bypassing RLS)."""
+    if user_id is None:
+        conn.execute("RESET ROLE")
+        conn.execute("SELECT set_config('request.jwt.claim.sub', '', true)")
+    else:
+        conn.execute("SET LOCAL ROLE authenticated")
+        conn.execute("SELECT set_config('request.jwt.claim.sub', %s, true)", [user_id])
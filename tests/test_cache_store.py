@@ -0,0 +1,81 @@
+"""SQLiteCacheStore and TieredCacheStore: reads, eviction, expiry and failure as a miss."""
+import time
+
+from app.services import cache_store
+from app.services.cache_store import SQLiteCacheStore, TieredCacheStore, content_key
+
+
+def make_store(tmp_path, max_bytes=1000, ttl_seconds=None):
+    return SQLiteCacheStore(str(tmp_path / "cache.sqlite3"), max_bytes, ttl_seconds)
+
+
+def test_content_key_depends_on_order():
+    assert content_key("a", 1) == content_key("a", 1)
+    assert content_key("a", 1) != content_key(1, "a")
+
+
+def test_values_round_trip_and_count_hits(tmp_path):
+    store = make_store(tmp_path)
+    assert store.get("k") is None
+    store.set("k", "välue")
+    assert store.get("k") == "välue"
+    assert (store.hits, store.misses) == (1, 1)
+    assert store.stats()["entries"] == 1
+
+
+def test_get_many_spans_query_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_store, "BULK_QUERY_SIZE", 2)
+    store = make_store(tmp_path)
+    store.set_many({f"k{n}": str(n) for n in range(5)})
+    assert store.get_many([f"k{n}" for n in range(6)]) == {f"k{n}": str(n) for n in range(5)}
+    assert (store.hits, store.misses) == (5, 1)
+    assert store.get_many([]) == {}
+
+
+def test_least_recently_read_entries_are_evicted_first(tmp_path):
+    store = make_store(tmp_path, max_bytes=30)
+    store.set("old", "x" * 10)
+    store.set("read", "x" * 10)
+    time.sleep(0.01)
+    store.get("read")
+    store.set("new", "x" * 15)  # 35 bytes: evicts down to 27
+    assert store.get("old") is None
+    assert store.get("read") and store.get("new")
+
+
+def test_oversized_values_are_not_stored(tmp_path):
+    store = make_store(tmp_path, max_bytes=4)
+    store.set("k", "12345")
+    store.set_many({"a": "12345", "b": "1234"})
+    assert store.get_many(["k", "a", "b"]) == {"b": "1234"}
+
+
+def test_expired_entries_read_as_misses(tmp_path):
+    store = make_store(tmp_path, ttl_seconds=60)
+    store.set("k", "v")
+    store._conn.execute("UPDATE cache_entries SET created_at = created_at - 61")
+    assert store.get("k") is None
+    assert store.get_many(["k"]) == {}
+
+
+def test_unusable_file_behaves_like_an_empty_cache(tmp_path):
+    (tmp_path / "blocked").write_text("not a directory")
+    store = SQLiteCacheStore(str(tmp_path / "blocked" / "cache.sqlite3"), 1000)
+    store.set("k", "v")
+    store.set_many({"k": "v"})
+    assert store.get("k") is None
+    assert store.get_many(["k"]) == {}
+    assert store.stats()["entries"] == 0
+
+
+def test_tiered_store_serves_recent_entries_from_memory(tmp_path):
+    disk = make_store(tmp_path)
+    tiered = TieredCacheStore(disk, memory_items=1)
+    tiered.set("a", "1")
+    tiered.set("b", "2")  # Pushes "a" out of memory
+    assert tiered.get("b") == "2"
+    assert tiered.get("a") == "1"  # From disk, now back in memory
+    assert tiered.get("a") == "1"
+    assert tiered.get("missing") is None
+    assert (tiered.memory_hits, tiered.disk_hits, tiered.misses) == (2, 1, 1)
+    assert tiered.stats()["memory_entries"] == 1
@@ -0,0 +1,45 @@
+"""Extraction checkpoints: a broken checkpoint file degrades to a run without them."""
+import asyncio
+
+from app.services import checkpoints, extraction_graph
+
+
+def test_unusable_checkpoint_file_yields_no_checkpointer(tmp_path, monkeypatch):
+    broken = tmp_path / "checkpoints.sqlite"
+    broken.write_bytes(b"not a sqlite database" * 100)
+    monkeypatch.setattr(checkpoints.settings, "EXTRACTION_CHECKPOINT_PATH", str(broken))
+
+    async def open_it():
+        async with checkpoints.open_checkpointer() as checkpointer:
+            return checkpointer
+
+    assert asyncio.run(open_it()) is None
+
+
+def test_pipeline_runs_without_checkpointer(tmp_path, monkeypatch):
+    broken = tmp_path / "checkpoints.sqlite"
+    broken.write_bytes(b"not a sqlite database" * 100)
+    monkeypatch.setattr(checkpoints.settings, "EXTRACTION_CHECKPOINT_PATH", str(broken))
+    monkeypatch.setattr(checkpoints.settings, "EXTRACTION_CHECKPOINTS_ENABLED", True)
+    monkeypatch.setattr(checkpoints.settings, "OPENROUTER_API_KEY", None)  # No LLM calls
+    monkeypatch.setattr(checkpoints, "_progress_store", None)
+
+    transcript = "10:00:01 From Ann Lee to Everyone:\n\tWe lend in TX, DSCR and hard money\n"
+    result = asyncio.run(extraction_graph.run_extraction_pipeline(transcript, "thread-1"))
+    assert [m.sender for m in result.cleaned_transcript] == ["Ann Lee"]
+
+
+def test_uncreatable_checkpoint_directory_disables_progress(tmp_path, monkeypatch):
+    (tmp_path / "blocked").write_text("not a directory")
+    path = tmp_path / "blocked" / "sub" / "checkpoints.sqlite"
+    store = checkpoints.ExtractionProgressStore(str(path))
+    store.start_thread("thread-1", "key", resume=False)
+    assert store.get_thread("thread-1") is None
+
+    monkeypatch.setattr(checkpoints.settings, "EXTRACTION_CHECKPOINT_PATH", str(path))
+    monkeypatch.setattr(checkpoints.settings, "EXTRACTION_CHECKPOINTS_ENABLED", True)
+    monkeypatch.setattr(checkpoints.settings, "OPENROUTER_API_KEY", None)
+    monkeypatch.setattr(checkpoints, "_progress_store", None)
+    transcript = "10:00:01 From Ann Lee to Everyone:\n\tWe lend in TX, DSCR and hard money\n"
+    result = asyncio.run(extraction_graph.run_extraction_pipeline(transcript, "thread-1"))
+    assert [m.sender for m in result.cleaned_transcript] == ["Ann Lee"]
@@ -0,0 +1,149 @@
+"""analyze_chunk: the chunk and message caches around the chunk-analysis LLM call."""
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import hybrid_extraction
+from app.services.cache_store import get_chunk_result_cache, get_message_class_cache
+from app.services.hybrid_extraction import (
+    ExtractedProfile,
+    ExtractedService,
+    IntentAnalysis,
+    MessageRow,
+    PartialIntentAnalysis,
+    analyze_chunk,
+    chunk_cache_key,
+    chunk_transcript,
+    message_cache_keys,
+)
+from app.services.llm_factory import TruncatedResponse
+
+PRIMARY, FALLBACK = "test/primary", "test/fallback"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Chunk-analysis LLM stub: answers with `llm.result` from `llm.model` and counts calls."""
+    class FakeLLM:
+        model = PRIMARY
+        result = None
+        error = None
+        calls = 0
+
+    async def fake_invoke_with_fallback(prompt, *, on_item=None, with_model=False, **_):
+        FakeLLM.calls += 1
+        if FakeLLM.error:
+            raise FakeLLM.error
+        if on_item:
+            for svc in FakeLLM.result.services:
+                on_item("services", svc)
+        return (FakeLLM.result, FakeLLM.model) if with_model else FakeLLM.result
+
+    monkeypatch.setattr(hybrid_extraction, "invoke_with_fallback", fake_invoke_with_fallback)
+    monkeypatch.setattr(hybrid_extraction.settings, "LLM_MODEL", PRIMARY)
+    monkeypatch.setattr(hybrid_extraction.settings, "OPENROUTER_API_KEY", "test-key")
+    return FakeLLM
+
+
+def make_messages():
+    """Messages no other test has cached."""
+    tag = uuid.uuid4().hex[:8]
+    return [
+        MessageRow(0, f"Ann {tag}", f"We lend in TX, DSCR and hard money {tag}", "10:00"),
+        MessageRow(1, f"Bob {tag}", f"Good stuff {tag}", "10:01"),
+    ]
+
+
+def analysis(messages):
+    return IntentAnalysis(
+        services=[ExtractedService(
+            type="offer", description=f"Lending in TX ({messages[0].message})",
+            contact_name=messages[0].sender, message_id=0,
+        )],
+        profiles=[ExtractedProfile(name=messages[0].sender, role_tags=["Lender"])],
+        noise_message_ids=[1],
+        digest="Ann lends in TX",
+    )
+
+
+def test_results_are_cached_under_the_model_that_answered(llm):
+    messages = make_messages()
+    llm.model, llm.result = FALLBACK, analysis(messages)
+    assert asyncio.run(analyze_chunk(messages, 0)) == llm.result
+
+    chunk_cache, msg_cache = get_chunk_result_cache(), get_message_class_cache()
+    assert chunk_cache.get(chunk_cache_key(chunk_transcript(messages), FALLBACK))
+    assert chunk_cache.get(chunk_cache_key(chunk_transcript(messages), PRIMARY)) is None
+    assert set(msg_cache.get_many(list(message_cache_keys(messages, FALLBACK).values()))) == set(
+        message_cache_keys(messages, FALLBACK).values()
+    )
+    assert msg_cache.get_many(list(message_cache_keys(messages, PRIMARY).values())) == {}
+
+    # The primary's cache was not filled, so the next run asks the LLM again
+    asyncio.run(analyze_chunk(messages, 0))
+    assert llm.calls == 2
+
+
+def test_reprocessed_chunk_keeps_profiles(llm):
+    messages = make_messages()
+    llm.result = analysis(messages)
+    streamed = []
+    asyncio.run(analyze_chunk(messages, 0))
+    # Every message is now in the message cache too; the chunk cache answers first
+    result = asyncio.run(analyze_chunk(messages, 0, on_service=streamed.append))
+
+    assert llm.calls == 1
+    assert result == llm.result
+    assert result.profiles and streamed == result.services
+
+
+def test_partly_cached_chunk_is_cached_whole(llm):
+    messages = make_messages()
+    llm.result = analysis(messages)
+    asyncio.run(analyze_chunk(messages, 0))
+
+    new_message = MessageRow(2, "Cid", f"Need a TC in Idaho {uuid.uuid4()}", "10:02")
+    llm.result = IntentAnalysis(
+        services=[], profiles=[ExtractedProfile(name="Cid")], noise_message_ids=[], digest="Cid needs a TC",
+    )
+    first = asyncio.run(analyze_chunk([*messages, new_message], 0))
+    again = asyncio.run(analyze_chunk([*messages, new_message], 0))
+
+    assert llm.calls == 2
+    assert first == again
+    assert [p.name for p in again.profiles] == ["Cid"]
+    assert again.noise_message_ids == [1]
+
+
+def test_failed_call_keeps_cached_message_classifications(llm):
+    messages = make_messages()
+    llm.result = analysis(messages)
+    asyncio.run(analyze_chunk(messages, 0))
+
+    new_message = MessageRow(2, "Cid", f"Need a TC in Idaho {uuid.uuid4()}", "10:02")
+    llm.error = RuntimeError("provider down")
+    result = asyncio.run(analyze_chunk([*messages, new_message], 0))
+
+    assert isinstance(result, PartialIntentAnalysis)
+    assert result.services == llm.result.services
+    assert result.noise_message_ids == [1]
+
+
+def test_failed_call_without_cached_messages_returns_none(llm):
+    llm.error = RuntimeError("provider down")
+    assert asyncio.run(analyze_chunk(make_messages(), 0)) is None
+
+
+def test_truncated_response_is_used_but_not_cached(llm):
+    messages = make_messages()
+    partial = analysis(messages).model_copy(update={"profiles": [], "digest": ""})
+    llm.error = TruncatedResponse(partial, PRIMARY, ConnectionError("stream reset"))
+
+    result = asyncio.run(analyze_chunk(messages, 0))
+    assert isinstance(result, PartialIntentAnalysis)
+    assert result.services == partial.services
+
+    assert get_chunk_result_cache().get(chunk_cache_key(chunk_transcript(messages), PRIMARY)) is None
+    keys = list(message_cache_keys(messages, PRIMARY).values())
+    assert get_message_class_cache().get_many(keys) == {}
@@ -0,0 +1,103 @@
+"""CircuitBreaker states and invoke_with_fallback's routing around an unhealthy primary."""
+import asyncio
+
+import pytest
+
+from app.services import llm_factory
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def make_breaker():
+    return CircuitBreaker(
+        "primary", window=4, min_calls=2, error_rate=0.5,
+        slow_call_seconds=10.0, slow_call_rate=0.5, cooldown=60.0,
+    )
+
+
+def trip(breaker, cooled_down=False):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    if cooled_down:
+        breaker._opened_at -= breaker.cooldown
+
+
+def test_opens_on_error_rate():
+    breaker = make_breaker()
+    breaker.record_success(1.0)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_admits_exactly_one_probe():
+    breaker = make_breaker()
+    trip(breaker, cooled_down=True)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()  # The probe
+    assert not breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success(1.0)
+    assert breaker.state == CLOSED
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    trip(breaker, cooled_down=True)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+
+def test_abandoned_probe_lets_the_next_call_probe():
+    breaker = make_breaker()
+    trip(breaker, cooled_down=True)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_abandoned(0.5)
+    assert breaker.allow_request()
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """invoke_with_retry stubbed per model: a callable (or exception) per model name."""
+    behaviour = {}
+
+    async def fake_invoke_with_retry(llm, input_data, **_):
+        outcome = behaviour[llm_factory._rate_limit_model(llm)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(llm_factory, "invoke_with_retry", fake_invoke_with_retry)
+    monkeypatch.setattr(llm_factory.settings, "LLM_MODEL", "test/primary")
+    monkeypatch.setattr(llm_factory.settings, "LLM_FALLBACK_MODEL", "test/fallback")
+    monkeypatch.setattr(llm_factory.settings, "LLM_HEDGE_ENABLED", False)
+    monkeypatch.setattr(llm_factory.settings, "OPENROUTER_API_KEY", "test-key")
+    breaker = make_breaker()
+    monkeypatch.setattr(llm_factory, "get_circuit_breaker", lambda model: breaker)
+    return behaviour, breaker
+
+
+def test_fallback_reports_the_model_that_answered(models):
+    behaviour, _ = models
+    behaviour.update({"test/primary": RuntimeError("down"), "test/fallback": "from fallback"})
+    assert asyncio.run(llm_factory.invoke_with_fallback("hi", with_model=True)) == (
+        "from fallback", "test/fallback"
+    )
+    behaviour["test/primary"] = "from primary"
+    assert asyncio.run(llm_factory.invoke_with_fallback("hi", with_model=True)) == (
+        "from primary", "test/primary"
+    )
+    assert asyncio.run(llm_factory.invoke_with_fallback("hi")) == "from primary"
+
+
+def test_open_primary_routes_to_fallback(models):
+    behaviour, breaker = models
+    behaviour.update({"test/primary": "from primary", "test/fallback": "from fallback"})
+    trip(breaker)
+    assert asyncio.run(llm_factory.invoke_with_fallback("hi")) == "from fallback"
@@ -0,0 +1,201 @@
+"""ContactResolver: normalization, its parity with migration 011, and the lookup index."""
+import uuid
+
+import pytest
+
+from app.services import contact_resolver
+from app.services.contact_resolver import (
+    ALIAS,
+    EMAIL,
+    NAME,
+    PHONE,
+    ContactResolver,
+    canonical_phone,
+    get_contact_resolver,
+    invalidate_contact_resolver,
+    note_contact_update,
+)
+
+PHONES = [
+    "(385) 208-2523",
+    "385.208.2523",
+    "+1 385 208 2523",
+    "1-385-208-2523",
+    "+44 20 7946 0958",
+    "208-2523",
+    "208-252",
+    "12345",
+    "٣٨٥٢٠٨٢٥٢٣",  # Non-ASCII digits are not phone digits
+    "ext. 1234567 ",
+    "",
+    None,
+]
+
+
+# =============================================================================
+# MIGRATION 011 PARITY
+# =============================================================================
+
+@pytest.mark.parametrize("phone", PHONES)
+def test_sql_canonical_phone_matches_python(pg, phone):
+    (digits,) = pg.execute("SELECT public.canonical_phone(%s)", [phone]).fetchone()
+    assert digits == canonical_phone(phone)
+
+
+def test_trigger_keeps_phone_digits_current(pg):
+    from postgrest_emulator import act_as
+
+    user_id = str(uuid.uuid4())
+    act_as(pg, None)
+    pg.execute("INSERT INTO auth.users (id) VALUES (%s)", [user_id])
+    (contact_id, digits) = pg.execute(
+        "INSERT INTO contacts (user_id, name, phone) VALUES (%s, 'Ann', '+1 (385) 208-2523') "
+        "RETURNING id, phone_digits",
+        [user_id],
+    ).fetchone()
+    assert digits == "3852082523"
+    (digits,) = pg.execute(
+        "UPDATE contacts SET phone = '208-25' WHERE id = %s RETURNING phone_digits", [contact_id]
+    ).fetchone()
+    assert digits is None
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+ORG = "org-1"
+
+
+def contact(contact_id, name=None, email=None, phone=None, org_id=ORG):
+    return {"id": contact_id, "org_id": org_id, "name": name, "email": email, "phone": phone}
+
+
+@pytest.fixture
+def resolver():
+    resolver = ContactResolver(ORG)
+    resolver.add(contact("ann", "Ann  Lee", "Ann@Example.com", "(385) 208-2523"))
+    resolver.add(contact("bob", "Bob", phone="+1 801 555 0100"))
+    resolver.add(contact("other", "Cid", org_id="org-2"))  # Another org: ignored
+    return resolver
+
+
+def test_lookups_normalize_their_input(resolver):
+    assert len(resolver) == 2 and "other" not in resolver
+    assert resolver.lookup(EMAIL, " ann@EXAMPLE.com ")["id"] == "ann"
+    assert resolver.lookup(NAME, "ann lee")["id"] == "ann"
+    assert resolver.lookup(PHONE, "385.208.2523")["id"] == "ann"
+    assert resolver.lookup(PHONE, "8015550100")["id"] == "bob"
+    assert resolver.get("ann")["phone_digits"] == "3852082523"
+    assert resolver.lookup(NAME, "") is None
+
+
+def test_resolve_prefers_email_then_name_then_phone_then_alias(resolver):
+    assert resolver.resolve(name="Bob", email="ann@example.com")["id"] == "ann"
+    assert resolver.resolve(name="Bob", phone="385 208 2523")["id"] == "bob"
+    assert resolver.resolve(name="Nobody", phone="385 208 2523")["id"] == "ann"
+    resolver.add_alias("bob", "Robert")
+    assert resolver.resolve(name="ROBERT")["id"] == "bob"
+    assert resolver.resolve(name="Nobody") is None
+
+
+def test_update_reindexes_changed_keys(resolver):
+    resolver.update("ann", {"email": "ann@new.example", "phone": None})
+    assert resolver.lookup(EMAIL, "ann@example.com") is None
+    assert resolver.lookup(PHONE, "3852082523") is None
+    assert resolver.lookup(EMAIL, "ann@new.example")["id"] == "ann"
+    resolver.update("missing", {"name": "Ghost"})
+    assert resolver.lookup(NAME, "Ghost") is None
+
+
+def test_merge_folds_names_and_aliases_into_the_primary(resolver):
+    resolver.add_alias("bob", "Bobby")
+    resolver.merge("ann", ["bob"])
+    assert "bob" not in resolver
+    assert resolver.lookup(NAME, "Bob") is None
+    assert resolver.lookup(ALIAS, "bob")["id"] == "ann"
+    assert resolver.lookup(ALIAS, "bobby")["id"] == "ann"
+    assert resolver.lookup(PHONE, "8015550100") is None
+
+
+def test_aliases_survive_a_reindex_but_not_removal(resolver):
+    resolver.add_alias("ann", "Annie")
+    resolver.update("ann", {"name": "Ann Lee-Smith"})
+    assert resolver.lookup(ALIAS, "annie")["id"] == "ann"
+    resolver.remove("ann")
+    assert resolver.lookup(ALIAS, "annie") is None
+    assert resolver.find(NAME, "Ann Lee-Smith") == []
+
+
+def test_search_names_matches_names_and_aliases(resolver):
+    resolver.add_alias("bob", "Robert Ames")
+    assert [row["id"] for row in resolver.search_names("LEE", 10)] == ["ann"]
+    assert [row["id"] for row in resolver.search_names("ame", 10)] == ["bob"]
+    assert len(resolver.search_names("", 10)) == 0
+    resolver.add(contact("ann2", "Ann Lee"))
+    assert len(resolver.search_names("ann", 1)) == 1
+
+
+# =============================================================================
+# LOADING AND THE PER-ORG CACHE
+# =============================================================================
+
+class PagedClient:
+    """Serves contacts and aliases in PostgREST-sized pages and counts requests."""
+
+    def __init__(self, contacts, aliases):
+        self.rows = {"contacts": contacts, "contact_aliases": aliases}
+        self.requests = 0
+
+    def table(self, name):
+        return _PagedQuery(self, name)
+
+
+class _PagedQuery:
+    def __init__(self, client, name):
+        self.client, self.name, self.bounds = client, name, None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, *_):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        self.client.requests += 1
+        start, end = self.bounds
+        return type("Res", (), {"data": self.client.rows[self.name][start:end + 1]})
+
+
+def test_load_pages_through_contacts_and_aliases(monkeypatch):
+    monkeypatch.setattr(contact_resolver, "PAGE_SIZE", 2)
+    client = PagedClient(
+        [contact(f"c{n}", f"Name {n}") for n in range(5)],
+        [{"contact_id": "c4", "normalized_alias": "the fourth"}, {"contact_id": "gone", "normalized_alias": "x"}],
+    )
+    resolver = ContactResolver.load(client, ORG)
+    assert len(resolver) == 5
+    assert resolver.lookup(ALIAS, "The Fourth")["id"] == "c4"
+    assert resolver.lookup(ALIAS, "x") is None  # Alias of a contact not in the org
+    assert client.requests == 3 + 2  # A full last page is followed by an empty one
+
+
+def test_cached_resolver_is_reused_and_kept_current(monkeypatch):
+    client = PagedClient([contact("ann", "Ann")], [])
+    invalidate_contact_resolver()
+    try:
+        resolver = get_contact_resolver(client, ORG)
+        assert get_contact_resolver(client, ORG) is resolver
+        assert client.requests == 2
+
+        note_contact_update("ann", {"email": "ann@example.com"})
+        assert resolver.lookup(EMAIL, "ann@example.com")["id"] == "ann"
+
+        monkeypatch.setattr(contact_resolver.settings, "CONTACT_RESOLVER_TTL_SECONDS", 0)
+        assert get_contact_resolver(client, ORG) is not resolver
+    finally:
+        invalidate_contact_resolver()
@@ -0,0 +1,146 @@
+"""extraction_map_node: service dedupe, streaming and validation around chunk analysis."""
+import asyncio
+
+import pytest
+
+from app.services import extraction_graph
+from app.services.hybrid_extraction import (
+    ExtractedService,
+    IntentAnalysis,
+    MeetingSummary,
+    MessageTableBuilder,
+    VALIDATION_BATCH_SIZE,
+)
+
+
+def service(description, name="Ann", message_id=0, **fields):
+    return ExtractedService(
+        type=fields.pop("type", "offer"), description=description, contact_name=name,
+        message_id=message_id, **fields,
+    )
+
+
+def result(*services):
+    return IntentAnalysis(services=list(services), noise_message_ids=[])
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """
+    Stubs for the LLM stages. `chunks[i]` scripts chunk i as a list of steps:
+    ("stream", service), ("sleep", seconds), ("return", result) or
+    ("raise", exception). The validator drops services whose description
+    starts with "spam" and records every batch it is sent.
+    """
+    class Pipeline:
+        chunks = {}
+        validated_batches = []
+        validation_seconds = 0.01
+
+    async def fake_analyze_chunk(view, i, on_service=None):
+        for step, value in Pipeline.chunks[i]:
+            if step == "stream" and on_service:
+                on_service(value)
+            elif step == "sleep":
+                await asyncio.sleep(value)
+            elif step == "return":
+                return value
+            elif step == "raise":
+                raise value
+
+    async def fake_validate(batch, label=""):
+        Pipeline.validated_batches.append(list(batch))
+        await asyncio.sleep(Pipeline.validation_seconds)
+        return [svc for svc in batch if not svc.description.startswith("spam")]
+
+    async def fake_summarize(digests):
+        return MeetingSummary(summary="", key_topics=[])
+
+    monkeypatch.setattr(extraction_graph, "analyze_chunk", fake_analyze_chunk)
+    monkeypatch.setattr(extraction_graph, "validate_service_batch", fake_validate)
+    monkeypatch.setattr(extraction_graph, "summarize_chunk_digests", fake_summarize)
+    monkeypatch.setattr(extraction_graph, "get_progress_store", lambda: None)
+    return Pipeline
+
+
+def map_state(n_chunks):
+    builder = MessageTableBuilder()
+    for i in range(n_chunks):
+        builder.append(i, "Ann", f"message {i}", "10:00")
+    return {"thread_id": "t", "messages": builder.build(), "chunks": [[i] for i in range(n_chunks)]}
+
+
+def run_map(n_chunks):
+    return asyncio.run(extraction_graph.extraction_map_node(map_state(n_chunks)))
+
+
+def test_earliest_copy_wins_whatever_order_chunks_finish_in(pipeline):
+    early = service("We lend in TX, DSCR and hard money", message_id=0, links=["https://a.example"])
+    late = service("We lend in TX, DSCR and hard money", message_id=5)
+    request = service("Need a TC in Idaho", name="Bob", type="request", message_id=6)
+    pipeline.chunks = {
+        0: [("sleep", 0.05), ("return", result(early, service("spam spam", message_id=1)))],
+        1: [("return", result(late, request))],  # Finishes first
+    }
+    out = run_map(2)
+    assert out["validated_services"] == [early, request]
+
+
+def test_identical_copies_are_validated_once(pipeline):
+    svc = service("We lend in TX, DSCR and hard money")
+    pipeline.chunks = {
+        0: [("sleep", 0.02), ("return", result(svc))],
+        1: [("return", result(svc.model_copy()))],
+    }
+    out = run_map(2)
+    assert out["validated_services"] == [svc]
+    assert sum(len(batch) for batch in pipeline.validated_batches) == 1
+
+
+def test_cancelling_the_node_cancels_its_tasks(pipeline):
+    full_batch = [service(f"Offer {n}", message_id=n) for n in range(VALIDATION_BATCH_SIZE)]
+    pipeline.chunks = {
+        0: [("return", result(*full_batch))],
+        1: [("sleep", 10), ("return", result())],
+    }
+    pipeline.validation_seconds = 10
+
+    async def run():
+        node = asyncio.create_task(extraction_graph.extraction_map_node(map_state(2)))
+        await asyncio.sleep(0.02)
+        assert pipeline.validated_batches  # A validation batch is in flight
+        node.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await node
+        await asyncio.sleep(0)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+
+
+def test_streamed_services_missing_from_the_result_are_withdrawn(pipeline):
+    # A first attempt streamed two services, broke off and was retried; the
+    # retry's result is what counts
+    dropped = service("Selling a duplex in Dayton", message_id=0)
+    kept = service("We lend in TX, DSCR and hard money", message_id=1)
+    pipeline.chunks = {
+        0: [("stream", dropped), ("stream", kept), ("sleep", 0.01), ("stream", kept),
+            ("return", result(kept))],
+        1: [("stream", service("Need a TC in Idaho", name="Bob", type="request", message_id=2)),
+            ("raise", RuntimeError("chunk failed"))],
+    }
+    out = run_map(2)
+    assert out["validated_services"] == [kept]
+    assert [res.services for res in out["chunk_results"]] == [[kept]]
+
+
+def test_withdrawn_copy_hands_the_lead_to_the_next_earliest(pipeline):
+    svc = "We lend in TX, DSCR and hard money"
+    later = service(svc, message_id=9, links=["https://later.example"])
+    pipeline.chunks = {
+        # Streams a copy that leads, then its final result drops it
+        0: [("stream", service(svc, message_id=0)), ("sleep", 0.03), ("return", result())],
+        1: [("return", result(later))],
+    }
+    out = run_map(2)
+    assert out["validated_services"] == [later]
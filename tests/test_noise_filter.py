@@ -0,0 +1,43 @@
+"""is_obvious_noise: the rule-based pre-filter ahead of chunk analysis."""
+import pytest
+
+from app.services.hybrid_extraction import is_obvious_noise
+
+
+@pytest.mark.parametrize("message", [
+    "",
+    "Reacted to \"We are buying in Atlanta\" with 🔥",
+    "Replying to \"Anyone lending in TX?\": ",
+    "👏👏👏",
+    "2)",
+    "Good morning everyone!",
+    "Thank you all",
+    "So true",
+    "Yes",
+    "ok everyone",
+    "Replying to \"Great call today\": thanks!",
+])
+def test_noise(message):
+    assert is_obvious_noise(message)
+
+
+@pytest.mark.parametrize("message", [
+    # Answers that can be a request ("who needs a lender?")
+    "Me",
+    "me!",
+    "Mine",
+    "Guilty",
+    "Me too",
+    "same",
+    "Yes please",
+    "More",
+    "less",
+    "Replying to \"Who needs a TC?\": me",
+    "Replying to \"Who needs a TC?\": me too",
+    "Replying to \"Who needs a TC?\": same",
+    "Replying to \"Anyone need a lender in TX?\": yes",
+    "I can fund your deals with hard money",
+    "Good morning, we are buying in Atlanta",
+])
+def test_not_noise(message):
+    assert not is_obvious_noise(message)
@@ -0,0 +1,214 @@
+"""ProfileMerge: merge rules, request payloads, and writes against the real schema."""
+import uuid
+
+import pytest
+
+from app.services.hybrid_extraction import BuyBox, ExtractedProfile, SocialLink
+from app.services.profile_merge import ProfileMerge
+from app.services.round_trips import RoundTrips
+
+
+# =============================================================================
+# REQUEST PAYLOADS
+# =============================================================================
+
+class RecordingClient:
+    """Records the requests RoundTrips sends; selects return `profiles`."""
+
+    def __init__(self, profiles=()):
+        self.profiles = [dict(p) for p in profiles]
+        self.calls = []
+
+    def table(self, name):
+        return _RecordedQuery(self, name)
+
+    def rpc(self, function, params):
+        return _RecordedQuery(self, function, ("rpc", params))
+
+
+class _RecordedQuery:
+    def __init__(self, client, name, call=("select", None)):
+        self.client, self.name, self.call, self.options = client, name, call, {}
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def in_(self, column, values):
+        self.call = ("select", (column, list(values)))
+        return self
+
+    def range(self, *_):
+        return self
+
+    def upsert(self, rows, **options):
+        self.call, self.options = ("upsert", rows), options
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.name, *self.call, self.options))
+        if self.call[0] == "select":
+            column, values = self.call[1]
+            return type("Res", (), {"data": [p for p in self.client.profiles if p[column] in values]})
+        return type("Res", (), {"data": None})
+
+
+def test_existing_profiles_are_updated_by_rpc_with_changed_fields_only():
+    client = RecordingClient([
+        {"contact_id": "c1", "user_id": "owner", "hot_plate": "mine", "bio": None,
+         "field_provenance": {"hot_plate": "user_verified"}},
+    ])
+    merge = ProfileMerge(RoundTrips(client))
+    merge.load(["c1", "c2"])
+    merge.apply_extracted("c1", ExtractedProfile(name="A", hot_plate="ai", message_to_world="hello"), "uploader")
+    merge.apply_extracted("c2", ExtractedProfile(name="B", role_tags=["Lender"]), "uploader")
+    changed = merge.save()
+
+    assert [c[:2] for c in client.calls] == [
+        ("contact_profiles", "select"),
+        ("update_contact_profiles", "rpc"),
+        ("contact_profiles", "upsert"),
+    ]
+    (update,) = client.calls[1][2]["profiles"]
+    assert update["contact_id"] == "c1"
+    assert "hot_plate" not in update  # user_verified
+    assert "user_id" not in update
+    assert update["bio"] == update["message_to_world"] == "hello"
+    assert update["field_provenance"]["hot_plate"] == "user_verified"
+
+    (new_row,) = client.calls[2][2]
+    assert new_row["contact_id"] == "c2" and new_row["user_id"] == "uploader"
+    assert client.calls[2][3]["default_to_null"] is False
+    assert set(changed) == {"c1", "c2"}
+
+
+def test_inferred_fields_fill_only_empty_fields():
+    client = RecordingClient([
+        {"contact_id": "c1", "user_id": "owner", "role_tags": [], "markets": ["TX"], "field_provenance": {}},
+    ])
+    merge = ProfileMerge(RoundTrips(client))
+    merge.load(["c1"])
+    merge.fill_inferred("c1", {
+        "role_tags": ["lender"], "markets": ["OH"],
+        "field_provenance": {"role_tags": "ai_generated", "markets": "ai_generated"},
+    }, "uploader")
+    assert merge.save() == {"c1": {"role_tags": ["lender"], "field_provenance": {"role_tags": "ai_generated"}}}
+
+
+def test_empty_extracted_values_do_not_overwrite():
+    client = RecordingClient([{"contact_id": "c1", "user_id": "o", "social_media": {"X": "u"}, "field_provenance": {}}])
+    merge = ProfileMerge(RoundTrips(client))
+    merge.load(["c1"])
+    merge.apply_extracted("c1", ExtractedProfile(name="A", website=""), "o")
+    assert merge.save() == {}
+    assert len(client.calls) == 1  # Only the load
+
+
+def test_new_profile_without_owner_is_skipped():
+    client = RecordingClient()
+    merge = ProfileMerge(RoundTrips(client))
+    merge.load(["c1", "c2"])
+    merge.apply_extracted("c1", ExtractedProfile(name="A", hot_plate="x"), None)
+    merge.apply_extracted("c2", ExtractedProfile(name="B", hot_plate="y"), "owner")
+    assert set(merge.save()) == {"c2"}
+    assert merge.skipped == ["c1"]
+    (upsert,) = [c for c in client.calls if c[1] == "upsert"]
+    assert [row["contact_id"] for row in upsert[2]] == ["c2"]
+
+
+# =============================================================================
+# REAL SCHEMA (NOT NULL, RLS, migration 013)
+# =============================================================================
+
+@pytest.fixture
+def directory(pg):
+    """Org with an admin and two members; contact and profile owned by `owner`."""
+    from postgrest_emulator import act_as
+
+    ids = {name: str(uuid.uuid4()) for name in ("owner", "admin", "member", "org", "contact", "new_contact")}
+    act_as(pg, None)
+    for user in ("owner", "admin", "member"):
+        pg.execute("INSERT INTO auth.users (id) VALUES (%s)", [ids[user]])
+    pg.execute("INSERT INTO organizations (id, name) VALUES (%s, 'Global Directory')", [ids["org"]])
+    for user, role in (("owner", "user"), ("admin", "admin"), ("member", "user")):
+        pg.execute("INSERT INTO memberships (org_id, user_id, role) VALUES (%s, %s, %s)", [ids["org"], ids[user], role])
+    for contact, user in (("contact", "owner"), ("new_contact", "member")):
+        pg.execute(
+            "INSERT INTO contacts (id, user_id, org_id, name) VALUES (%s, %s, %s, %s)",
+            [ids[contact], ids[user], ids["org"], contact],
+        )
+    pg.execute(
+        """INSERT INTO contact_profiles (contact_id, user_id, hot_plate, role_tags, field_provenance)
+           VALUES (%s, %s, 'my own words', '{Investor}', '{"hot_plate": "user_verified"}')""",
+        [ids["contact"], ids["owner"]],
+    )
+    return ids
+
+
+def _profile(pg, contact_id):
+    row = pg.execute("SELECT to_jsonb(p) FROM contact_profiles p WHERE contact_id = %s", [contact_id]).fetchone()
+    return row[0] if row else None
+
+
+def _save(pg, user_id, contact_ids, profile, owner):
+    from postgrest_emulator import PostgrestEmulator, act_as
+
+    act_as(pg, user_id)
+    merge = ProfileMerge(RoundTrips(PostgrestEmulator(pg)))
+    merge.load(contact_ids)
+    for cid in contact_ids:
+        merge.apply_extracted(cid, profile, owner)
+    changed = merge.save()
+    act_as(pg, None)
+    return changed
+
+
+PROFILE = ExtractedProfile(
+    name="X",
+    hot_plate="AI hot plate",
+    message_to_world="Buying in TX",
+    role_tags=["Lender"],
+    buy_box=BuyBox(min_price=100000, max_price=250000, markets=["TX"]),
+    social_media=[SocialLink(platform="LinkedIn", url="https://linkedin.com/in/x")],
+)
+
+
+@pytest.mark.parametrize("user", ["owner", "admin"])
+def test_existing_profile_update_passes_constraints_and_rls(pg, directory, user):
+    _save(pg, directory[user], [directory["contact"]], PROFILE, directory[user])
+
+    row = _profile(pg, directory["contact"])
+    assert row["user_id"] == directory["owner"]
+    assert row["hot_plate"] == "my own words"  # user_verified
+    assert row["bio"] == "Buying in TX"
+    assert row["role_tags"] == ["Lender"]
+    assert row["min_target_price"] == 100000 and row["max_target_price"] == 250000
+    assert row["buy_box"]["markets"] == ["TX"]
+    assert row["social_media"] == {"LinkedIn": "https://linkedin.com/in/x"}
+    assert row["field_provenance"] == {
+        "hot_plate": "user_verified", "bio": "ai_generated", "message_to_world": "ai_generated",
+        "role_tags": "ai_generated", "min_target_price": "ai_generated", "max_target_price": "ai_generated",
+        "buy_box": "ai_generated", "social_media": "ai_generated",
+    }
+
+
+def test_profiles_the_caller_may_not_update_are_skipped_not_failed(pg, directory):
+    # A non-admin member: the owner's profile is left alone (as a plain UPDATE
+    # would), their own new profile is created in the same save
+    _save(pg, directory["member"], [directory["contact"], directory["new_contact"]], PROFILE, directory["member"])
+
+    assert _profile(pg, directory["contact"])["bio"] is None
+    created = _profile(pg, directory["new_contact"])
+    assert created["user_id"] == directory["member"]
+    assert created["hot_plate"] == "AI hot plate"
+    assert created["markets"] == []  # Column default
+
+
+def test_partial_upsert_of_an_existing_profile_violates_not_null(pg, directory):
+    """Why existing profiles are not upserted: the proposed row misses user_id."""
+    import psycopg
+    from postgrest_emulator import PostgrestEmulator
+
+    with pytest.raises(psycopg.errors.NotNullViolation):
+        PostgrestEmulator(pg).table("contact_profiles").upsert(
+            [{"contact_id": directory["contact"], "bio": "x"}], on_conflict="contact_id"
+        ).execute()
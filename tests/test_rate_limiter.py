@@ -0,0 +1,70 @@
+"""AdaptiveRateLimiter: AIMD rate changes and the priority hand-off of aacquire()."""
+import asyncio
+
+from app.services.rate_limiter import AdaptiveRateLimiter, BucketStore
+
+
+def make_limiter(rps=1.0, store=None, **overrides):
+    options = dict(
+        initial_rps=rps, min_rps=0.1, max_rps=10.0, burst=1, increase=0.5, target_latency=5.0,
+    )
+    options.update(overrides)
+    return AdaptiveRateLimiter("test-model", store or BucketStore(None), **options)
+
+
+def test_rate_increases_on_success_and_halves_on_rate_limit():
+    limiter = make_limiter(rps=2.0)
+    limiter.record_success(latency=1.0)
+    assert limiter.current_rate() == 2.5
+    limiter.record_rate_limited(retry_after=0.0)
+    assert limiter.current_rate() < 2.5
+    assert not limiter.acquire(blocking=False)  # Bucket emptied
+
+
+def test_more_urgent_waiter_is_served_first():
+    async def run():
+        limiter = make_limiter(rps=20.0)
+        await limiter.aacquire()  # Use up the burst
+        order = []
+
+        async def request(name, priority):
+            await limiter.aacquire(priority=priority)
+            order.append(name)
+
+        background = asyncio.create_task(request("background", 2))
+        await asyncio.sleep(0.01)  # Background is now waiting for a token
+        interactive = asyncio.create_task(request("interactive", 0))
+        await asyncio.gather(background, interactive)
+        return order
+
+    assert asyncio.run(run()) == ["interactive", "background"]
+
+
+def test_cancelled_waiter_does_not_release_a_lock_it_handed_over():
+    async def run():
+        limiter = make_limiter(rps=2.0)
+        await limiter.aacquire()
+        lock, _ = limiter._waiters()
+
+        background = asyncio.create_task(limiter.aacquire(priority=2))
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(limiter.aacquire(priority=0))
+        await asyncio.sleep(0.01)
+        # Background stepped aside and re-queued; the interactive call holds the lock
+        assert lock.owner_priority == 0
+
+        background.cancel()
+        await asyncio.sleep(0)
+        held = lock.locked() and lock.owner_priority == 0
+        await interactive
+        return held
+
+    assert asyncio.run(run())
+
+
+def test_uncreatable_shared_state_directory_falls_back_to_per_process_limits(tmp_path):
+    (tmp_path / "blocked").write_text("not a directory")
+    store = BucketStore(str(tmp_path / "blocked" / "sub" / "llm_rate_limits.sqlite"))
+    limiter = make_limiter(rps=20.0, store=store)
+    asyncio.run(limiter.aacquire())
+    assert not limiter.acquire(blocking=False)  # The per-process bucket is used up
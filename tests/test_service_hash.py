@@ -0,0 +1,82 @@
+"""services.content_hash (migration 012): parity with the Python hash and which rows carry it."""
+import uuid
+
+import psycopg
+import pytest
+
+from app.services.extraction_store import service_content_hash
+
+DESCRIPTIONS = [
+    "We lend in TX, DSCR and hard money",
+    "  We LEND in TX,\tDSCR\n\nand hard money  ",
+    "x" * 49 + "  tail past the prefix",
+    "Need a TC in Idaho " + "and more words " * 5,
+    " Café owner in Montréal ",
+    "",
+    None,
+]
+
+
+@pytest.mark.parametrize("description", DESCRIPTIONS)
+def test_sql_hash_matches_python(pg, description):
+    chat_id, contact_id = str(uuid.uuid4()), str(uuid.uuid4())
+    for args in ((chat_id, contact_id, "offer", description), (None, None, None, description)):
+        (sql_hash,) = pg.execute(
+            "SELECT public.service_content_hash(%s::uuid, %s::uuid, %s, %s)", list(args)
+        ).fetchone()
+        assert sql_hash == service_content_hash(*args)
+
+
+@pytest.fixture
+def chat(pg):
+    """A user, contact and meeting chat to attach services to."""
+    from postgrest_emulator import act_as
+
+    ids = {name: str(uuid.uuid4()) for name in ("user", "contact", "chat")}
+    act_as(pg, None)
+    pg.execute("INSERT INTO auth.users (id) VALUES (%s)", [ids["user"]])
+    pg.execute("INSERT INTO contacts (id, user_id, name) VALUES (%s, %s, 'Ann')", [ids["contact"], ids["user"]])
+    pg.execute(
+        """INSERT INTO meeting_chats (id, user_id, telegram_chat_id, meeting_name, chat_hash, cleaned_text)
+           VALUES (%s, %s, 't', 'Meeting', %s, '')""",
+        [ids["chat"], ids["user"], uuid.uuid4().hex],
+    )
+    return ids
+
+
+def _insert(pg, ids, description, chat_id=None):
+    (content_hash,) = pg.execute(
+        """INSERT INTO services (user_id, contact_id, meeting_chat_id, type, description)
+           VALUES (%s, %s, %s, 'offer', %s) RETURNING content_hash""",
+        [ids["user"], ids["contact"], chat_id, description],
+    ).fetchone()
+    return content_hash
+
+
+def test_manual_services_have_no_hash_and_may_repeat(pg, chat):
+    assert _insert(pg, chat, "We lend in TX") is None
+    assert _insert(pg, chat, "We lend in TX") is None
+
+
+def test_duplicate_extracted_service_conflicts(pg, chat):
+    content_hash = _insert(pg, chat, "We lend in TX", chat["chat"])
+    assert content_hash == service_content_hash(chat["chat"], chat["contact"], "offer", "We lend in TX")
+    with pytest.raises(psycopg.errors.UniqueViolation):
+        with pg.transaction():
+            _insert(pg, chat, "we lend  in tx", chat["chat"])
+
+
+def test_update_into_a_duplicate_clears_the_hash(pg, chat):
+    _insert(pg, chat, "We lend in TX", chat["chat"])
+    _insert(pg, chat, "Need a TC in Idaho", chat["chat"])
+    (content_hash,) = pg.execute(
+        "UPDATE services SET description = 'We lend in TX' WHERE description = 'Need a TC in Idaho' "
+        "RETURNING content_hash"
+    ).fetchone()
+    assert content_hash is None
+
+    # Detaching a service from its chat drops its hash too
+    (content_hash,) = pg.execute(
+        "UPDATE services SET meeting_chat_id = NULL WHERE content_hash IS NOT NULL RETURNING content_hash"
+    ).fetchone()
+    assert content_hash is None
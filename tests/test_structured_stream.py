@@ -0,0 +1,180 @@
+"""Streamed structured output: JSONArrayItemStream, partial results and truncated responses."""
+import asyncio
+import json
+import uuid
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from app.services import llm_factory
+from app.services.hybrid_extraction import IntentAnalysis
+from app.services.json_stream import JSONArrayItemStream
+from app.services.llm_factory import (
+    RATE_LIMIT_METADATA_KEY,
+    RESPONSE_CACHE_METADATA_KEY,
+    STAGE_METADATA_KEY,
+    TruncatedResponse,
+    _StructuredStream,
+    invoke_with_retry,
+)
+
+RESPONSE = json.dumps({
+    "services": [
+        {"type": "offer", "description": "We fund {deals} with \"hard\" money", "contact_name": "Ann",
+         "links": ["https://a.example/[1]"], "message_id": 0},
+        {"type": "request", "description": "Need a TC in Idaho", "contact_name": "Bob", "message_id": 1},
+    ],
+    "profiles": [{"name": "Ann", "role_tags": ["Lender"]}],
+    "noise_message_ids": [2, 3],
+    "digest": "Ann lends; Bob needs a TC.",
+    "key_topics": ["lending"],
+})
+
+
+def pieces(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+# =============================================================================
+# JSONArrayItemStream
+# =============================================================================
+
+@pytest.mark.parametrize("size", [1, 7, len(RESPONSE)])
+def test_items_are_emitted_as_their_object_closes(size):
+    parser = JSONArrayItemStream(["services", "profiles"])
+    items = [item for piece in pieces(RESPONSE, size) for item in parser.feed(piece)]
+    expected = json.loads(RESPONSE)
+    assert items == [
+        ("services", expected["services"][0]),
+        ("services", expected["services"][1]),
+        ("profiles", expected["profiles"][0]),
+    ]
+    assert parser.text == RESPONSE
+
+
+def test_item_is_emitted_by_the_chunk_that_closes_it():
+    parser = JSONArrayItemStream(["services"])
+    end_of_first = RESPONSE.index('"message_id": 0}') + len('"message_id": 0}')
+    assert parser.feed(RESPONSE[:end_of_first - 1]) == []
+    assert [item["message_id"] for _, item in parser.feed(RESPONSE[end_of_first - 1:end_of_first])] == [0]
+
+
+def test_only_top_level_arrays_of_selected_fields():
+    parser = JSONArrayItemStream(["services"])
+    text = '{"other": [{"a": 1}], "nested": {"services": [{"b": 2}]}, "services": [{"c": 3}, 4]}'
+    assert parser.feed(text) == [("services", {"c": 3})]
+
+
+# =============================================================================
+# Partial results
+# =============================================================================
+
+def stream_of(text):
+    emitted = []
+    stream = _StructuredStream(IntentAnalysis, lambda field, item: emitted.append((field, item)))
+    asyncio.run(stream._feed(text))
+    return stream, emitted
+
+
+def test_partial_result_keeps_completed_items():
+    cut = RESPONSE.index('"contact_name": "Bob"')
+    stream, emitted = stream_of(RESPONSE[:cut])
+    assert [item.contact_name for _, item in emitted] == ["Ann"]
+
+    partial = stream.partial_result()
+    assert [s.contact_name for s in partial.services] == ["Ann"]
+    assert partial.noise_message_ids == []  # Required list never arrived
+    assert partial.profiles == []
+
+
+def test_partial_result_drops_a_field_cut_mid_value():
+    cut = RESPONSE.index('Bob needs a TC')
+    stream, _ = stream_of(RESPONSE[:cut])
+    partial = stream.partial_result()
+    assert len(partial.services) == 2
+    assert partial.noise_message_ids == [2, 3]
+    assert partial.digest == ""  # Cut off: not kept half-written
+
+
+# =============================================================================
+# Truncated responses
+# =============================================================================
+
+class FakeStructuredRunnable:
+    """Streams `text` in chunks like a structured runnable, then fails with `error` if given."""
+
+    def __init__(self, text, error=None):
+        self.text, self.error, self.calls = text, error, 0
+        self.config = {"metadata": {
+            RATE_LIMIT_METADATA_KEY: f"test/{uuid.uuid4().hex[:6]}",
+            STAGE_METADATA_KEY: "test_stream",
+            RESPONSE_CACHE_METADATA_KEY: {
+                "model": "test/model", "temperature": 0,
+                "schema": "app.services.hybrid_extraction.IntentAnalysis", "schema_hash": uuid.uuid4().hex,
+            },
+        }}
+
+    async def astream_events(self, input_data, config=None, version=None):
+        self.calls += 1
+        for piece in pieces(self.text, 16):
+            yield {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content=piece)},
+                   "parent_ids": ["root"]}
+        if self.error:
+            raise self.error
+        yield {"event": "on_chain_end", "data": {"output": IntentAnalysis.model_validate_json(self.text)},
+               "parent_ids": []}
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    llm_factory._response_schemas["app.services.hybrid_extraction.IntentAnalysis"] = IntentAnalysis
+    monkeypatch.setattr(llm_factory.settings, "LLM_RESPONSE_CACHE_ENABLED", True)
+    return llm_factory.get_llm_response_cache()
+
+
+def test_complete_stream_returns_and_caches_the_result(response_cache):
+    runnable = FakeStructuredRunnable(RESPONSE)
+    emitted = []
+    result = asyncio.run(invoke_with_retry(runnable, "prompt", on_item=lambda f, i: emitted.append(f)))
+    assert result == IntentAnalysis.model_validate_json(RESPONSE)
+    assert emitted == ["services", "services", "profiles"]
+    assert response_cache.get(llm_factory._response_cache_key(runnable, "prompt"))
+
+
+def test_broken_off_stream_raises_truncated_and_is_not_cached(response_cache):
+    cut = RESPONSE.index('"contact_name": "Bob"')
+    runnable = FakeStructuredRunnable(RESPONSE[:cut], error=ConnectionError("stream reset"))
+    emitted = []
+
+    with pytest.raises(TruncatedResponse) as raised:
+        asyncio.run(invoke_with_retry(runnable, "prompt", max_retries=2, on_item=lambda f, i: emitted.append(i)))
+
+    assert runnable.calls == 1  # Not retried: its items are out
+    assert raised.value.partial.services == emitted
+    assert response_cache.get(llm_factory._response_cache_key(runnable, "prompt")) is None
+    stats = llm_factory.get_llm_telemetry().snapshot()["stages"]["test_stream"]
+    assert stats["truncated"] >= 1
+
+
+def test_stream_that_breaks_off_before_any_item_is_retried():
+    runnable = FakeStructuredRunnable('{"services": [{"type": "of', error=ConnectionError("stream reset"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(invoke_with_retry(runnable, "prompt", max_retries=1, initial_delay=0.01,
+                                      on_item=lambda f, i: None))
+    assert runnable.calls == 2
+
+
+def test_fallback_is_not_tried_after_a_truncated_response(monkeypatch):
+    calls = []
+
+    async def fake_invoke_with_retry(llm, input_data, **_):
+        calls.append(llm_factory._rate_limit_model(llm))
+        raise TruncatedResponse(IntentAnalysis(services=[], noise_message_ids=[]), "test/primary", EOFError())
+
+    monkeypatch.setattr(llm_factory, "invoke_with_retry", fake_invoke_with_retry)
+    monkeypatch.setattr(llm_factory.settings, "LLM_MODEL", "test/primary")
+    monkeypatch.setattr(llm_factory.settings, "LLM_FALLBACK_MODEL", "test/fallback")
+    monkeypatch.setattr(llm_factory.settings, "OPENROUTER_API_KEY", "test-key")
+    with pytest.raises(TruncatedResponse):
+        asyncio.run(llm_factory.invoke_with_fallback("hi", schema=IntentAnalysis, on_item=lambda f, i: None))
+    assert calls == ["test/primary"]
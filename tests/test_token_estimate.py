@@ -0,0 +1,24 @@
+"""Token estimation and the token-budgeted batching built on it."""
+from app.services.hybrid_extraction import (
+    ENRICHMENT_BATCH_MAX_CONTACTS,
+    ENRICHMENT_BATCH_TOKEN_BUDGET,
+    pack_enrichment_batches,
+)
+from app.services.token_estimate import estimate_tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("We buy in TX!") == 5
+    assert estimate_tokens("$250,000") == 4
+    assert estimate_tokens("transactioncoordinator") == 3  # 1 + 22 // 8
+
+
+def test_enrichment_batches_respect_budget_and_contact_cap():
+    small = [(f"c{i}", f"Name {i}", ["Buying SFH in Ohio"]) for i in range(ENRICHMENT_BATCH_MAX_CONTACTS + 2)]
+    huge = ("big", "Big", ["word " * ENRICHMENT_BATCH_TOKEN_BUDGET])
+    batches = pack_enrichment_batches([*small[:3], huge, *small[3:]])
+
+    assert [c[0] for batch in batches for c in batch] == [c[0] for c in [*small[:3], huge, *small[3:]]]
+    assert [huge] in batches  # Too large to share a call
+    assert all(len(batch) <= ENRICHMENT_BATCH_MAX_CONTACTS for batch in batches)
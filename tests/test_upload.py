@@ -0,0 +1,45 @@
+"""run_core_extraction_logic: saving an extraction result, then enriching its contacts."""
+import asyncio
+
+from app.api import upload
+from app.services import hybrid_extraction
+from app.services.hybrid_extraction import (
+    ExtractedMeetingData,
+    ExtractedProfile,
+    ExtractedService,
+    MeetingSummary,
+)
+
+
+def test_saved_contacts_are_enriched_from_their_services(monkeypatch):
+    calls = []
+    extracted = ExtractedMeetingData(
+        contacts=[],
+        services=[
+            ExtractedService(type="offer", description="Hard money in TX", contact_name="Ann", message_id=0),
+            ExtractedService(type="request", description="Need a TC", contact_name="Unattributed", message_id=1),
+        ],
+        summary=MeetingSummary(summary="", key_topics=[]),
+    )
+    name_to_id = {"Ann": "c1", "Bob": "c2", "Unattributed": "c0"}
+
+    async def fake_pipeline(text, thread_id):
+        return extracted
+
+    async def fake_enrich(contacts):
+        calls.append(("enrich", contacts))
+        return {cid: ExtractedProfile(name=name, role_tags=["Lender"]) for cid, name, _ in contacts}
+
+    monkeypatch.setattr(upload, "run_extraction_pipeline", fake_pipeline)
+    monkeypatch.setattr(upload, "save_extraction_results", lambda *args: name_to_id)
+    monkeypatch.setattr(hybrid_extraction, "enrich_profiles_from_services", fake_enrich)
+    monkeypatch.setattr(upload, "save_rich_profiles_sync",
+                        lambda client, ids, profiles, user_id: calls.append(("save", ids, profiles)))
+
+    asyncio.run(upload.run_core_extraction_logic(None, "chat-1", "user-1", "org-1", "text"))
+
+    # Bob has no services in this meeting and Unattributed is not a person
+    assert calls == [
+        ("enrich", [("c1", "Ann", ["[OFFER] Hard money in TX"])]),
+        ("save", name_to_id, [ExtractedProfile(name="Ann", role_tags=["Lender"])]),
+    ]